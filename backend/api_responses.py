@@ -0,0 +1,92 @@
+"""
+Shared JSON response helpers for Lambda handlers
+
+DynamoDB items come back with Decimal numbers, which the stdlib encoder
+rejects. Everything here converts Decimal to int/float, and uses orjson when
+it is installed.
+"""
+import json
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _default(value: Any) -> Any:
+    """Encode types the JSON encoders do not know about"""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if ORJSON_AVAILABLE:
+    def dumps_bytes(data: Any) -> bytes:
+        """Serialize to UTF-8 JSON bytes"""
+        return orjson.dumps(data, default=_default)
+
+    def dumps(data: Any) -> str:
+        """Serialize to a JSON string"""
+        return orjson.dumps(data, default=_default).decode()
+
+    def loads(data: Any) -> Any:
+        """Parse a JSON string or bytes"""
+        return orjson.loads(data)
+else:
+    _encoder = json.JSONEncoder(default=_default, separators=(',', ':'))
+
+    def dumps_bytes(data: Any) -> bytes:
+        """Serialize to UTF-8 JSON bytes"""
+        return _encoder.encode(data).encode()
+
+    def dumps(data: Any) -> str:
+        """Serialize to a JSON string"""
+        return _encoder.encode(data)
+
+    def loads(data: Any) -> Any:
+        """Parse a JSON string or bytes"""
+        return json.loads(data)
+
+
+def iter_encode_list(items: Iterable[Any]) -> Iterator[bytes]:
+    """Encode an iterable as a JSON array one element at a time
+
+    Lets large result sets be written to a file or upload stream without
+    materializing the whole list or one big string first.
+    """
+    yield b'['
+    first = True
+    for item in items:
+        if first:
+            first = False
+        else:
+            yield b','
+        yield dumps_bytes(item)
+    yield b']'
+
+
+def iter_encode_ndjson(items: Iterable[Any]) -> Iterator[bytes]:
+    """Encode an iterable as newline-delimited JSON"""
+    for item in items:
+        yield dumps_bytes(item) + b'\n'
+
+
+def cors_headers(methods: str) -> Dict[str, str]:
+    """Build the constant CORS header dict for a handler once, at import"""
+    return {
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Headers': 'Content-Type,Authorization',
+        'Access-Control-Allow-Methods': methods,
+        'Content-Type': 'application/json'
+    }
+
+
+def parse_body(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse the JSON request body, treating a missing body as empty"""
+    body: Optional[str] = event.get('body')
+    return loads(body) if body else {}
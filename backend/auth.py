@@ -1,23 +1,97 @@
 """
 Authentication utilities
 """
+import asyncio
+import hashlib
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from config import settings
+from functools import lru_cache
+from typing import Any, Optional, Dict, Tuple
+from config import settings, LazyObject
+from lru import LRUCache
+from database import db_client
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# passlib and jose are imported inside the functions that use them so
+# handlers that never hash or verify do not pay for them at cold start
+
+_INVALID = object()
+
+# Everything on a user item except password_hash, which is never read back
+USER_ATTRIBUTES = ['user_id', 'email', 'name', 'created_at', 'is_active', 'role']
+
+# bcrypt cost doubles per round; calibration times one cheap hash and
+# extrapolates instead of hashing at every candidate cost
+_CALIBRATION_ROUNDS = 8
+
+# Verified payloads keyed by token hash; the same bearer token arrives on
+# every request for up to ACCESS_TOKEN_EXPIRE_MINUTES
+token_cache = LazyObject(lambda: LRUCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_NEGATIVE_CACHE_SECONDS))
+
+
+def calibrate_bcrypt_rounds(target_ms: float, min_rounds: int, max_rounds: int) -> int:
+    """Highest bcrypt cost whose hash time stays within target_ms on this CPU"""
+    from passlib.hash import bcrypt
+    hasher = bcrypt.using(rounds=_CALIBRATION_ROUNDS)
+    # The first hash also loads the backend and runs its self-test
+    hasher.hash("warm-up")
+    started = time.perf_counter()
+    hasher.hash("calibration")
+    elapsed_ms = max((time.perf_counter() - started) * 1000, 0.001)
+    rounds = _CALIBRATION_ROUNDS + int(math.floor(math.log2(target_ms / elapsed_ms)))
+    return max(min_rounds, min(max_rounds, rounds))
+
+
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    """Build the passlib context on first use"""
+    from passlib.context import CryptContext
+    rounds = settings.BCRYPT_ROUNDS or calibrate_bcrypt_rounds(
+        settings.PASSWORD_HASH_TARGET_MS, settings.BCRYPT_MIN_ROUNDS, settings.BCRYPT_MAX_ROUNDS
+    )
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=max(rounds, settings.BCRYPT_MIN_ROUNDS),
+        bcrypt__min_rounds=settings.BCRYPT_MIN_ROUNDS
+    )
+
+
+@lru_cache(maxsize=None)
+def get_hash_executor() -> ThreadPoolExecutor:
+    """Worker threads for hashing off the event loop (bcrypt releases the GIL)"""
+    return ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix='password-hash')
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password; on success also return a new hash if the policy has moved on"""
+    return get_pwd_context().verify_and_update(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in the worker pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_hash_executor(), get_password_hash, password)
+
+
+async def verify_and_update_password_async(plain_password: str,
+                                           hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """verify_and_update_password in the worker pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_hash_executor(), verify_and_update_password, plain_password, hashed_password
+    )
 
 
 def create_access_token(data: Dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -30,6 +104,7 @@ def create_access_token(data: Dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire, "type": "access"})
+    from jose import jwt
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
@@ -39,12 +114,34 @@ def create_refresh_token(data: Dict) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode.update({"exp": expire, "type": "refresh"})
+    from jose import jwt
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
 
 def decode_token(token: str) -> Optional[Dict]:
-    """Decode and verify JWT token"""
+    """Decode and verify JWT token, reusing earlier verifications of the same token"""
+    key = hashlib.sha256(token.encode()).digest()
+    cached = token_cache.get(key)
+    if cached is _INVALID:
+        return None
+    if cached is not None:
+        return dict(cached)
+    
+    payload = verify_token(token)
+    if payload is None:
+        token_cache.set(key, _INVALID)
+        return None
+    
+    remaining = payload['exp'] - time.time() if isinstance(payload.get('exp'), (int, float)) else 0
+    if remaining > 0:
+        token_cache.set(key, payload, ttl=remaining)
+    return dict(payload)
+
+
+def verify_token(token: str) -> Optional[Dict]:
+    """Decode and verify JWT token without the cache"""
+    from jose import JWTError, jwt
     try:
         payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
         return payload
@@ -52,9 +149,46 @@ def decode_token(token: str) -> Optional[Dict]:
         return None
 
 
+def normalize_email(email: str) -> str:
+    """Canonical form emails are unique under: trimmed and lowercased"""
+    return email.strip().lower()
+
+
+def bearer_token(event: Dict[str, Any]) -> Optional[str]:
+    """Token from an API Gateway event's `Authorization: Bearer ...` header"""
+    headers = event.get('headers') or {}
+    auth_header = headers.get('Authorization') or headers.get('authorization') or ''
+    scheme, _, token = auth_header.partition(' ')
+    if scheme.lower() != 'bearer' or not token.strip():
+        return None
+    return token.strip()
+
+
+def authenticate(event: Dict[str, Any]) -> Optional[Dict]:
+    """Verified token payload for the request, or None"""
+    token = bearer_token(event)
+    return decode_token(token) if token else None
+
+
 def extract_user_id_from_token(token: str) -> Optional[str]:
     """Extract user ID from JWT token"""
     payload = decode_token(token)
     if payload:
         return payload.get("sub")
     return None
+
+
+def load_user(user_id: str, include_profile: bool = False) -> Tuple[Optional[Dict], Optional[Dict]]:
+    """User item (without password_hash) and optionally its profile, in one BatchGetItem"""
+    key = {'user_id': user_id}
+    requests = {settings.USERS_TABLE: (key, USER_ATTRIBUTES)}
+    if include_profile:
+        requests[settings.USER_PROFILES_TABLE] = (key, None)
+    items = db_client.get_items(requests)
+    return items[settings.USERS_TABLE], items.get(settings.USER_PROFILES_TABLE)
+
+
+def is_admin(user_id: str) -> bool:
+    """Whether an active user has the admin role"""
+    user, _ = load_user(user_id)
+    return bool(user) and user.get('role') == 'admin' and user.get('is_active', True)
@@ -0,0 +1,108 @@
+"""
+In-process caches that survive across invocations in a warm Lambda container
+"""
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional
+from database import db_client
+from config import settings, LazyObject
+from search_index import META_KEY
+from lru import LRUCache
+
+_MISSING = object()
+
+
+class CatalogCache:
+    """Read-through cache for recipe reads, invalidated by the catalog version stamp
+
+    Recipe writes bump a `catalog_version` counter on the search index meta
+    item. Each container polls that counter at most once per
+    `version_check_interval` seconds and drops its entries when it changes,
+    so warm reads skip DynamoDB entirely between checks.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, version_check_interval: float):
+        self.entries = LRUCache(maxsize, ttl)
+        self.version_check_interval = version_check_interval
+        self.version: Optional[int] = None
+        self.invalidations = 0
+        self._checked_at = 0.0
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return a cached value, calling loader on a miss
+
+        Cached values are shared between invocations and must not be mutated.
+        """
+        self.refresh_version()
+        value = self.entries.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            self.entries.set(key, value)
+        return value
+
+    def get_many_or_load(self, keys: List[Hashable],
+                         loader: Callable[[List[Hashable]], Dict[Hashable, Any]]) -> Dict[Hashable, Any]:
+        """Return cached values for keys, loading every miss with one loader call
+
+        Keys the loader leaves out are cached as None.
+        """
+        self.refresh_version()
+        values = {}
+        misses = []
+        for key in keys:
+            value = self.entries.get(key, _MISSING)
+            if value is _MISSING:
+                misses.append(key)
+            else:
+                values[key] = value
+
+        if misses:
+            loaded = loader(misses)
+            for key in misses:
+                values[key] = loaded.get(key)
+                self.entries.set(key, values[key])
+        return values
+
+    def refresh_version(self, force: bool = False) -> Optional[int]:
+        """Re-read the catalog version stamp if the check interval has passed"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.version_check_interval:
+            return self.version
+
+        meta = db_client.get_item(settings.RECIPE_SEARCH_TABLE, META_KEY) or {}
+        self._set_version(int(meta.get('catalog_version', 0)))
+        self._checked_at = now
+        return self.version
+
+    def bump_version(self) -> int:
+        """Record a catalog write so every container drops its cached reads"""
+        meta = db_client.update_item(
+            settings.RECIPE_SEARCH_TABLE,
+            META_KEY,
+            "ADD catalog_version :one",
+            {':one': 1}
+        )
+        self._set_version(int(meta.get('catalog_version', 0)))
+        self._checked_at = time.monotonic()
+        return self.version
+
+    def _set_version(self, version: int) -> None:
+        if version != self.version:
+            if self.version is not None:
+                self.invalidations += 1
+            self.entries.clear()
+            self.version = version
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters plus the catalog version this container has seen"""
+        return {
+            **self.entries.stats(),
+            'invalidations': self.invalidations,
+            'catalog_version': self.version
+        }
+
+
+recipe_cache = LazyObject(lambda: CatalogCache(
+    maxsize=settings.CATALOG_CACHE_SIZE,
+    ttl=settings.CATALOG_CACHE_TTL_SECONDS,
+    version_check_interval=settings.CATALOG_VERSION_CHECK_SECONDS
+))
@@ -0,0 +1,328 @@
+"""
+Columnar recipe catalog snapshot, memory-mapped from local disk
+
+A snapshot is one binary file (little-endian, sections 8-byte aligned):
+
+    header   magic, format, row and slot counts, catalog version, build time
+    numbers  float32 [rows, NUMERIC_FIELDS]      nutrition and times
+    flags    uint32  [rows]                      dietary flag bitmask
+    offsets  uint32  [rows, STRING_FIELDS + 1]   where each string starts in the heap
+    table    int32   [slots]                     open-addressing recipe_id -> row
+    heap     UTF-8 strings, each row's fields back to back
+
+Opening one maps the file and lays views over it, so a cold container
+reads columns and finds recipes by id without parsing a single record;
+only the pages it touches become resident. The full item is kept as a
+JSON document and decoded only for rows actually served.
+
+The build job (functions/build_catalog_snapshot.py) stamps the catalog
+version it was built at. Readers use a snapshot only while that matches
+the live version stamp, so a write makes it stale until the next build.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Sequence
+from database import s3_client
+from config import settings, LazyObject
+from cache import recipe_cache
+from api_responses import dumps_bytes, loads
+from dietary_flags import recipe_flags
+from conversions import to_float
+
+MAGIC = b'DBCATSNP'
+FORMAT_VERSION = 1
+
+NUTRITION_FIELDS = ('calories', 'protein', 'carbs', 'fat')
+TIME_FIELDS = ('prep_time', 'cook_time')
+NUMERIC_FIELDS = NUTRITION_FIELDS + TIME_FIELDS
+STRING_FIELDS = ('recipe_id', 'name', 'category', 'tags', 'ingredients', 'document')
+
+# Joins list fields (tags, ingredients) inside one heap string
+LIST_SEPARATOR = '\x1f'
+
+# magic, format, rows, slots, numeric fields, string fields, catalog version, built at, heap bytes
+_HEADER = struct.Struct('<8sIIIIIqqQ')
+_EMPTY = -1
+_FILE_PREFIX = 'recipe-catalog-'
+
+# How long a container waits before asking S3 again for a version it found unpublished
+UNPUBLISHED_RECHECK_SECONDS = 60
+
+
+def _align(size: int) -> int:
+    return (size + 7) & ~7
+
+
+def _layout(rows: int, slots: int) -> Dict[str, int]:
+    """Byte offset of every section after the header"""
+    layout = {}
+    position = _align(_HEADER.size)
+    for name, size in (('numbers', 4 * rows * len(NUMERIC_FIELDS)),
+                       ('flags', 4 * rows),
+                       ('offsets', 4 * rows * (len(STRING_FIELDS) + 1)),
+                       ('table', 4 * slots),
+                       ('heap', 0)):
+        layout[name] = position
+        position = _align(position + size)
+    return layout
+
+
+def _hash(recipe_id: bytes) -> int:
+    """Stable across processes, unlike hash()"""
+    return int.from_bytes(hashlib.blake2b(recipe_id, digest_size=8).digest(), 'little')
+
+
+def build_snapshot(recipes: List[Dict[str, Any]], catalog_version: Optional[int] = None) -> bytes:
+    """Encode recipes as a snapshot file"""
+    rows = len(recipes)
+    slots = 1 << (max(2 * rows, 1) - 1).bit_length()
+    numbers = array('f')
+    flags = array('I')
+    offsets = array('I')
+    table = array('i', [_EMPTY]) * slots
+    heap = bytearray()
+
+    for row, recipe in enumerate(recipes):
+        nutrition = recipe.get('nutrition') or {}
+        numbers.extend(to_float(nutrition.get(field)) for field in NUTRITION_FIELDS)
+        numbers.extend(to_float(recipe.get(field)) for field in TIME_FIELDS)
+        # Recomputed from ingredients and tags, so items written under older
+        # keyword rules are re-flagged; the stored stamp only covers items
+        # that carry neither
+        if recipe.get('ingredients') or recipe.get('tags'):
+            flags.append(recipe_flags(recipe))
+        else:
+            flags.append(int(recipe.get('dietary_flags') or 0))
+
+        recipe_id = str(recipe['recipe_id']).encode()
+        for value in (
+            recipe_id,
+            str(recipe.get('name') or '').encode(),
+            str(recipe.get('category') or '').encode(),
+            LIST_SEPARATOR.join(str(tag) for tag in recipe.get('tags') or []).encode(),
+            LIST_SEPARATOR.join(str(item) for item in recipe.get('ingredients') or []).encode(),
+            dumps_bytes(recipe)
+        ):
+            offsets.append(len(heap))
+            heap += value
+        offsets.append(len(heap))
+        if len(heap) > 0xFFFFFFFF:
+            raise ValueError("Catalog too large for a snapshot: string heap exceeds 4 GiB")
+
+        slot = _hash(recipe_id) & (slots - 1)
+        while table[slot] != _EMPTY:
+            slot = (slot + 1) & (slots - 1)
+        table[slot] = row
+
+    layout = _layout(rows, slots)
+    buffer = bytearray(layout['heap'] + len(heap))
+    _HEADER.pack_into(buffer, 0, MAGIC, FORMAT_VERSION, rows, slots, len(NUMERIC_FIELDS),
+                      len(STRING_FIELDS), catalog_version or 0, int(time.time()), len(heap))
+    for name, section in (('numbers', numbers), ('flags', flags), ('offsets', offsets), ('table', table)):
+        data = section.tobytes()
+        buffer[layout[name]:layout[name] + len(data)] = data
+    buffer[layout['heap']:] = heap
+    return bytes(buffer)
+
+
+class _Records(Sequence):
+    """Recipes by row, decoded on access"""
+
+    def __init__(self, snapshot: 'CatalogSnapshot'):
+        self._snapshot = snapshot
+
+    def __len__(self) -> int:
+        return len(self._snapshot)
+
+    def __getitem__(self, row: int) -> Dict[str, Any]:
+        row = int(row)
+        if not 0 <= row < len(self._snapshot):
+            raise IndexError(row)
+        return self._snapshot.record(row)
+
+
+class CatalogSnapshot:
+    """Read-only views over a snapshot held in memory or mapped from a file"""
+
+    def __init__(self, buffer: Any):
+        magic, format_version, rows, slots, numeric_fields, string_fields, catalog_version, built_at, heap_size = \
+            _HEADER.unpack_from(buffer, 0)
+        if (magic != MAGIC or format_version != FORMAT_VERSION
+                or numeric_fields != len(NUMERIC_FIELDS) or string_fields != len(STRING_FIELDS)):
+            raise ValueError("Not a catalog snapshot in a supported format")
+
+        layout = _layout(rows, slots)
+        view = memoryview(buffer)
+        self.rows = rows
+        self.catalog_version = catalog_version
+        self.built_at = built_at
+        self._buffer = buffer
+        self._layout = layout
+        self._stride = len(STRING_FIELDS) + 1
+        self._offsets = view[layout['offsets']:layout['offsets'] + 4 * rows * self._stride].cast('I')
+        self._table = view[layout['table']:layout['table'] + 4 * slots].cast('i')
+        self._heap = view[layout['heap']:layout['heap'] + heap_size]
+        self.records = _Records(self)
+
+    @classmethod
+    def open(cls, path: str) -> 'CatalogSnapshot':
+        """Map a snapshot file read-only"""
+        with open(path, 'rb') as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def __len__(self) -> int:
+        return self.rows
+
+    # NumPy is imported only for column access, so handlers that just look
+    # recipes up by id do not pay for it at cold start
+
+    @property
+    def numbers(self):
+        """float32 [rows, NUMERIC_FIELDS] view"""
+        import numpy as np
+        return np.frombuffer(self._buffer, dtype='<f4', count=self.rows * len(NUMERIC_FIELDS),
+                             offset=self._layout['numbers']).reshape(self.rows, len(NUMERIC_FIELDS))
+
+    @property
+    def nutrition(self):
+        """float32 [rows, NUTRITION_FIELDS] view"""
+        return self.numbers[:, :len(NUTRITION_FIELDS)]
+
+    @property
+    def minutes(self):
+        """Total prep and cook time per recipe"""
+        return self.numbers[:, len(NUTRITION_FIELDS):].sum(axis=1)
+
+    @property
+    def flags(self):
+        """uint32 [rows] view"""
+        import numpy as np
+        return np.frombuffer(self._buffer, dtype='<u4', count=self.rows, offset=self._layout['flags'])
+
+    def _bytes(self, row: int, field: int) -> memoryview:
+        start = row * self._stride + field
+        return self._heap[self._offsets[start]:self._offsets[start + 1]]
+
+    def string(self, row: int, field: str) -> str:
+        return str(self._bytes(row, STRING_FIELDS.index(field)), 'utf-8')
+
+    def strings(self, field: str) -> List[str]:
+        """One string field for every row"""
+        field = STRING_FIELDS.index(field)
+        return [str(self._bytes(row, field), 'utf-8') for row in range(self.rows)]
+
+    def lists(self, field: str) -> List[List[str]]:
+        """A list field (tags, ingredients) for every row"""
+        return [value.split(LIST_SEPARATOR) if value else [] for value in self.strings(field)]
+
+    def recipe_id(self, row: int) -> str:
+        return str(self._bytes(row, 0), 'utf-8')
+
+    def row(self, recipe_id: str) -> Optional[int]:
+        """Row of a recipe, or None if it is not in the snapshot"""
+        key = recipe_id.encode()
+        mask = len(self._table) - 1
+        slot = _hash(key) & mask
+        while True:
+            row = self._table[slot]
+            if row == _EMPTY:
+                return None
+            if self._bytes(row, 0) == key:
+                return row
+            slot = (slot + 1) & mask
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """The full recipe item for a row"""
+        return loads(bytes(self._bytes(row, STRING_FIELDS.index('document'))))
+
+    def get(self, recipe_id: str) -> Optional[Dict[str, Any]]:
+        row = self.row(recipe_id)
+        return None if row is None else self.record(row)
+
+
+class PublishedSnapshot:
+    """The snapshot in S3, downloaded to local disk and mapped once per container"""
+
+    def __init__(self, bucket: str, key: str, directory: str):
+        self.bucket = bucket
+        self.key = key
+        self.directory = directory
+        self.snapshot: Optional[CatalogSnapshot] = None
+        self._unpublished: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _path(self, catalog_version: int) -> str:
+        return os.path.join(self.directory, f"{_FILE_PREFIX}{catalog_version}.snap")
+
+    def current(self, catalog_version: Optional[int]) -> Optional[CatalogSnapshot]:
+        """The snapshot built at `catalog_version`, or None if none has been published"""
+        if catalog_version is None:
+            return None
+        snapshot = self.snapshot
+        if snapshot is not None and snapshot.catalog_version == catalog_version:
+            return snapshot
+        if self._recently_missing(catalog_version):
+            return None
+
+        with self._lock:
+            if self.snapshot is not None and self.snapshot.catalog_version == catalog_version:
+                return self.snapshot
+            if self._recently_missing(catalog_version):
+                return None
+            try:
+                snapshot = self._fetch(catalog_version)
+            except Exception as e:
+                print(f"Catalog snapshot unavailable: {e}")
+                snapshot = None
+            if snapshot is None:
+                self._unpublished = catalog_version
+                self._checked_at = time.monotonic()
+                return None
+            self.snapshot = snapshot
+            return snapshot
+
+    def _recently_missing(self, catalog_version: int) -> bool:
+        return (self._unpublished == catalog_version
+                and time.monotonic() - self._checked_at < UNPUBLISHED_RECHECK_SECONDS)
+
+    def _fetch(self, catalog_version: int) -> Optional[CatalogSnapshot]:
+        path = self._path(catalog_version)
+        if not os.path.exists(path):
+            metadata = s3_client.get_metadata(self.bucket, self.key)
+            if metadata.get('catalog-version') != str(catalog_version):
+                return None
+            partial = f"{path}.{os.getpid()}.part"
+            s3_client.download_file(self.bucket, self.key, partial)
+            os.replace(partial, path)
+            self._remove_older(path)
+
+        snapshot = CatalogSnapshot.open(path)
+        # The object can be replaced between the metadata check and the download
+        return snapshot if snapshot.catalog_version == catalog_version else None
+
+    def _remove_older(self, keep: str) -> None:
+        """Free /tmp; existing mappings stay valid after their file is unlinked"""
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith(_FILE_PREFIX) and name.endswith('.snap') and path != keep:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+def published_recipe(recipe_id: str) -> Optional[Dict[str, Any]]:
+    """A recipe from the current published snapshot; None means ask DynamoDB"""
+    snapshot = published_snapshot.current(recipe_cache.refresh_version())
+    return snapshot.get(recipe_id) if snapshot is not None else None
+
+
+published_snapshot = LazyObject(lambda: PublishedSnapshot(
+    settings.CONTENT_BUCKET, settings.CATALOG_SNAPSHOT_KEY, settings.CATALOG_SNAPSHOT_DIR
+))
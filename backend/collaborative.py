@@ -0,0 +1,112 @@
+"""
+Item-item collaborative filtering over recipe favorites
+
+Favorites form a binary user x recipe matrix X. Recipe similarity is
+co-occurrence normalized to cosine, S = XᵀX / sqrt(n_i n_j), with the
+diagonal dropped and each recipe's row pruned to its strongest
+neighbours. A user's scores are X_u S: recipes favorited alongside the
+ones they favorited, weighted by how strongly. Everything stays in SciPy
+sparse matrices, and users are scored in chunks to bound memory.
+"""
+from array import array
+from typing import Dict, Iterable, Iterator, List, Tuple
+import numpy as np
+from scipy import sparse
+
+USER_CHUNK = 20000
+
+
+class FavoritesMatrix:
+    """Streaming builder: add (user, recipe) pairs page by page, then build"""
+
+    def __init__(self):
+        self.user_index: Dict[str, int] = {}
+        self.recipe_index: Dict[str, int] = {}
+        self._rows = array('i')
+        self._cols = array('i')
+
+    def add(self, pairs: Iterable[Tuple[str, str]]) -> None:
+        users, recipes = self.user_index, self.recipe_index
+        for user_id, recipe_id in pairs:
+            self._rows.append(users.setdefault(user_id, len(users)))
+            self._cols.append(recipes.setdefault(recipe_id, len(recipes)))
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def build(self) -> sparse.csr_matrix:
+        """Binary CSR matrix; duplicate pairs count once"""
+        rows = np.frombuffer(self._rows, dtype=np.int32)
+        cols = np.frombuffer(self._cols, dtype=np.int32)
+        matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(len(self.user_index), len(self.recipe_index))
+        )
+        matrix.data[:] = 1.0
+        return matrix
+
+
+def item_similarity(favorites: sparse.csr_matrix, neighbors: int) -> sparse.csr_matrix:
+    """Cosine co-occurrence between recipes, keeping the top `neighbors` per recipe"""
+    cooccurrence = (favorites.T @ favorites).tocsr().astype(np.float32)
+    counts = np.asarray(favorites.sum(axis=0)).ravel().astype(np.float32)
+    inverse_norm = sparse.diags(1.0 / np.sqrt(np.maximum(counts, 1.0)))
+    similarity = (inverse_norm @ cooccurrence @ inverse_norm).tocsr()
+    similarity.setdiag(0)
+    similarity.eliminate_zeros()
+    return _top_per_row(similarity, neighbors)
+
+
+def _top_per_row(matrix: sparse.csr_matrix, k: int) -> sparse.csr_matrix:
+    """Keep the k largest entries of every row"""
+    indptr, data = matrix.indptr, matrix.data
+    keep = np.ones(len(data), dtype=bool)
+    lengths = np.diff(indptr)
+    for row in np.flatnonzero(lengths > k):
+        start, end = indptr[row], indptr[row + 1]
+        drop = np.argpartition(data[start:end], lengths[row] - k)[:lengths[row] - k]
+        keep[start + drop] = False
+    if keep.all():
+        return matrix
+    pruned = matrix.copy()
+    pruned.data[~keep] = 0
+    pruned.eliminate_zeros()
+    return pruned
+
+
+def top_n_per_user(favorites: sparse.csr_matrix, similarity: sparse.csr_matrix,
+                   n: int) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """(user row, recipe columns, scores) best first, excluding recipes already favorited"""
+    for start in range(0, favorites.shape[0], USER_CHUNK):
+        chunk = favorites[start:start + USER_CHUNK]
+        scores = (chunk @ similarity).tocsr()
+        # Already-favorited recipes drop out: subtract their own scores
+        scores = (scores - scores.multiply(chunk)).tocsr()
+        scores.eliminate_zeros()
+        indptr, indices, data = scores.indptr, scores.indices, scores.data
+        for offset in range(chunk.shape[0]):
+            begin, end = indptr[offset], indptr[offset + 1]
+            if begin == end:
+                continue
+            row_scores = data[begin:end]
+            if end - begin > n:
+                top = np.argpartition(-row_scores, n - 1)[:n]
+            else:
+                top = np.arange(end - begin)
+            top = top[np.argsort(-row_scores[top], kind='stable')]
+            yield start + offset, indices[begin:end][top], row_scores[top]
+
+
+def recommendations(matrix: FavoritesMatrix, n: int, neighbors: int) -> Iterator[Tuple[str, List[str], List[float]]]:
+    """(user_id, recipe_ids, scores) for every user with at least one candidate"""
+    favorites = matrix.build()
+    similarity = item_similarity(favorites, neighbors)
+    user_ids = np.empty(len(matrix.user_index), dtype=object)
+    for user_id, row in matrix.user_index.items():
+        user_ids[row] = user_id
+    recipe_ids = np.empty(len(matrix.recipe_index), dtype=object)
+    for recipe_id, column in matrix.recipe_index.items():
+        recipe_ids[column] = recipe_id
+
+    for row, columns, scores in top_n_per_user(favorites, similarity, n):
+        yield user_ids[row], recipe_ids[columns].tolist(), scores.tolist()
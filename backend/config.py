@@ -2,7 +2,9 @@
 Configuration settings for Daily Bread backend
 """
 import os
-from typing import Optional
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -18,19 +20,94 @@ class Settings(BaseSettings):
     USER_FAVORITES_TABLE: str = os.getenv("USER_FAVORITES_TABLE", "dailybread-user-favorites")
     ORDERS_TABLE: str = os.getenv("ORDERS_TABLE", "dailybread-orders")
     MEAL_PLANS_TABLE: str = os.getenv("MEAL_PLANS_TABLE", "dailybread-meal-plans")
+    RECIPE_SEARCH_TABLE: str = os.getenv("RECIPE_SEARCH_TABLE", "dailybread-recipe-search-index")
+    RECOMMENDATION_CACHE_TABLE: str = os.getenv("RECOMMENDATION_CACHE_TABLE", "dailybread-recommendation-cache")
+    USER_EMAILS_TABLE: str = os.getenv("USER_EMAILS_TABLE", "dailybread-user-emails")
+    USER_RECOMMENDATIONS_TABLE: str = os.getenv("USER_RECOMMENDATIONS_TABLE", "dailybread-user-recommendations")
+    # Set once scripts/backfill_email_locks.py has run: every account then has
+    # an email lock, and registration and login skip the EmailIndex fallback
+    EMAIL_LOCKS_BACKFILLED: bool = os.getenv("EMAIL_LOCKS_BACKFILLED", "false").lower() == "true"
     
     # S3 Buckets
     CONTENT_BUCKET: str = os.getenv("CONTENT_BUCKET", "dailybread-content")
     USER_UPLOADS_BUCKET: str = os.getenv("USER_UPLOADS_BUCKET", "dailybread-user-uploads")
     
+    # Concurrent DynamoDB fan-out (multi-category queries)
+    DYNAMODB_QUERY_WORKERS: int = int(os.getenv("DYNAMODB_QUERY_WORKERS", "8"))
+    
+    # Recipe catalog cache (per warm container)
+    CATALOG_CACHE_SIZE: int = int(os.getenv("CATALOG_CACHE_SIZE", "2048"))
+    CATALOG_CACHE_TTL_SECONDS: int = int(os.getenv("CATALOG_CACHE_TTL_SECONDS", "300"))
+    CATALOG_VERSION_CHECK_SECONDS: int = int(os.getenv("CATALOG_VERSION_CHECK_SECONDS", "5"))
+    
+    # Recipe similarity index artifact in CONTENT_BUCKET
+    SIMILARITY_INDEX_KEY: str = os.getenv("SIMILARITY_INDEX_KEY", "indexes/recipe-similarity.npz")
+    SIMILARITY_INDEX_MAX_AGE_SECONDS: int = int(os.getenv("SIMILARITY_INDEX_MAX_AGE_SECONDS", "3600"))
+    
+    # Table exports (gzip NDJSON) in CONTENT_BUCKET, shared through presigned links
+    EXPORT_PREFIX: str = os.getenv("EXPORT_PREFIX", "exports/")
+    EXPORT_PART_SIZE_MB: int = int(os.getenv("EXPORT_PART_SIZE_MB", "8"))
+    EXPORT_URL_EXPIRE_SECONDS: int = int(os.getenv("EXPORT_URL_EXPIRE_SECONDS", "3600"))
+    
+    # Columnar catalog snapshot in CONTENT_BUCKET, mapped from a local copy
+    CATALOG_SNAPSHOT_KEY: str = os.getenv("CATALOG_SNAPSHOT_KEY", "indexes/recipe-catalog.snap")
+    CATALOG_SNAPSHOT_DIR: str = os.getenv("CATALOG_SNAPSHOT_DIR", "/tmp")
+    
     # Authentication
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 24 hours
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # Verified tokens are cached until they expire; invalid ones briefly
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+    TOKEN_NEGATIVE_CACHE_SECONDS: int = int(os.getenv("TOKEN_NEGATIVE_CACHE_SECONDS", "30"))
+    # Password hashing: bcrypt rounds are calibrated per container to the
+    # target latency unless BCRYPT_ROUNDS pins them; hashes below the
+    # minimum are upgraded on the next successful login. The floor is the
+    # cost used before calibration, so calibration never weakens hashes
+    BCRYPT_ROUNDS: Optional[int] = int(os.environ["BCRYPT_ROUNDS"]) if os.getenv("BCRYPT_ROUNDS") else None
+    BCRYPT_MIN_ROUNDS: int = int(os.getenv("BCRYPT_MIN_ROUNDS", "12"))
+    BCRYPT_MAX_ROUNDS: int = int(os.getenv("BCRYPT_MAX_ROUNDS", "14"))
+    PASSWORD_HASH_TARGET_MS: float = float(os.getenv("PASSWORD_HASH_TARGET_MS", "250"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
     
     # OpenAI API (for AI recommendations)
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
+    OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    OPENAI_MAX_OUTPUT_TOKENS: int = int(os.getenv("OPENAI_MAX_OUTPUT_TOKENS", "800"))
+    OPENAI_TIMEOUT_SECONDS: float = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "20"))
+    # Hedging: answer with rule-based results if the model is slower than this
+    # and release the generation lease so other containers can try
+    RECOMMENDATION_HEDGE_ENABLED: bool = os.getenv("RECOMMENDATION_HEDGE_ENABLED", "false").lower() == "true"
+    RECOMMENDATION_HEDGE_SECONDS: float = float(os.getenv("RECOMMENDATION_HEDGE_SECONDS", "4"))
+    
+    # Recommendation cache (in-process LRU + DynamoDB table)
+    RECOMMENDATION_CACHE_SIZE: int = int(os.getenv("RECOMMENDATION_CACHE_SIZE", "512"))
+    RECOMMENDATION_CACHE_TTL_SECONDS: int = int(os.getenv("RECOMMENDATION_CACHE_TTL_SECONDS", str(60 * 60 * 24)))
+    
+    # Model call budget per container; over budget degrades to rule-based
+    OPENAI_MAX_REQUESTS_PER_SECOND: float = float(os.getenv("OPENAI_MAX_REQUESTS_PER_SECOND", "2"))
+    OPENAI_MAX_TOKENS_PER_MINUTE: int = int(os.getenv("OPENAI_MAX_TOKENS_PER_MINUTE", "40000"))
+    # How long a container waits for another one generating the same fingerprint
+    RECOMMENDATION_LEASE_SECONDS: int = int(os.getenv("RECOMMENDATION_LEASE_SECONDS", "30"))
+    RECOMMENDATION_LEASE_WAIT_SECONDS: float = float(os.getenv("RECOMMENDATION_LEASE_WAIT_SECONDS", "5"))
+    
+    # Offline jobs: scan parallelism and write rate (writes per second)
+    JOB_SCAN_SEGMENTS: int = int(os.getenv("JOB_SCAN_SEGMENTS", "4"))
+    JOB_WRITES_PER_SECOND: float = float(os.getenv("JOB_WRITES_PER_SECOND", "50"))
+    
+    # Nightly recommendation pre-generation: plan lifetime, worker processes
+    # for rule-based scoring (0 = in-process) and concurrent model calls
+    DAILY_PLAN_TTL_SECONDS: int = int(os.getenv("DAILY_PLAN_TTL_SECONDS", str(60 * 60 * 36)))
+    PREGENERATE_PROCESSES: int = int(os.getenv("PREGENERATE_PROCESSES", "0"))
+    PREGENERATE_MODEL_CONCURRENCY: int = int(os.getenv("PREGENERATE_MODEL_CONCURRENCY", "4"))
+    
+    # Favorites-based recommendations: recipes kept per user, neighbours kept
+    # per recipe, list lifetime, and the macro-fit distance a top pick may win by
+    USER_RECOMMENDATIONS_TOP_N: int = int(os.getenv("USER_RECOMMENDATIONS_TOP_N", "50"))
+    ITEM_NEIGHBORS: int = int(os.getenv("ITEM_NEIGHBORS", "50"))
+    USER_RECOMMENDATIONS_TTL_SECONDS: int = int(os.getenv("USER_RECOMMENDATIONS_TTL_SECONDS", str(60 * 60 * 24 * 3)))
+    FAVORITES_BLEND_WEIGHT: float = float(os.getenv("FAVORITES_BLEND_WEIGHT", "0.1"))
     
     # Stripe (for payments)
     STRIPE_SECRET_KEY: Optional[str] = os.getenv("STRIPE_SECRET_KEY")
@@ -50,4 +127,43 @@ class Settings(BaseSettings):
         case_sensitive = True
 
 
-settings = Settings()
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """Build settings from the environment on first use"""
+    return Settings()
+
+
+class _LazySettings:
+    """Proxy that defers reading the environment until a setting is accessed"""
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_settings(), name)
+
+
+settings = _LazySettings()
+
+
+class LazyObject:
+    """Proxy for a module-level object that is built on first attribute access
+    
+    Lets caches and clients sized from settings be declared at import time
+    without building Settings during a cold start.
+    """
+    
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._target = None
+        self._lock = threading.Lock()
+    
+    def _get(self) -> Any:
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    self._target = self._factory()
+        return self._target
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._get(), name)
+    
+    def __len__(self) -> int:
+        return len(self._get())
@@ -0,0 +1,17 @@
+"""
+Lenient conversions for values read from DynamoDB items
+
+Numbers arrive as Decimal, and older or hand-written items may hold
+strings, empty values or nothing at all.
+"""
+from typing import Any
+
+
+def to_float(value: Any, default: float = 0.0) -> float:
+    """float(value), or `default` when it is missing or not a number"""
+    if value is None or value == '':
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
@@ -1,68 +1,231 @@
 """
 Database utilities for DynamoDB operations
 """
+import base64
+import json
+import random
+import threading
+import time
 import boto3
 from boto3.dynamodb.conditions import Key, Attr
-from typing import Dict, List, Optional, Any
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Any, Iterator, Tuple
 from config import settings
 from datetime import datetime
 import uuid
 
+# DynamoDB limits
+BATCH_GET_LIMIT = 100
+
 
 class DynamoDBClient:
     def __init__(self):
-        self.dynamodb = boto3.resource('dynamodb', region_name=settings.AWS_REGION)
+        self._dynamodb = None
+        self._executor = None
+    
+    @property
+    def dynamodb(self):
+        """DynamoDB service resource, built on first use"""
+        if self._dynamodb is None:
+            self._dynamodb = boto3.resource(
+                'dynamodb',
+                region_name=settings.AWS_REGION,
+                # Room for every fan-out worker to hold a connection at once
+                config=Config(max_pool_connections=max(10, settings.DYNAMODB_QUERY_WORKERS))
+            )
+        return self._dynamodb
+    
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Bounded worker pool for concurrent requests, built on first use"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.DYNAMODB_QUERY_WORKERS,
+                thread_name_prefix='dynamodb'
+            )
+        return self._executor
         
     def get_table(self, table_name: str):
         """Get DynamoDB table resource"""
         return self.dynamodb.Table(table_name)
     
-    def put_item(self, table_name: str, item: Dict) -> Dict:
-        """Insert or update an item"""
+    def put_item(self, table_name: str, item: Dict,
+                 condition_expression: Optional[Any] = None) -> Dict:
+        """Insert or update an item, optionally only when a condition holds"""
         table = self.get_table(table_name)
-        table.put_item(Item=item)
+        kwargs = {'Item': item}
+        if condition_expression is not None:
+            kwargs['ConditionExpression'] = condition_expression
+        table.put_item(**kwargs)
         return item
     
-    def get_item(self, table_name: str, key: Dict) -> Optional[Dict]:
+    def get_item(self, table_name: str, key: Dict, consistent_read: bool = False) -> Optional[Dict]:
         """Get a single item by primary key"""
         table = self.get_table(table_name)
-        response = table.get_item(Key=key)
+        response = table.get_item(Key=key, ConsistentRead=consistent_read)
         return response.get('Item')
     
+    def transact_write(self, operations: List[Dict]) -> None:
+        """Apply up to 100 Put/Update/Delete/ConditionCheck operations atomically
+        
+        Raises ClientError TransactionCanceledException if any condition fails.
+        """
+        # The resource's client serializes plain Python values in the items
+        self.dynamodb.meta.client.transact_write_items(TransactItems=operations)
+    
     def query(self, table_name: str, key_condition: Any, 
               index_name: Optional[str] = None) -> List[Dict]:
-        """Query items"""
-        table = self.get_table(table_name)
-        
-        kwargs = {'KeyConditionExpression': key_condition}
+        """Query items, following pagination to the end"""
+        return list(self.iter_query(table_name, key_condition, index_name))
+    
+    def scan(self, table_name: str, filter_expression: Optional[Any] = None) -> List[Dict]:
+        """Scan table, following pagination to the end"""
+        return list(self.iter_scan(table_name, filter_expression))
+    
+    def iter_query(self, table_name: str, key_condition: Any,
+                   index_name: Optional[str] = None, limit: Optional[int] = None,
+                   **kwargs) -> Iterator[Dict]:
+        """Lazily yield query results, fetching `limit` items per request"""
+        kwargs['KeyConditionExpression'] = key_condition
         if index_name:
             kwargs['IndexName'] = index_name
-            
-        response = table.query(**kwargs)
-        return response.get('Items', [])
+        for items, _ in self._iter_pages(self.get_table(table_name).query, limit, kwargs):
+            yield from items
     
-    def scan(self, table_name: str, filter_expression: Optional[Any] = None) -> List[Dict]:
-        """Scan table"""
-        table = self.get_table(table_name)
-        
-        kwargs = {}
+    def iter_scan(self, table_name: str, filter_expression: Optional[Any] = None,
+                  limit: Optional[int] = None, **kwargs) -> Iterator[Dict]:
+        """Lazily yield scan results, fetching `limit` items per request"""
         if filter_expression:
             kwargs['FilterExpression'] = filter_expression
-            
-        response = table.scan(**kwargs)
-        return response.get('Items', [])
+        for items, _ in self._iter_pages(self.get_table(table_name).scan, limit, kwargs):
+            yield from items
+    
+    def query_page(self, table_name: str, key_condition: Any,
+                   index_name: Optional[str] = None, limit: Optional[int] = None,
+                   start_key: Optional[Dict] = None,
+                   **kwargs) -> Tuple[List[Dict], Optional[Dict]]:
+        """Fetch a single page of query results and the key to resume from"""
+        kwargs['KeyConditionExpression'] = key_condition
+        if index_name:
+            kwargs['IndexName'] = index_name
+        if start_key:
+            kwargs['ExclusiveStartKey'] = start_key
+        return next(self._iter_pages(self.get_table(table_name).query, limit, kwargs))
+    
+    def scan_page(self, table_name: str, filter_expression: Optional[Any] = None,
+                  limit: Optional[int] = None, start_key: Optional[Dict] = None,
+                  **kwargs) -> Tuple[List[Dict], Optional[Dict]]:
+        """Fetch a single page of scan results and the key to resume from"""
+        if filter_expression:
+            kwargs['FilterExpression'] = filter_expression
+        if start_key:
+            kwargs['ExclusiveStartKey'] = start_key
+        return next(self._iter_pages(self.get_table(table_name).scan, limit, kwargs))
+    
+    def query_many(self, table_name: str, key_conditions: List[Any],
+                   index_name: Optional[str] = None, limit: Optional[int] = None,
+                   start_keys: Optional[List[Optional[Dict]]] = None,
+                   **kwargs) -> List[List[Dict]]:
+        """Run several queries concurrently, returning one result list per condition
+        
+        Table resources are not thread-safe, so workers share the resource's
+        low-level client (and its connection pool) instead. Each query stops
+        after `limit` items when given, and starts after its entry in
+        `start_keys` when that is set.
+        """
+        start_keys = start_keys or [None] * len(key_conditions)
+        futures = [
+            self.executor.submit(
+                self._client_query, table_name, condition, index_name, limit,
+                dict(kwargs, ExclusiveStartKey=start_key) if start_key else dict(kwargs)
+            )
+            for condition, start_key in zip(key_conditions, start_keys)
+        ]
+        return [future.result() for future in futures]
+    
+    def _client_query(self, table_name: str, key_condition: Any, index_name: Optional[str],
+                      limit: Optional[int], kwargs: Dict) -> List[Dict]:
+        """Query through the thread-safe low-level client
+        
+        The resource's client carries boto3's transformation hooks, so it
+        accepts condition objects and returns deserialized items just like
+        Table.query.
+        """
+        kwargs.update({'TableName': table_name, 'KeyConditionExpression': key_condition})
+        if index_name:
+            kwargs['IndexName'] = index_name
+        
+        client = self.dynamodb.meta.client
+        items: List[Dict] = []
+        while True:
+            if limit:
+                kwargs['Limit'] = limit - len(items)
+            response = client.query(**kwargs)
+            items.extend(response.get('Items', []))
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key or (limit and len(items) >= limit):
+                return items
+            kwargs['ExclusiveStartKey'] = last_key
+    
+    def scan_segments(self, table_name: str, total_segments: int,
+                      handle_page: Callable[[List[Dict]], Any],
+                      limit: Optional[int] = None, **kwargs) -> int:
+        """Parallel scan: one worker per segment calls handle_page(items) per page
+        
+        handle_page runs on worker threads and must be thread-safe. Returns
+        the number of items scanned.
+        """
+        def scan_segment(segment: int) -> int:
+            request = dict(kwargs, TableName=table_name, Segment=segment, TotalSegments=total_segments)
+            client = self.dynamodb.meta.client
+            scanned = 0
+            for items, _ in self._iter_pages(client.scan, limit, request):
+                scanned += len(items)
+                handle_page(items)
+            return scanned
+        
+        with ThreadPoolExecutor(max_workers=total_segments, thread_name_prefix='scan-segment') as pool:
+            return sum(pool.map(scan_segment, range(total_segments)))
+    
+    @staticmethod
+    def _iter_pages(operation: Any, limit: Optional[int],
+                    kwargs: Dict) -> Iterator[Tuple[List[Dict], Optional[Dict]]]:
+        """Call a query/scan operation repeatedly until LastEvaluatedKey runs out"""
+        if limit:
+            kwargs['Limit'] = limit
+        while True:
+            response = operation(**kwargs)
+            last_key = response.get('LastEvaluatedKey')
+            yield response.get('Items', []), last_key
+            if not last_key:
+                return
+            kwargs['ExclusiveStartKey'] = last_key
     
     def update_item(self, table_name: str, key: Dict, 
                    update_expression: str, 
-                   expression_values: Dict) -> Dict:
-        """Update an item"""
+                   expression_values: Dict,
+                   expression_names: Optional[Dict[str, str]] = None,
+                   condition_expression: Optional[Any] = None) -> Dict:
+        """Update an item, optionally only when a condition holds
+        
+        Use `expression_names` placeholders for attribute names that are
+        DynamoDB reserved words (name, status, ...).
+        """
         table = self.get_table(table_name)
-        response = table.update_item(
-            Key=key,
-            UpdateExpression=update_expression,
-            ExpressionAttributeValues=expression_values,
-            ReturnValues='ALL_NEW'
-        )
+        kwargs = {
+            'Key': key,
+            'UpdateExpression': update_expression,
+            'ExpressionAttributeValues': expression_values,
+            'ReturnValues': 'ALL_NEW'
+        }
+        if expression_names:
+            kwargs['ExpressionAttributeNames'] = expression_names
+        if condition_expression is not None:
+            kwargs['ConditionExpression'] = condition_expression
+        response = table.update_item(**kwargs)
         return response.get('Attributes', {})
     
     def delete_item(self, table_name: str, key: Dict) -> bool:
@@ -70,15 +233,91 @@ class DynamoDBClient:
         table = self.get_table(table_name)
         table.delete_item(Key=key)
         return True
+    
+    def batch_get(self, table_name: str, keys: List[Dict],
+                  attributes: Optional[List[str]] = None,
+                  max_retries: int = 8) -> List[Dict]:
+        """Fetch many items by primary key, in request order
+        
+        Keys are de-duplicated and sent in chunks of 100; unprocessed keys are
+        retried with exponential backoff. Keys with no item are skipped.
+        """
+        ordered = list({_key_id(key): key for key in keys}.items())
+        found: Dict[Tuple, Dict] = {}
+        
+        for start in range(0, len(ordered), BATCH_GET_LIMIT):
+            chunk = [key for _, key in ordered[start:start + BATCH_GET_LIMIT]]
+            request = {table_name: _batch_get_request(chunk, attributes)}
+            for item in self._batch_get_all(request, max_retries).get(table_name, []):
+                found[_key_id(item, chunk[0])] = item
+        
+        return [found[key_id] for key_id, _ in ordered if key_id in found]
+    
+    def get_items(self, requests: Dict[str, Tuple[Dict, Optional[List[str]]]],
+                  max_retries: int = 8) -> Dict[str, Optional[Dict]]:
+        """Fetch one item from each of several tables in a single BatchGetItem
+        
+        `requests` maps table name to (key, attributes); attributes=None reads
+        the whole item. Tables with no matching item map to None.
+        """
+        request_items = {
+            table_name: _batch_get_request([key], attributes)
+            for table_name, (key, attributes) in requests.items()
+        }
+        results = self._batch_get_all(request_items, max_retries)
+        return {table_name: (results.get(table_name) or [None])[0] for table_name in requests}
+    
+    def _batch_get_all(self, request_items: Dict[str, Dict],
+                       max_retries: int) -> Dict[str, List[Dict]]:
+        """Run one BatchGetItem request, retrying UnprocessedKeys until done"""
+        results: Dict[str, List[Dict]] = {}
+        attempt = 0
+        while request_items:
+            response = self.dynamodb.batch_get_item(RequestItems=request_items)
+            for table_name, items in response.get('Responses', {}).items():
+                results.setdefault(table_name, []).extend(items)
+            
+            request_items = response.get('UnprocessedKeys') or {}
+            if request_items:
+                if attempt >= max_retries:
+                    raise RuntimeError(
+                        f"BatchGetItem left unprocessed keys after {max_retries} retries"
+                    )
+                # Full jitter backoff: 50ms, 100ms, 200ms ... capped at 2s
+                time.sleep(random.uniform(0, min(2.0, 0.05 * 2 ** attempt)))
+                attempt += 1
+        return results
+    
+    def batch_write(self, table_name: str, put_items: Optional[List[Dict]] = None,
+                    delete_keys: Optional[List[Dict]] = None) -> int:
+        """Put and delete items in batches of 25, retrying unprocessed items"""
+        table = self.get_table(table_name)
+        count = 0
+        with table.batch_writer() as batch:
+            for item in put_items or []:
+                batch.put_item(Item=item)
+                count += 1
+            for key in delete_keys or []:
+                batch.delete_item(Key=key)
+                count += 1
+        return count
 
 
 class S3Client:
     def __init__(self):
-        self.s3 = boto3.client('s3', region_name=settings.AWS_REGION)
+        self._s3 = None
+    
+    @property
+    def s3(self):
+        """S3 client, built on first use"""
+        if self._s3 is None:
+            self._s3 = boto3.client('s3', region_name=settings.AWS_REGION)
+        return self._s3
     
-    def upload_file(self, file_content: bytes, bucket: str, key: str) -> str:
+    def upload_file(self, file_content: bytes, bucket: str, key: str,
+                    metadata: Optional[Dict[str, str]] = None) -> str:
         """Upload file to S3"""
-        self.s3.put_object(Bucket=bucket, Key=key, Body=file_content)
+        self.s3.put_object(Bucket=bucket, Key=key, Body=file_content, Metadata=metadata or {})
         return f"s3://{bucket}/{key}"
     
     def get_file(self, bucket: str, key: str) -> bytes:
@@ -86,11 +325,25 @@ class S3Client:
         response = self.s3.get_object(Bucket=bucket, Key=key)
         return response['Body'].read()
     
+    def download_file(self, bucket: str, key: str, path: str) -> str:
+        """Stream an object to a local file without holding it in memory"""
+        self.s3.download_file(bucket, key, path)
+        return path
+    
+    def get_metadata(self, bucket: str, key: str) -> Dict[str, str]:
+        """User metadata of an object, without downloading it"""
+        return self.s3.head_object(Bucket=bucket, Key=key).get('Metadata', {})
+    
     def delete_file(self, bucket: str, key: str) -> bool:
         """Delete file from S3"""
         self.s3.delete_object(Bucket=bucket, Key=key)
         return True
     
+    def multipart_upload(self, bucket: str, key: str, content_type: str) -> 'MultipartUpload':
+        """Start a multipart upload; parts may be uploaded from several threads"""
+        response = self.s3.create_multipart_upload(Bucket=bucket, Key=key, ContentType=content_type)
+        return MultipartUpload(self.s3, bucket, key, response['UploadId'])
+    
     def generate_presigned_url(self, bucket: str, key: str, expiration: int = 3600) -> str:
         """Generate presigned URL for file access"""
         url = self.s3.generate_presigned_url(
@@ -101,7 +354,44 @@ class S3Client:
         return url
 
 
-# Singleton instances
+class MultipartUpload:
+    """An in-progress S3 multipart upload
+    
+    Every part but the last must be at least 5 MiB. Parts are assembled in
+    part-number order, whatever order they were uploaded in.
+    """
+    
+    def __init__(self, s3: Any, bucket: str, key: str, upload_id: str):
+        self.s3 = s3
+        self.bucket = bucket
+        self.key = key
+        self.upload_id = upload_id
+        self._etags: Dict[int, str] = {}
+        self._lock = threading.Lock()
+    
+    def upload_part(self, part_number: int, body: bytes) -> None:
+        response = self.s3.upload_part(
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id,
+            PartNumber=part_number, Body=body
+        )
+        with self._lock:
+            self._etags[part_number] = response['ETag']
+    
+    def complete(self) -> str:
+        parts = [{'PartNumber': number, 'ETag': etag} for number, etag in sorted(self._etags.items())]
+        self.s3.complete_multipart_upload(
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id,
+            MultipartUpload={'Parts': parts}
+        )
+        return f"s3://{self.bucket}/{self.key}"
+    
+    def abort(self) -> None:
+        """Discard uploaded parts so they stop accruing storage"""
+        self.s3.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+
+
+# Singleton instances; the underlying boto3 objects are created lazily so
+# handlers that never touch S3 do not pay for an S3 client at cold start
 db_client = DynamoDBClient()
 s3_client = S3Client()
 
@@ -114,3 +404,84 @@ def generate_id() -> str:
 def get_timestamp() -> int:
     """Get current timestamp"""
     return int(datetime.utcnow().timestamp())
+
+
+def is_condition_failure(error: Exception) -> bool:
+    """True when a write was rejected by its ConditionExpression"""
+    return (
+        isinstance(error, ClientError) and
+        error.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException'
+    )
+
+
+def to_dynamodb(value: Any) -> Any:
+    """Convert floats, which DynamoDB rejects, to Decimal throughout a value"""
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {key: to_dynamodb(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_dynamodb(item) for item in value]
+    return value
+
+
+def transaction_cancellation_reasons(error: Exception) -> List[Optional[str]]:
+    """Per-operation cancellation codes of a failed transact_write, [] otherwise"""
+    if not isinstance(error, ClientError) or error.response.get('Error', {}).get('Code') != 'TransactionCanceledException':
+        return []
+    return [reason.get('Code') for reason in error.response.get('CancellationReasons', [])]
+
+
+def transact_put(table_name: str, item: Dict, condition_expression: Optional[str] = None) -> Dict:
+    """Put operation for DynamoDBClient.transact_write
+    
+    Condition objects are only serialized at the top level of a request, so
+    the condition here is an expression string.
+    """
+    put = {'TableName': table_name, 'Item': item}
+    if condition_expression is not None:
+        put['ConditionExpression'] = condition_expression
+    return {'Put': put}
+
+
+def _key_id(item: Dict, key: Optional[Dict] = None) -> Tuple:
+    """Hashable identity of an item's primary key (key names taken from `key`)"""
+    names = sorted((key or item).keys())
+    return tuple((name, item.get(name)) for name in names)
+
+
+def _batch_get_request(keys: List[Dict], attributes: Optional[List[str]]) -> Dict:
+    """BatchGetItem table entry, projecting `attributes` plus the key attributes"""
+    request: Dict[str, Any] = {'Keys': keys}
+    if attributes:
+        names = list(dict.fromkeys(list(attributes) + sorted(keys[0].keys())))
+        placeholders = {f'#a{i}': name for i, name in enumerate(names)}
+        request['ProjectionExpression'] = ', '.join(placeholders)
+        request['ExpressionAttributeNames'] = placeholders
+    return request
+
+
+def encode_cursor(last_key: Optional[Dict]) -> Optional[str]:
+    """Encode a LastEvaluatedKey as an opaque URL-safe cursor"""
+    if not last_key:
+        return None
+    raw = json.dumps(
+        last_key,
+        separators=(',', ':'),
+        default=lambda value: int(value) if value == value.to_integral_value() else float(value)
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Dict]:
+    """Decode a cursor from encode_cursor back into an ExclusiveStartKey"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        key = json.loads(raw, parse_float=Decimal)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(key, dict):
+        raise ValueError("Invalid cursor")
+    return key
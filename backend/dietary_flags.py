@@ -0,0 +1,224 @@
+"""
+Allergen and dietary-tag bitmasks for recipes
+
+Each recipe carries a `dietary_flags` integer computed when it is written:
+allergen bits come from its ingredients, diet bits from its tags. A
+profile's allergies and dietary preferences become a (required, forbidden)
+pair of masks, so "safe for this user" is a bitwise test per recipe.
+"""
+import re
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Allergen bits: set when any ingredient names one of the keywords as a
+# whole word (plurals included), so "butternut" is not butter and "veggie"
+# is not egg. Dishes and products made from an allergen are listed too,
+# since ingredients are often written as "penne" or "parmesan".
+ALLERGENS = {
+    'nuts': (0, ('nut', 'almond', 'walnut', 'cashew', 'pecan', 'pistachio', 'hazelnut',
+                 'filbert', 'macadamia', 'brazil nut', 'pine nut', 'tree nut', 'praline',
+                 'marzipan', 'frangipane', 'gianduja', 'nutella', 'pesto')),
+    'peanuts': (1, ('peanut', 'groundnut', 'satay')),
+    'gluten': (2, ('wheat', 'barley', 'rye', 'flour', 'bread', 'breadcrumb', 'panko', 'crouton',
+                   'pasta', 'spaghetti', 'penne', 'linguine', 'fettuccine', 'fettuccini',
+                   'tagliatelle', 'pappardelle', 'macaroni', 'lasagna', 'lasagne', 'ravioli',
+                   'tortellini', 'gnocchi', 'orzo', 'rigatoni', 'fusilli', 'farfalle', 'rotini',
+                   'noodle', 'udon', 'ramen', 'soba', 'couscous', 'bulgur', 'semolina', 'durum',
+                   'spelt', 'farro', 'freekeh', 'kamut', 'seitan', 'malt', 'beer', 'wrap', 'tortilla',
+                   'pita', 'naan', 'bagel', 'bun', 'roll', 'baguette', 'ciabatta', 'focaccia',
+                   'brioche', 'sourdough', 'toast', 'croissant', 'muffin', 'pancake', 'waffle', 'cracker',
+                   'biscuit', 'cookie', 'cake', 'pastry', 'pastries', 'pie crust', 'pizza',
+                   'dumpling', 'wonton', 'granola', 'soy sauce', 'teriyaki')),
+    'dairy': (3, ('milk', 'buttermilk', 'cheese', 'butter', 'cream', 'yogurt', 'yoghurt', 'whey',
+                  'ghee', 'casein', 'kefir', 'curd', 'custard', 'parmesan', 'parmigiano', 'pecorino',
+                  'mozzarella', 'burrata', 'feta', 'cheddar', 'ricotta', 'mascarpone', 'brie',
+                  'camembert', 'gouda', 'gruyere', 'gruyère', 'emmental', 'provolone', 'halloumi',
+                  'paneer', 'manchego', 'stilton', 'gorgonzola', 'roquefort', 'queso', 'labneh',
+                  'quark', 'skyr', 'creme fraiche', 'crème fraîche', 'bechamel', 'béchamel',
+                  'alfredo', 'tzatziki', 'raita', 'lassi')),
+    'eggs': (4, ('egg', 'eggnog', 'mayonnaise', 'mayo', 'aioli', 'hollandaise', 'bearnaise',
+                 'béarnaise', 'meringue', 'custard', 'frittata', 'omelet', 'omelette', 'quiche',
+                 'carbonara', 'brioche', 'eggwash')),
+    'soy': (5, ('soy', 'soya', 'soybean', 'tofu', 'tempeh', 'edamame', 'miso', 'natto',
+                'tamari', 'teriyaki')),
+    'fish': (6, ('fish', 'salmon', 'tuna', 'cod', 'haddock', 'pollock', 'hake', 'tilapia', 'trout',
+                 'sardine', 'anchovy', 'anchovies', 'mackerel', 'herring', 'halibut', 'snapper',
+                 'sea bass', 'swordfish', 'catfish', 'monkfish', 'mahi mahi', 'bonito', 'dashi',
+                 'caviar', 'roe', 'worcestershire', 'caesar dressing')),
+    'shellfish': (7, ('shellfish', 'shrimp', 'prawn', 'crab', 'lobster', 'crayfish', 'crawfish',
+                      'langoustine', 'scallop', 'mussel', 'clam', 'oyster', 'squid', 'calamari',
+                      'octopus')),
+    'sesame': (8, ('sesame', 'tahini', 'hummus', 'houmous', 'halva', 'halvah', 'gomasio'))
+}
+
+# Phrases that contain an allergen keyword without containing the allergen
+NOT_ALLERGEN = {
+    'nuts': ('nutritional yeast',),
+    'dairy': ('peanut butter', 'almond butter', 'cashew butter',
+              'nut butter', 'seed butter', 'apple butter', 'cocoa butter', 'shea butter',
+              'butter bean', 'coconut milk', 'almond milk', 'cashew milk', 'oat milk', 'soy milk',
+              'soya milk', 'rice milk', 'hemp milk', 'coconut cream', 'coconut yogurt',
+              'cream of tartar', 'vegan cheese', 'vegan butter', 'bean curd'),
+    'eggs': ('vegan mayo', 'vegan mayonnaise'),
+    'gluten': ('rice pasta', 'chickpea pasta', 'lentil pasta',
+               'rice noodle', 'glass noodle', 'shirataki noodle', 'kelp noodle', 'zucchini noodle',
+               'rice wrap', 'lettuce wrap', 'corn tortilla', 'rice cake', 'tamari')
+}
+
+# Labels that clear a whole ingredient of an allergen: "gluten free bread"
+FREE_FROM = {
+    'nuts': ('nut free',),
+    'peanuts': ('peanut free',),
+    'gluten': ('gluten free', 'wheat free'),
+    'dairy': ('dairy free', 'milk free'),
+    'eggs': ('egg free',),
+    'soy': ('soy free',)
+}
+
+# Diet bits: set when the recipe is tagged with the diet or one of its aliases
+DIETS = {
+    'vegan': (16, ('vegan', 'plant based')),
+    'vegetarian': (17, ('vegetarian', 'veggie')),
+    'pescatarian': (18, ('pescatarian',)),
+    'keto': (19, ('keto', 'ketogenic')),
+    'paleo': (20, ('paleo',)),
+    'gluten_free': (21, ('gluten free',)),
+    'dairy_free': (22, ('dairy free',)),
+    'low_carb': (23, ('low carb',)),
+    'high_protein': (24, ('high protein',))
+}
+
+# A recipe tagged with a diet also satisfies the broader diets it implies
+DIET_IMPLIES = {
+    'vegan': ('vegetarian', 'pescatarian', 'dairy_free'),
+    'vegetarian': ('pescatarian',)
+}
+
+# Allergy names users type, mapped to the allergen they mean
+ALLERGY_ALIASES = {
+    'nut': 'nuts', 'tree nuts': 'nuts', 'tree nut': 'nuts',
+    'peanut': 'peanuts',
+    'wheat': 'gluten', 'celiac': 'gluten',
+    'milk': 'dairy', 'lactose': 'dairy',
+    'egg': 'eggs',
+    'soya': 'soy',
+    'shrimp': 'shellfish'
+}
+
+# Allergy names that cover more than one allergen
+ALLERGY_GROUPS = {
+    'seafood': ('fish', 'shellfish')
+}
+
+# Longest keyword first, so "pine nut" wins over "nut" inside the alternation
+_ALLERGEN_PATTERNS = {
+    name: re.compile(r'\b(?:' + '|'.join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True))
+                     + r')(?:e?s)?\b')
+    for name, (_, keywords) in ALLERGENS.items()
+}
+_NOT_ALLERGEN_PATTERNS = {
+    name: re.compile(r'\b(?:' + '|'.join(re.escape(phrase) for phrase in phrases) + r')(?:e?s)?\b')
+    for name, phrases in NOT_ALLERGEN.items()
+}
+_FREE_FROM_PATTERNS = {
+    name: re.compile(r'\b(?:' + '|'.join(re.escape(label) for label in labels) + r')\b')
+    for name, labels in FREE_FROM.items()
+}
+_DIET_LOOKUP = {alias: name for name, (_, aliases) in DIETS.items() for alias in aliases + (name.replace('_', ' '),)}
+_SEPARATORS = re.compile(r'[\s_\-]+')
+
+
+def normalize_term(value: Any) -> str:
+    """Lowercase with runs of spaces, hyphens and underscores collapsed to one space"""
+    return _SEPARATORS.sub(' ', str(value).strip().lower()).strip()
+
+
+def normalize_tags(tags: Iterable[Any]) -> List[str]:
+    """Canonical tag list: lowercase, hyphenated, de-duplicated, in submitted order"""
+    normalized = (normalize_term(tag).replace(' ', '-') for tag in tags or [])
+    return list(dict.fromkeys(tag for tag in normalized if tag))
+
+
+def normalize_ingredients(ingredients: Iterable[Any]) -> List[str]:
+    """Ingredients stripped of surrounding and repeated whitespace"""
+    return [' '.join(str(ingredient).split()) for ingredient in ingredients or [] if str(ingredient).strip()]
+
+
+def allergen_bit(name: str) -> int:
+    return 1 << ALLERGENS[name][0]
+
+
+def diet_bit(name: str) -> int:
+    return 1 << DIETS[name][0]
+
+
+def recipe_flags(recipe: Dict[str, Any]) -> int:
+    """Bitmask of the allergens a recipe contains and the diets it is tagged with"""
+    flags = 0
+    ingredients = [normalize_term(ingredient) for ingredient in recipe.get('ingredients') or []]
+    for name, (bit, _) in ALLERGENS.items():
+        exempt = _NOT_ALLERGEN_PATTERNS.get(name)
+        free = _FREE_FROM_PATTERNS.get(name)
+        for ingredient in ingredients:
+            if free and free.search(ingredient):
+                continue
+            if exempt:
+                ingredient = exempt.sub(' ', ingredient)
+            if _ALLERGEN_PATTERNS[name].search(ingredient):
+                flags |= 1 << bit
+                break
+
+    for tag in recipe.get('tags') or []:
+        diet = _DIET_LOOKUP.get(normalize_term(tag))
+        if diet:
+            flags |= diet_bit(diet)
+            for implied in DIET_IMPLIES.get(diet, ()):
+                flags |= diet_bit(implied)
+    return flags
+
+
+def profile_masks(dietary_preferences: Iterable[Any],
+                  allergies: Iterable[Any]) -> Tuple[int, int, List[str], List[str]]:
+    """(required, forbidden) bits for a profile, plus terms no flag covers
+
+    Unknown preferences and allergies are returned so callers can fall back
+    to matching them as plain text.
+    """
+    required = forbidden = 0
+    unknown_preferences, unknown_allergies = [], []
+
+    for preference in dietary_preferences or []:
+        term = normalize_term(preference)
+        diet = _DIET_LOOKUP.get(term)
+        if diet:
+            required |= diet_bit(diet)
+        elif term:
+            unknown_preferences.append(term)
+
+    for allergy in allergies or []:
+        term = normalize_term(allergy)
+        if term in ALLERGY_GROUPS:
+            for allergen in ALLERGY_GROUPS[term]:
+                forbidden |= allergen_bit(allergen)
+            continue
+        allergen = term if term in ALLERGENS else ALLERGY_ALIASES.get(term)
+        if allergen:
+            forbidden |= allergen_bit(allergen)
+        elif term:
+            unknown_allergies.append(term)
+
+    return required, forbidden, unknown_preferences, unknown_allergies
+
+
+def is_safe(flags: int, required: int, forbidden: int) -> bool:
+    """Whether a recipe's flags satisfy a profile's masks"""
+    return flags & required == required and not flags & forbidden
+
+
+def normalize_recipe(recipe: Dict[str, Any]) -> Dict[str, Any]:
+    """Canonicalize tags and ingredients in place and stamp `dietary_flags`"""
+    if 'tags' in recipe:
+        recipe['tags'] = normalize_tags(recipe['tags'])
+    if 'ingredients' in recipe:
+        recipe['ingredients'] = normalize_ingredients(recipe['ingredients'])
+    recipe['dietary_flags'] = recipe_flags(recipe)
+    return recipe
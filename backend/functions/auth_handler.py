@@ -1,12 +1,15 @@
 """
 User authentication Lambda functions
 """
-import json
-from typing import Dict, Any
-from database import db_client, generate_id, get_timestamp
-from auth import get_password_hash, verify_password, create_access_token, create_refresh_token, decode_token
+from typing import Dict, Any, Optional
+from database import db_client, generate_id, get_timestamp, to_dynamodb, transact_put, transaction_cancellation_reasons
+from auth import get_password_hash, verify_and_update_password, create_access_token, create_refresh_token, decode_token, bearer_token, normalize_email, load_user
 from config import settings
+from api_responses import cors_headers, dumps, parse_body
 from boto3.dynamodb.conditions import Key
+from nutrition import nutrition_targets
+
+CORS_HEADERS = cors_headers('GET,POST,PUT,DELETE,OPTIONS')
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -16,13 +19,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         path = event.get('path', '')
         http_method = event.get('httpMethod', '')
         
-        # CORS headers
-        headers = {
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Headers': 'Content-Type,Authorization',
-            'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS',
-            'Content-Type': 'application/json'
-        }
+        headers = CORS_HEADERS
         
         # Handle OPTIONS for CORS
         if http_method == 'OPTIONS':
@@ -45,21 +42,21 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             return {
                 'statusCode': 404,
                 'headers': headers,
-                'body': json.dumps({'message': 'Not Found'})
+                'body': dumps({'message': 'Not Found'})
             }
             
     except Exception as e:
         return {
             'statusCode': 500,
             'headers': headers,
-            'body': json.dumps({'message': 'Internal Server Error', 'error': str(e)})
+            'body': dumps({'message': 'Internal Server Error', 'error': str(e)})
         }
 
 
 def register(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
     """Register a new user"""
     try:
-        body = json.loads(event.get('body', '{}'))
+        body = parse_body(event)
         
         email = body.get('email')
         password = body.get('password')
@@ -69,28 +66,23 @@ def register(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
             return {
                 'statusCode': 400,
                 'headers': headers,
-                'body': json.dumps({'message': 'Email and password required'})
+                'body': dumps({'message': 'Email and password required'})
             }
         
-        # Check if user already exists
-        existing_users = db_client.query(
-            settings.USERS_TABLE,
-            Key('email').eq(email),
-            index_name='EmailIndex'
-        )
-        
-        if existing_users:
+        # Accounts from before email locks may not be backfilled yet; until
+        # they are, the lock table alone cannot tell us the email is taken
+        if not settings.EMAIL_LOCKS_BACKFILLED and find_unlocked_user(email):
             return {
                 'statusCode': 409,
                 'headers': headers,
-                'body': json.dumps({'message': 'User already exists'})
+                'body': dumps({'message': 'User already exists'})
             }
         
         # Create user
         user_id = generate_id()
         user = {
             'user_id': user_id,
-            'email': email,
+            'email': normalize_email(email),
             'password_hash': get_password_hash(password),
             'name': name,
             'created_at': get_timestamp(),
@@ -98,8 +90,6 @@ def register(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
             'role': 'user'
         }
         
-        db_client.put_item(settings.USERS_TABLE, user)
-        
         # Create user profile
         profile = {
             'user_id': user_id,
@@ -111,10 +101,32 @@ def register(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
             'age': body.get('age'),
             'gender': body.get('gender'),
             'activity_level': body.get('activity_level', 'moderate'),
-            'created_at': get_timestamp()
+            'created_at': get_timestamp(),
+            'version': 1
         }
-        
-        db_client.put_item(settings.USER_PROFILES_TABLE, profile)
+        profile['nutrition_targets'] = nutrition_targets(profile)
+        profile = to_dynamodb(profile)
+        
+        # Email lock, user and profile in one round trip; the lock's condition
+        # makes the email unique even under concurrent sign-ups
+        try:
+            db_client.transact_write([
+                transact_put(
+                    settings.USER_EMAILS_TABLE,
+                    {'email': normalize_email(email), 'user_id': user_id, 'created_at': user['created_at']},
+                    'attribute_not_exists(email)'
+                ),
+                transact_put(settings.USERS_TABLE, user, 'attribute_not_exists(user_id)'),
+                transact_put(settings.USER_PROFILES_TABLE, profile)
+            ])
+        except Exception as e:
+            if transaction_cancellation_reasons(e)[:1] == ['ConditionalCheckFailed']:
+                return {
+                    'statusCode': 409,
+                    'headers': headers,
+                    'body': dumps({'message': 'User already exists'})
+                }
+            raise
         
         # Generate tokens
         access_token = create_access_token({"sub": user_id})
@@ -123,7 +135,7 @@ def register(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
         return {
             'statusCode': 201,
             'headers': headers,
-            'body': json.dumps({
+            'body': dumps({
                 'user_id': user_id,
                 'email': email,
                 'name': name,
@@ -137,14 +149,39 @@ def register(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
         return {
             'statusCode': 500,
             'headers': headers,
-            'body': json.dumps({'message': 'Registration failed', 'error': str(e)})
+            'body': dumps({'message': 'Registration failed', 'error': str(e)})
         }
 
 
+def find_user_by_email(email: str) -> Optional[Dict[str, Any]]:
+    """Resolve an email to its user through the strongly consistent lock item"""
+    lock = db_client.get_item(settings.USER_EMAILS_TABLE, {'email': normalize_email(email)}, consistent_read=True)
+    if lock:
+        return db_client.get_item(settings.USERS_TABLE, {'user_id': lock['user_id']}, consistent_read=True)
+    
+    if settings.EMAIL_LOCKS_BACKFILLED:
+        return None
+    return find_unlocked_user(email)
+
+
+def find_unlocked_user(email: str) -> Optional[Dict[str, Any]]:
+    """Look an email up on EmailIndex, for accounts created before email locks and not yet backfilled"""
+    # Older items stored the email as typed, newer ones normalized
+    for candidate in dict.fromkeys([normalize_email(email), email.strip()]):
+        users = db_client.query(
+            settings.USERS_TABLE,
+            Key('email').eq(candidate),
+            index_name='EmailIndex'
+        )
+        if users:
+            return users[0]
+    return None
+
+
 def login(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
     """Login user"""
     try:
-        body = json.loads(event.get('body', '{}'))
+        body = parse_body(event)
         
         email = body.get('email')
         password = body.get('password')
@@ -153,38 +190,45 @@ def login(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
             return {
                 'statusCode': 400,
                 'headers': headers,
-                'body': json.dumps({'message': 'Email and password required'})
+                'body': dumps({'message': 'Email and password required'})
             }
         
         # Find user by email
-        users = db_client.query(
-            settings.USERS_TABLE,
-            Key('email').eq(email),
-            index_name='EmailIndex'
-        )
+        user = find_user_by_email(email)
         
-        if not users:
+        if not user:
             return {
                 'statusCode': 401,
                 'headers': headers,
-                'body': json.dumps({'message': 'Invalid credentials'})
+                'body': dumps({'message': 'Invalid credentials'})
             }
         
-        user = users[0]
-        
         # Verify password
-        if not verify_password(password, user['password_hash']):
+        valid, new_hash = verify_and_update_password(password, user['password_hash'])
+        if not valid:
             return {
                 'statusCode': 401,
                 'headers': headers,
-                'body': json.dumps({'message': 'Invalid credentials'})
+                'body': dumps({'message': 'Invalid credentials'})
             }
         
+        if new_hash:
+            # Hash predates the current cost policy; upgrade it while we have the password
+            try:
+                db_client.update_item(
+                    settings.USERS_TABLE,
+                    {'user_id': user['user_id']},
+                    "SET password_hash = :password_hash",
+                    {':password_hash': new_hash}
+                )
+            except Exception as e:
+                print(f"Password rehash failed for {user['user_id']}: {e}")
+        
         if not user.get('is_active', True):
             return {
                 'statusCode': 403,
                 'headers': headers,
-                'body': json.dumps({'message': 'Account is inactive'})
+                'body': dumps({'message': 'Account is inactive'})
             }
         
         # Generate tokens
@@ -194,7 +238,7 @@ def login(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
         return {
             'statusCode': 200,
             'headers': headers,
-            'body': json.dumps({
+            'body': dumps({
                 'user_id': user['user_id'],
                 'email': user['email'],
                 'name': user.get('name'),
@@ -209,21 +253,21 @@ def login(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
         return {
             'statusCode': 500,
             'headers': headers,
-            'body': json.dumps({'message': 'Login failed', 'error': str(e)})
+            'body': dumps({'message': 'Login failed', 'error': str(e)})
         }
 
 
 def refresh_token(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
     """Refresh access token"""
     try:
-        body = json.loads(event.get('body', '{}'))
+        body = parse_body(event)
         refresh_token_str = body.get('refresh_token')
         
         if not refresh_token_str:
             return {
                 'statusCode': 400,
                 'headers': headers,
-                'body': json.dumps({'message': 'Refresh token required'})
+                'body': dumps({'message': 'Refresh token required'})
             }
         
         payload = decode_token(refresh_token_str)
@@ -232,7 +276,7 @@ def refresh_token(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, A
             return {
                 'statusCode': 401,
                 'headers': headers,
-                'body': json.dumps({'message': 'Invalid refresh token'})
+                'body': dumps({'message': 'Invalid refresh token'})
             }
         
         user_id = payload.get('sub')
@@ -241,7 +285,7 @@ def refresh_token(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, A
         return {
             'statusCode': 200,
             'headers': headers,
-            'body': json.dumps({
+            'body': dumps({
                 'access_token': access_token,
                 'token_type': 'bearer'
             })
@@ -251,54 +295,57 @@ def refresh_token(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, A
         return {
             'statusCode': 500,
             'headers': headers,
-            'body': json.dumps({'message': 'Token refresh failed', 'error': str(e)})
+            'body': dumps({'message': 'Token refresh failed', 'error': str(e)})
         }
 
 
 def get_current_user(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
-    """Get current user info"""
+    """Get current user info, with the profile too when called with ?include=profile"""
     try:
-        auth_header = event.get('headers', {}).get('Authorization', '')
+        token = bearer_token(event)
         
-        if not auth_header.startswith('Bearer '):
+        if not token:
             return {
                 'statusCode': 401,
                 'headers': headers,
-                'body': json.dumps({'message': 'Missing or invalid authorization header'})
+                'body': dumps({'message': 'Missing or invalid authorization header'})
             }
         
-        token = auth_header.split(' ')[1]
         payload = decode_token(token)
         
         if not payload:
             return {
                 'statusCode': 401,
                 'headers': headers,
-                'body': json.dumps({'message': 'Invalid token'})
+                'body': dumps({'message': 'Invalid token'})
             }
         
+        params = event.get('queryStringParameters') or {}
+        include = {part.strip() for part in params.get('include', '').split(',')}
+        
         user_id = payload.get('sub')
-        user = db_client.get_item(settings.USERS_TABLE, {'user_id': user_id})
+        # password_hash is projected out, so it is never read
+        user, profile = load_user(user_id, include_profile='profile' in include)
         
         if not user:
             return {
                 'statusCode': 404,
                 'headers': headers,
-                'body': json.dumps({'message': 'User not found'})
+                'body': dumps({'message': 'User not found'})
             }
         
-        # Remove sensitive data
-        user.pop('password_hash', None)
+        if 'profile' in include:
+            user['profile'] = profile
         
         return {
             'statusCode': 200,
             'headers': headers,
-            'body': json.dumps(user)
+            'body': dumps(user)
         }
         
     except Exception as e:
         return {
             'statusCode': 500,
             'headers': headers,
-            'body': json.dumps({'message': 'Failed to get user', 'error': str(e)})
+            'body': dumps({'message': 'Failed to get user', 'error': str(e)})
         }
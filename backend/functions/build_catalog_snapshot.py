@@ -0,0 +1,61 @@
+"""
+Offline job: publish the columnar recipe catalog snapshot
+
+Reads the catalog version stamp, scans the full recipes table, encodes it
+with catalog_snapshot.build_snapshot and uploads the file to
+CONTENT_BUCKET/CATALOG_SNAPSHOT_KEY with the version in its metadata.
+Containers download and map it only while that version is still current,
+so run this on a schedule (or after bulk imports) to keep cold starts off
+the table scan.
+
+The version is read before the scan: a write that lands during the scan
+bumps the stamp past the snapshot's, and readers treat it as stale.
+
+Run from backend/:  python -m functions.build_catalog_snapshot [--dry-run]
+"""
+import argparse
+import time
+from typing import Any, Dict
+from database import db_client, s3_client
+from config import settings
+from cache import recipe_cache
+from catalog_snapshot import build_snapshot
+
+
+def build_catalog_snapshot(dry_run: bool = False) -> Dict[str, Any]:
+    """Build a snapshot of the current catalog and upload it"""
+    started = time.monotonic()
+    version = recipe_cache.refresh_version(force=True)
+    recipes = list(db_client.iter_scan(settings.RECIPES_TABLE))
+    snapshot = build_snapshot(recipes, version)
+    built_at = time.monotonic()
+
+    if not dry_run:
+        s3_client.upload_file(
+            snapshot, settings.CONTENT_BUCKET, settings.CATALOG_SNAPSHOT_KEY,
+            metadata={'catalog-version': str(version)}
+        )
+    return {
+        'recipes': len(recipes),
+        'catalog_version': version,
+        'current': recipe_cache.refresh_version(force=True) == version,
+        'snapshot_bytes': len(snapshot),
+        'location': f"s3://{settings.CONTENT_BUCKET}/{settings.CATALOG_SNAPSHOT_KEY}",
+        'uploaded': not dry_run,
+        'build_seconds': round(built_at - started, 3),
+        'elapsed_seconds': round(time.monotonic() - started, 3)
+    }
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Scheduled or manual invocation: {"dry_run": bool}"""
+    result = build_catalog_snapshot(dry_run=bool((event or {}).get('dry_run', False)))
+    print(result)
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Publish the columnar recipe catalog snapshot')
+    parser.add_argument('--dry-run', action='store_true', help='build and report without uploading')
+    args = parser.parse_args()
+    print(build_catalog_snapshot(args.dry_run))
@@ -0,0 +1,52 @@
+"""
+Offline job: build the recipe similarity index artifact
+
+Scans the recipes table, turns every recipe into a feature vector and
+uploads the float32 matrix (with ids, names, categories and image URLs)
+as one compressed .npz object to CONTENT_BUCKET/SIMILARITY_INDEX_KEY.
+Warm recipes_handler containers pick up a new artifact within
+SIMILARITY_INDEX_MAX_AGE_SECONDS.
+
+Run from backend/:  python -m functions.build_similarity_index [--dry-run]
+"""
+import argparse
+import time
+from typing import Any, Dict
+from database import db_client, s3_client
+from config import settings
+from recipe_similarity import PROJECTION, build_artifact
+
+
+def build_similarity_index(dry_run: bool = False) -> Dict[str, Any]:
+    """Build the artifact from the current catalog and upload it"""
+    started = time.monotonic()
+    names = {f'#p{i}': field for i, field in enumerate(PROJECTION)}
+    recipes = list(db_client.iter_scan(
+        settings.RECIPES_TABLE,
+        ProjectionExpression=', '.join(names),
+        ExpressionAttributeNames=names
+    ))
+    artifact = build_artifact(recipes)
+    if not dry_run:
+        s3_client.upload_file(artifact, settings.CONTENT_BUCKET, settings.SIMILARITY_INDEX_KEY)
+    return {
+        'recipes': len(recipes),
+        'artifact_bytes': len(artifact),
+        'location': f"s3://{settings.CONTENT_BUCKET}/{settings.SIMILARITY_INDEX_KEY}",
+        'uploaded': not dry_run,
+        'elapsed_seconds': round(time.monotonic() - started, 3)
+    }
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Scheduled or manual invocation: {"dry_run": bool}"""
+    result = build_similarity_index(dry_run=bool((event or {}).get('dry_run', False)))
+    print(result)
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the recipe similarity index')
+    parser.add_argument('--dry-run', action='store_true', help='build and report without uploading')
+    args = parser.parse_args()
+    print(build_similarity_index(args.dry_run))
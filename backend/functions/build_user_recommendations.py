@@ -0,0 +1,100 @@
+"""
+Offline job: favorites-based recipe recommendations for every user
+
+Recipe favorites are streamed from USER_FAVORITES_TABLE with a parallel
+segment scan straight into a sparse user x recipe matrix. Item-item
+co-occurrence similarity (collaborative.py) then gives each user a top-N
+list of recipes they have not favorited yet, written to
+USER_RECOMMENDATIONS_TABLE at a capped rate. Lists carry a TTL, so users
+who unfavorite everything age out without a delete pass.
+
+Run from backend/:  python -m functions.build_user_recommendations [--dry-run] [--segments N] [--top-n N]
+"""
+import argparse
+import threading
+import time
+from typing import Any, Dict, List
+from boto3.dynamodb.conditions import Attr
+from database import db_client
+from config import settings
+from collaborative import FavoritesMatrix, recommendations
+from throttling import TokenBucket
+from user_recommendations import recommendations_item
+
+SCAN_PAGE_SIZE = 1000
+WRITE_CHUNK = 25  # BatchWriteItem limit
+
+
+def build_user_recommendations(dry_run: bool = False, segments: int = None,
+                               top_n: int = None, neighbors: int = None) -> Dict[str, Any]:
+    """Rebuild every user's list from the current favorites"""
+    segments = segments or settings.JOB_SCAN_SEGMENTS
+    top_n = top_n or settings.USER_RECOMMENDATIONS_TOP_N
+    neighbors = neighbors or settings.ITEM_NEIGHBORS
+    write_budget = TokenBucket(settings.JOB_WRITES_PER_SECOND, max(WRITE_CHUNK, settings.JOB_WRITES_PER_SECOND))
+    matrix = FavoritesMatrix()
+    lock = threading.Lock()
+
+    def handle_page(favorites: List[Dict[str, Any]]) -> None:
+        pairs = [(favorite['user_id'], favorite['item_id']) for favorite in favorites]
+        with lock:
+            matrix.add(pairs)
+
+    started = time.monotonic()
+    db_client.scan_segments(
+        settings.USER_FAVORITES_TABLE,
+        segments,
+        handle_page,
+        limit=SCAN_PAGE_SIZE,
+        # Favorites written before item_type existed are recipes
+        FilterExpression=Attr('item_type').not_exists() | Attr('item_type').eq('recipe'),
+        ProjectionExpression='user_id, item_id'
+    )
+    scanned_at = time.monotonic()
+
+    written, users, batch = 0, 0, []
+    for user_id, recipe_ids, scores in recommendations(matrix, top_n, neighbors):
+        users += 1
+        if dry_run:
+            continue
+        batch.append(recommendations_item(user_id, recipe_ids, scores))
+        if len(batch) == WRITE_CHUNK:
+            write_budget.acquire(len(batch))
+            written += db_client.batch_write(settings.USER_RECOMMENDATIONS_TABLE, batch)
+            batch = []
+    if batch:
+        write_budget.acquire(len(batch))
+        written += db_client.batch_write(settings.USER_RECOMMENDATIONS_TABLE, batch)
+
+    finished = time.monotonic()
+    return {
+        'favorites': len(matrix),
+        'users': len(matrix.user_index),
+        'recipes': len(matrix.recipe_index),
+        'users_with_recommendations': users,
+        'written': written,
+        'scan_seconds': round(scanned_at - started, 3),
+        'elapsed_seconds': round(finished - started, 3)
+    }
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Scheduled or manual invocation: {"dry_run": bool, "segments": int, "top_n": int}"""
+    event = event or {}
+    result = build_user_recommendations(
+        dry_run=bool(event.get('dry_run', False)),
+        segments=event.get('segments'),
+        top_n=event.get('top_n')
+    )
+    print(result)
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build favorites-based user recommendations')
+    parser.add_argument('--dry-run', action='store_true', help='compute and report without writing')
+    parser.add_argument('--segments', type=int, default=None, help='parallel scan segments')
+    parser.add_argument('--top-n', type=int, default=None, help='recipes kept per user')
+    parser.add_argument('--neighbors', type=int, default=None, help='neighbours kept per recipe')
+    args = parser.parse_args()
+    print(build_user_recommendations(args.dry_run, args.segments, args.top_n, args.neighbors))
@@ -0,0 +1,29 @@
+"""
+Offline job: export a table to S3 as gzip-compressed NDJSON
+
+Same export as POST /admin/exports (table_export.py), without the API
+Gateway time limit. Prints item counts, throughput and a presigned
+download link.
+
+Run from backend/:  python -m functions.export_table recipes|users|orders [--segments N] [--no-upload]
+"""
+import argparse
+from typing import Any, Dict
+from table_export import EXPORT_TABLES, export_table
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Scheduled or manual invocation: {"table": str, "segments": int}"""
+    event = event or {}
+    result = export_table(event['table'], segments=event.get('segments'))
+    print(result)
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export a table to S3 as gzip NDJSON')
+    parser.add_argument('table', choices=sorted(EXPORT_TABLES), help='table to export')
+    parser.add_argument('--segments', type=int, default=None, help='parallel scan segments')
+    parser.add_argument('--no-upload', action='store_true', help='scan and compress without uploading')
+    args = parser.parse_args()
+    print(export_table(args.table, args.segments, upload=not args.no_upload))
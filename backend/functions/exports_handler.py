@@ -0,0 +1,97 @@
+"""
+Admin exports Lambda function handler
+Exports a table to S3 as gzip-compressed NDJSON and returns a presigned link
+
+API Gateway stops waiting after 29 seconds; export large tables with
+functions/export_table.py instead, which runs the same export as a job.
+"""
+from typing import Dict, Any
+from auth import authenticate, is_admin
+from config import settings
+from api_responses import cors_headers, dumps, parse_body
+from table_export import EXPORT_TABLES, export_table
+
+CORS_HEADERS = cors_headers('POST,OPTIONS')
+
+MAX_SEGMENTS = 64
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Main Lambda handler router for exports"""
+
+    headers = CORS_HEADERS
+
+    if event.get('httpMethod') == 'OPTIONS':
+        return {'statusCode': 200, 'headers': headers, 'body': ''}
+
+    try:
+        path = event.get('path', '')
+        http_method = event.get('httpMethod', '')
+
+        payload = authenticate(event)
+        if not payload:
+            return {
+                'statusCode': 401,
+                'headers': headers,
+                'body': dumps({'message': 'Unauthorized'})
+            }
+        if not is_admin(payload['sub']):
+            return {
+                'statusCode': 403,
+                'headers': headers,
+                'body': dumps({'message': 'Admin access required'})
+            }
+
+        # Route to appropriate handler
+        if path.endswith('/admin/exports') and http_method == 'POST':
+            return create_export(event, headers)
+        else:
+            return {
+                'statusCode': 404,
+                'headers': headers,
+                'body': dumps({'message': 'Not Found'})
+            }
+
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': dumps({'message': 'Internal Server Error', 'error': str(e)})
+        }
+
+
+def create_export(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
+    """Export one table: {"table": "recipes" | "users" | "orders", "segments": int}"""
+    try:
+        body = parse_body(event)
+        table = body.get('table')
+        if table not in EXPORT_TABLES:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': dumps({'message': f"table must be one of: {', '.join(EXPORT_TABLES)}"})
+            }
+
+        segments = body.get('segments', settings.JOB_SCAN_SEGMENTS)
+        if not isinstance(segments, int) or isinstance(segments, bool) or not 1 <= segments <= MAX_SEGMENTS:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': dumps({'message': f"segments must be an integer between 1 and {MAX_SEGMENTS}"})
+            }
+
+        result = export_table(table, segments)
+        print(f"Export {result['export']}: {result['items']} items to {result['location']}")
+
+        return {
+            'statusCode': 201,
+            'headers': headers,
+            'body': dumps(result)
+        }
+
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': dumps({'message': 'Export failed', 'error': str(e)})
+        }
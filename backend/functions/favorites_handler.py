@@ -0,0 +1,151 @@
+"""
+Favorites Lambda function handler
+Lists, adds and removes a user's favorite recipes and meals
+"""
+from typing import Dict, Any
+from boto3.dynamodb.conditions import Attr, Key
+from database import db_client, get_timestamp
+from auth import authenticate
+from config import settings
+from api_responses import cors_headers, dumps, parse_body
+
+CORS_HEADERS = cors_headers('GET,POST,DELETE,OPTIONS')
+
+# Only recipe favorites feed collaborative filtering
+ITEM_TYPES = ('recipe', 'meal')
+MAX_ITEM_ID_LENGTH = 128
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Main Lambda handler router for favorites"""
+
+    headers = CORS_HEADERS
+
+    if event.get('httpMethod') == 'OPTIONS':
+        return {'statusCode': 200, 'headers': headers, 'body': ''}
+
+    try:
+        path = event.get('path', '')
+        http_method = event.get('httpMethod', '')
+
+        payload = authenticate(event)
+        if not payload:
+            return {
+                'statusCode': 401,
+                'headers': headers,
+                'body': dumps({'message': 'Unauthorized'})
+            }
+        user_id = payload['sub']
+
+        # Route to appropriate handler
+        if path.endswith('/favorites') and http_method == 'GET':
+            return get_favorites(event, user_id, headers)
+        elif path.endswith('/favorites') and http_method == 'POST':
+            return add_favorite(event, user_id, headers)
+        elif '/favorites/' in path and http_method == 'DELETE':
+            return remove_favorite(event, user_id, headers)
+        else:
+            return {
+                'statusCode': 404,
+                'headers': headers,
+                'body': dumps({'message': 'Not Found'})
+            }
+
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': dumps({'message': 'Internal Server Error', 'error': str(e)})
+        }
+
+
+def get_favorites(event: Dict[str, Any], user_id: str, headers: Dict[str, str]) -> Dict[str, Any]:
+    """List the user's favorites, newest first, optionally of one ?type="""
+    try:
+        item_type = (event.get('queryStringParameters') or {}).get('type')
+        kwargs = {'FilterExpression': Attr('item_type').eq(item_type)} if item_type else {}
+        favorites = list(db_client.iter_query(
+            settings.USER_FAVORITES_TABLE, Key('user_id').eq(user_id), **kwargs
+        ))
+        favorites.sort(key=lambda favorite: favorite.get('created_at', 0), reverse=True)
+
+        return {
+            'statusCode': 200,
+            'headers': headers,
+            'body': dumps({'favorites': favorites, 'count': len(favorites)})
+        }
+
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': dumps({'message': 'Failed to get favorites', 'error': str(e)})
+        }
+
+
+def add_favorite(event: Dict[str, Any], user_id: str, headers: Dict[str, str]) -> Dict[str, Any]:
+    """Favorite an item; favoriting it again keeps the original date"""
+    try:
+        body = parse_body(event)
+        item_id = body.get('item_id')
+        item_type = body.get('item_type', 'recipe')
+
+        if not isinstance(item_id, str) or not item_id.strip() or len(item_id) > MAX_ITEM_ID_LENGTH:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': dumps({'message': 'item_id is required'})
+            }
+        if item_type not in ITEM_TYPES:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': dumps({'message': f"item_type must be one of: {', '.join(ITEM_TYPES)}"})
+            }
+
+        favorite = db_client.update_item(
+            settings.USER_FAVORITES_TABLE,
+            {'user_id': user_id, 'item_id': item_id.strip()},
+            "SET item_type = :item_type, created_at = if_not_exists(created_at, :now)",
+            {':item_type': item_type, ':now': get_timestamp()}
+        )
+
+        return {
+            'statusCode': 201,
+            'headers': headers,
+            'body': dumps(favorite)
+        }
+
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': dumps({'message': 'Failed to add favorite', 'error': str(e)})
+        }
+
+
+def remove_favorite(event: Dict[str, Any], user_id: str, headers: Dict[str, str]) -> Dict[str, Any]:
+    """Remove an item from the user's favorites"""
+    try:
+        item_id = (event.get('pathParameters') or {}).get('id')
+        if not item_id:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': dumps({'message': 'Item ID required'})
+            }
+
+        db_client.delete_item(settings.USER_FAVORITES_TABLE, {'user_id': user_id, 'item_id': item_id})
+
+        return {
+            'statusCode': 200,
+            'headers': headers,
+            'body': dumps({'message': 'Favorite removed'})
+        }
+
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': dumps({'message': 'Failed to remove favorite', 'error': str(e)})
+        }
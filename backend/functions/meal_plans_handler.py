@@ -0,0 +1,212 @@
+"""
+Meal plans Lambda function handler
+Builds weekly meal plans from the recipe catalog and stores them
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Any, Optional, Tuple
+from boto3.dynamodb.conditions import Attr, Key
+from database import db_client, generate_id, get_timestamp, to_dynamodb
+from auth import authenticate
+from config import settings
+from api_responses import cors_headers, dumps, parse_body
+from meal_planner import MAX_DAYS, PlanningError, plan_week
+from nutrition import profile_targets
+from recipe_catalog import recipe_catalog, recipe_to_meal
+
+CORS_HEADERS = cors_headers('GET,POST,OPTIONS')
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Main Lambda handler router for meal plans"""
+
+    headers = CORS_HEADERS
+
+    if event.get('httpMethod') == 'OPTIONS':
+        return {'statusCode': 200, 'headers': headers, 'body': ''}
+
+    try:
+        path = event.get('path', '')
+        http_method = event.get('httpMethod', '')
+
+        payload = authenticate(event)
+        if not payload:
+            return {
+                'statusCode': 401,
+                'headers': headers,
+                'body': dumps({'message': 'Unauthorized'})
+            }
+        user_id = payload['sub']
+
+        # Route to appropriate handler
+        if path.endswith('/plans') and http_method == 'POST':
+            return create_plan(event, user_id, headers)
+        elif path.endswith('/plans') and http_method == 'GET':
+            return list_plans(user_id, headers)
+        elif '/plans/' in path and http_method == 'GET':
+            return get_plan(event, user_id, headers)
+        else:
+            return {
+                'statusCode': 404,
+                'headers': headers,
+                'body': dumps({'message': 'Not Found'})
+            }
+
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': dumps({'message': 'Internal Server Error', 'error': str(e)})
+        }
+
+
+def create_plan(event: Dict[str, Any], user_id: str, headers: Dict[str, str]) -> Dict[str, Any]:
+    """Build a plan of up to a week against the user's nutrition targets and store it"""
+    try:
+        options, error = parse_plan_options(parse_body(event))
+        if error:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': dumps({'message': error})
+            }
+
+        profile = db_client.get_item(settings.USER_PROFILES_TABLE, {'user_id': user_id})
+        if not profile:
+            return {
+                'statusCode': 404,
+                'headers': headers,
+                'body': dumps({'message': 'User profile not found'})
+            }
+
+        targets = profile_targets(profile)
+        recipe_catalog.ensure_fresh()
+        try:
+            days = plan_week(
+                recipe_catalog,
+                targets,
+                profile.get('fitness_goal', 'maintenance'),
+                profile.get('dietary_preferences', []),
+                profile.get('allergies', []),
+                days=options['days'],
+                max_prep_minutes=options['max_prep_minutes'],
+                max_repeats=options['max_repeats']
+            )
+        except PlanningError as e:
+            return {
+                'statusCode': 422,
+                'headers': headers,
+                'body': dumps({'message': str(e)})
+            }
+
+        start = options['start_date']
+        plan = {
+            'plan_id': generate_id(),
+            'user_id': user_id,
+            'plan_type': 'weekly',
+            'date': start.isoformat(),
+            'end_date': (start + timedelta(days=len(days) - 1)).isoformat(),
+            'targets': targets,
+            'options': {field: value for field, value in options.items() if field != 'start_date'},
+            'days': [
+                {
+                    'date': (start + timedelta(days=offset)).isoformat(),
+                    'meals': {meal_type: recipe_to_meal(recipe) for meal_type, recipe in day['meals'].items()},
+                    'total_nutrition': day['total_nutrition'],
+                    'deviation': day['deviation']
+                }
+                for offset, day in enumerate(days)
+            ],
+            'deviation': round(sum(day['deviation'] for day in days) / len(days), 4),
+            'created_at': get_timestamp()
+        }
+        db_client.put_item(settings.MEAL_PLANS_TABLE, to_dynamodb(plan))
+
+        return {
+            'statusCode': 201,
+            'headers': headers,
+            'body': dumps(plan)
+        }
+
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': dumps({'message': 'Failed to create meal plan', 'error': str(e)})
+        }
+
+
+def parse_plan_options(body: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Planner options from a request body, or an error message"""
+    options = {
+        'days': body.get('days', MAX_DAYS),
+        'max_prep_minutes': body.get('max_prep_minutes'),
+        'max_repeats': body.get('max_repeats', 1)
+    }
+    for field, low, high in (('days', 1, MAX_DAYS), ('max_repeats', 1, MAX_DAYS)):
+        value = options[field]
+        if isinstance(value, bool) or not isinstance(value, int) or not low <= value <= high:
+            return {}, f"{field} must be an integer between {low} and {high}"
+
+    minutes = options['max_prep_minutes']
+    if minutes is not None and (isinstance(minutes, bool) or not isinstance(minutes, int) or minutes <= 0):
+        return {}, "max_prep_minutes must be a positive integer"
+
+    options['start_date'] = datetime.now(timezone.utc).date()
+    try:
+        if body.get('start_date'):
+            options['start_date'] = date.fromisoformat(body['start_date'])
+    except (TypeError, ValueError):
+        return {}, "start_date must be an ISO date (YYYY-MM-DD)"
+    return options, None
+
+
+def list_plans(user_id: str, headers: Dict[str, str]) -> Dict[str, Any]:
+    """List the user's stored weekly plans, newest first"""
+    try:
+        plans = list(db_client.iter_query(
+            settings.MEAL_PLANS_TABLE,
+            Key('user_id').eq(user_id),
+            index_name='UserPlansIndex',
+            FilterExpression=Attr('plan_type').eq('weekly')
+        ))
+        plans.sort(key=lambda plan: plan.get('created_at', 0), reverse=True)
+
+        return {
+            'statusCode': 200,
+            'headers': headers,
+            'body': dumps({'plans': plans, 'count': len(plans)})
+        }
+
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': dumps({'message': 'Failed to get meal plans', 'error': str(e)})
+        }
+
+
+def get_plan(event: Dict[str, Any], user_id: str, headers: Dict[str, str]) -> Dict[str, Any]:
+    """Get one of the user's plans by ID"""
+    try:
+        plan_id = (event.get('pathParameters') or {}).get('id')
+        plan = db_client.get_item(settings.MEAL_PLANS_TABLE, {'plan_id': plan_id}) if plan_id else None
+
+        if not plan or plan.get('user_id') != user_id:
+            return {
+                'statusCode': 404,
+                'headers': headers,
+                'body': dumps({'message': 'Meal plan not found'})
+            }
+
+        return {
+            'statusCode': 200,
+            'headers': headers,
+            'body': dumps(plan)
+        }
+
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': dumps({'message': 'Failed to get meal plan', 'error': str(e)})
+        }
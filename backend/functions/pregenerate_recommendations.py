@@ -0,0 +1,184 @@
+"""
+Nightly job: pre-generate breakfast, lunch and dinner recommendations
+
+Profiles are streamed from a scan in batches. For each batch, rule-based
+recommendations (catalog scoring, pure CPU) are computed across a process
+pool; when a model is configured, AI recommendations then replace them,
+with one model call per distinct fingerprint and at most
+PREGENERATE_MODEL_CONCURRENCY calls in flight. Failed or over-budget model
+calls keep the rule-based result, which is blended with each user's
+favorites-based recommendations. Plans are written to MEAL_PLANS_TABLE,
+where the recommendations handler reads them with a single key lookup.
+
+Lambda has no /dev/shm, so multiprocessing pools cannot start there; the
+handler always scores in-process. Run the script form on a worker host to
+use processes.
+
+Run from backend/:  python -m functions.pregenerate_recommendations [--processes N] [--model-concurrency N] [--dry-run]
+"""
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from boto3.dynamodb.conditions import Attr
+from database import db_client
+from config import settings
+from meal_plans import MEAL_TYPES, daily_plan_item
+from nutrition import profile_targets
+from recommendation_cache import recommendation_fingerprint
+from throttling import TokenBucket
+from user_recommendations import get_many_user_recommendations
+from meal_generation import generate_ai_recommendations, get_rule_based_recommendations
+
+BATCH_SIZE = 200
+WRITE_CHUNK = 25  # BatchWriteItem limit
+
+
+def rule_based_plans(work: List[Tuple[Dict[str, Any], Dict[str, float]]]) -> List[Dict[str, List[Dict[str, Any]]]]:
+    """Rule-based recommendations for every meal type, per (profile, favorites boosts)"""
+    plans = []
+    for profile, boosts in work:
+        macros = profile_targets(profile)
+        plans.append({
+            meal_type: get_rule_based_recommendations(
+                profile.get('fitness_goal', 'maintenance'),
+                profile.get('dietary_preferences', []),
+                profile.get('allergies', []),
+                meal_type,
+                macros,
+                boosts
+            )
+            for meal_type in MEAL_TYPES
+        })
+    return plans
+
+
+def profile_batches(batch_size: int, limit: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+    """Profiles of active users, `batch_size` at a time"""
+    inactive = {
+        user['user_id'] for user in db_client.iter_scan(
+            settings.USERS_TABLE, Attr('is_active').eq(False), ProjectionExpression='user_id'
+        )
+    }
+    batch, count = [], 0
+    for profile in db_client.iter_scan(settings.USER_PROFILES_TABLE):
+        if profile['user_id'] in inactive:
+            continue
+        batch.append(profile)
+        count += 1
+        if len(batch) == batch_size or count == limit:
+            yield batch
+            batch = []
+        if count == limit:
+            return
+    if batch:
+        yield batch
+
+
+def pregenerate(processes: Optional[int] = None, model_concurrency: Optional[int] = None,
+                dry_run: bool = False, limit: Optional[int] = None) -> Dict[str, Any]:
+    """Generate and store a daily plan for every active user"""
+    processes = settings.PREGENERATE_PROCESSES if processes is None else processes
+    model_concurrency = model_concurrency or settings.PREGENERATE_MODEL_CONCURRENCY
+    write_budget = TokenBucket(settings.JOB_WRITES_PER_SECOND, max(WRITE_CHUNK, settings.JOB_WRITES_PER_SECOND))
+    stats = {'profiles': 0, 'written': 0, 'model_meals': 0, 'rule_based_meals': 0, 'model_calls': 0}
+    # Fingerprint -> AI recommendations (None: model failed) for this run
+    ai_results: Dict[str, Optional[List[Dict[str, Any]]]] = {}
+
+    # Spawned rather than forked: the parent holds boto3 clients and threads
+    cpu_pool = (ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('spawn'))
+                if processes > 1 else None)
+    model_pool = ThreadPoolExecutor(model_concurrency) if settings.OPENAI_API_KEY else None
+
+    started = time.monotonic()
+    try:
+        for profiles in profile_batches(BATCH_SIZE, limit):
+            boosts = get_many_user_recommendations([profile['user_id'] for profile in profiles])
+            work = [(profile, boosts.get(profile['user_id'], {})) for profile in profiles]
+            if cpu_pool:
+                step = -(-len(work) // processes)
+                chunks = [work[i:i + step] for i in range(0, len(work), step)]
+                plans = [plan for chunk in cpu_pool.map(rule_based_plans, chunks) for plan in chunk]
+            else:
+                plans = rule_based_plans(work)
+
+            sources = ['rules'] * len(profiles)
+            if model_pool:
+                wanted: Dict[str, Dict[str, Any]] = {}
+                slots = []
+                for index, profile in enumerate(profiles):
+                    for meal_type in MEAL_TYPES:
+                        fingerprint = recommendation_fingerprint(
+                            profile.get('fitness_goal', 'maintenance'),
+                            profile.get('dietary_preferences', []),
+                            profile.get('allergies', []),
+                            profile.get('activity_level', 'moderate'),
+                            meal_type,
+                            profile_targets(profile)
+                        )
+                        slots.append((index, meal_type, fingerprint))
+                        if fingerprint not in ai_results:
+                            wanted.setdefault(fingerprint, {'profile': profile, 'meal_type': meal_type})
+
+                fingerprints = list(wanted)
+                results = model_pool.map(
+                    lambda fingerprint: generate_ai_recommendations(**wanted[fingerprint]), fingerprints
+                )
+                ai_results.update(zip(fingerprints, results))
+                stats['model_calls'] += len(fingerprints)
+
+                for index, meal_type, fingerprint in slots:
+                    if ai_results[fingerprint] is not None:
+                        plans[index][meal_type] = ai_results[fingerprint]
+                        sources[index] = 'ai'
+                        stats['model_meals'] += 1
+
+            stats['profiles'] += len(profiles)
+            stats['rule_based_meals'] += len(profiles) * len(MEAL_TYPES)
+            if dry_run:
+                continue
+
+            items = [
+                daily_plan_item(profile['user_id'], plan, source, profile.get('version'))
+                for profile, plan, source in zip(profiles, plans, sources)
+            ]
+            for start in range(0, len(items), WRITE_CHUNK):
+                chunk = items[start:start + WRITE_CHUNK]
+                write_budget.acquire(len(chunk))
+                stats['written'] += db_client.batch_write(settings.MEAL_PLANS_TABLE, chunk)
+    finally:
+        if cpu_pool:
+            cpu_pool.shutdown()
+        if model_pool:
+            model_pool.shutdown()
+
+    stats['rule_based_meals'] -= stats['model_meals']
+    elapsed = time.monotonic() - started
+    stats['elapsed_seconds'] = round(elapsed, 3)
+    stats['profiles_per_second'] = round(stats['profiles'] / elapsed, 1) if elapsed else 0.0
+    return stats
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Scheduled invocation: {"dry_run": bool, "model_concurrency": int, "limit": int}"""
+    event = event or {}
+    result = pregenerate(
+        processes=0,
+        model_concurrency=event.get('model_concurrency'),
+        dry_run=bool(event.get('dry_run', False)),
+        limit=event.get('limit')
+    )
+    print(result)
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pre-generate daily meal recommendations')
+    parser.add_argument('--processes', type=int, default=multiprocessing.cpu_count(),
+                        help='worker processes for rule-based scoring (0 or 1: in-process)')
+    parser.add_argument('--model-concurrency', type=int, default=None, help='concurrent model calls')
+    parser.add_argument('--dry-run', action='store_true', help='generate and report without writing')
+    parser.add_argument('--limit', type=int, default=None, help='stop after this many profiles')
+    args = parser.parse_args()
+    print(pregenerate(args.processes, args.model_concurrency, args.dry_run, args.limit))
@@ -0,0 +1,310 @@
+"""
+User profiles Lambda function handler
+Reads and updates profiles, keeping stored nutrition targets in sync
+"""
+from typing import Dict, Any, Optional, Tuple
+from boto3.dynamodb.conditions import Attr
+from database import db_client, get_timestamp, is_condition_failure, to_dynamodb
+from auth import authenticate
+from config import settings
+from api_responses import cors_headers, dumps, parse_body
+from meal_plans import invalidate_daily_plan
+from nutrition import (
+    ACTIVITY_MULTIPLIERS, FITNESS_GOALS, GENDERS, TARGET_FIELDS, nutrition_targets, stored_targets
+)
+
+CORS_HEADERS = cors_headers('GET,PUT,OPTIONS')
+
+# Fields a client may change, with the check each value must pass
+NUMERIC_RANGES = {
+    'weight': (20, 400),  # kg
+    'height': (100, 250),  # cm
+    'age': (13, 120)
+}
+CHOICES = {
+    'fitness_goal': FITNESS_GOALS,
+    'activity_level': tuple(ACTIVITY_MULTIPLIERS),
+    'gender': GENDERS
+}
+LIST_FIELDS = ('dietary_preferences', 'allergies')
+
+# Unversioned writes re-read and retry this many times when they race
+MAX_UPDATE_ATTEMPTS = 3
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Main Lambda handler router for profiles"""
+
+    headers = CORS_HEADERS
+
+    if event.get('httpMethod') == 'OPTIONS':
+        return {'statusCode': 200, 'headers': headers, 'body': ''}
+
+    try:
+        path = event.get('path', '')
+        http_method = event.get('httpMethod', '')
+
+        payload = authenticate(event)
+        if not payload:
+            return {
+                'statusCode': 401,
+                'headers': headers,
+                'body': dumps({'message': 'Unauthorized'})
+            }
+
+        user_id = (event.get('pathParameters') or {}).get('id')
+        if not user_id:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': dumps({'message': 'User ID required'})
+            }
+
+        if user_id != payload.get('sub'):
+            return {
+                'statusCode': 403,
+                'headers': headers,
+                'body': dumps({'message': 'Forbidden'})
+            }
+
+        # Route to appropriate handler
+        if path.endswith('/targets') and http_method == 'GET':
+            return get_targets(user_id, headers)
+        elif http_method == 'GET':
+            return get_profile(user_id, headers)
+        elif http_method == 'PUT':
+            return update_profile(event, user_id, headers)
+        else:
+            return {
+                'statusCode': 404,
+                'headers': headers,
+                'body': dumps({'message': 'Not Found'})
+            }
+
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': dumps({'message': 'Internal Server Error', 'error': str(e)})
+        }
+
+
+def get_profile(user_id: str, headers: Dict[str, str]) -> Dict[str, Any]:
+    """Get a profile, including its nutrition targets"""
+    try:
+        profile = load_profile(user_id)
+
+        if not profile:
+            return {
+                'statusCode': 404,
+                'headers': headers,
+                'body': dumps({'message': 'Profile not found'})
+            }
+
+        return {
+            'statusCode': 200,
+            'headers': headers,
+            'body': dumps(profile)
+        }
+
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': dumps({'message': 'Failed to get profile', 'error': str(e)})
+        }
+
+
+def get_targets(user_id: str, headers: Dict[str, str]) -> Dict[str, Any]:
+    """Get only the daily and per-meal nutrition targets"""
+    try:
+        profile = load_profile(user_id)
+
+        if not profile:
+            return {
+                'statusCode': 404,
+                'headers': headers,
+                'body': dumps({'message': 'Profile not found'})
+            }
+
+        targets = profile['nutrition_targets']
+        return {
+            'statusCode': 200,
+            'headers': headers,
+            'body': dumps({
+                'user_id': user_id,
+                'daily': targets,
+                'per_meal': {field: int(value) // 3 for field, value in targets.items()}
+            })
+        }
+
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': dumps({'message': 'Failed to get targets', 'error': str(e)})
+        }
+
+
+def load_profile(user_id: str) -> Optional[Dict[str, Any]]:
+    """Read a profile, storing targets once for profiles written before they existed"""
+    profile = db_client.get_item(settings.USER_PROFILES_TABLE, {'user_id': user_id})
+    if not profile or stored_targets(profile):
+        return profile
+
+    profile['nutrition_targets'] = nutrition_targets(profile)
+    try:
+        db_client.update_item(
+            settings.USER_PROFILES_TABLE,
+            {'user_id': user_id},
+            "SET nutrition_targets = :targets",
+            {':targets': profile['nutrition_targets']},
+            condition_expression=Attr('nutrition_targets').not_exists() & version_condition(profile)
+        )
+    except Exception as e:
+        # A concurrent update stored fresher targets; ours are still correct
+        # for the profile we read
+        if not is_condition_failure(e):
+            raise
+    return profile
+
+
+def update_profile(event: Dict[str, Any], user_id: str, headers: Dict[str, str]) -> Dict[str, Any]:
+    """Partially update a profile
+
+    Sending `version` (or an If-Match header) makes the update conditional:
+    it fails with 409 if the profile changed since that version was read.
+    """
+    try:
+        body = parse_body(event)
+        request_headers = event.get('headers') or {}
+        expected = body.pop('version', None)
+        if expected is None:
+            expected = request_headers.get('If-Match') or request_headers.get('if-match')
+
+        changes, error = validate_changes(body)
+        if error:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': dumps({'message': error})
+            }
+
+        if expected is not None:
+            try:
+                expected = int(str(expected).strip('"'))
+            except ValueError:
+                return {
+                    'statusCode': 400,
+                    'headers': headers,
+                    'body': dumps({'message': 'Invalid version'})
+                }
+
+        for _ in range(MAX_UPDATE_ATTEMPTS):
+            current = db_client.get_item(settings.USER_PROFILES_TABLE, {'user_id': user_id}, consistent_read=True)
+            if not current:
+                return {
+                    'statusCode': 404,
+                    'headers': headers,
+                    'body': dumps({'message': 'Profile not found'})
+                }
+
+            version = int(current.get('version', 0))
+            if expected is not None and expected != version:
+                return conflict(current, headers)
+
+            try:
+                updated = write_changes(user_id, current, changes)
+                return {
+                    'statusCode': 200,
+                    'headers': headers,
+                    'body': dumps(updated)
+                }
+            except Exception as e:
+                if not is_condition_failure(e):
+                    raise
+                if expected is not None:
+                    return conflict(None, headers)
+
+        return conflict(None, headers)
+
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': dumps({'message': 'Failed to update profile', 'error': str(e)})
+        }
+
+
+def validate_changes(body: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Updatable fields from a request body, or an error message"""
+    changes = {}
+    for field, (low, high) in NUMERIC_RANGES.items():
+        if field in body:
+            value = body[field]
+            if value is not None:
+                if isinstance(value, bool) or not isinstance(value, (int, float)) or not low <= value <= high:
+                    return {}, f"{field} must be a number between {low} and {high}"
+            changes[field] = value
+
+    for field, choices in CHOICES.items():
+        if field in body:
+            if body[field] not in choices:
+                return {}, f"{field} must be one of: {', '.join(choices)}"
+            changes[field] = body[field]
+
+    for field in LIST_FIELDS:
+        if field in body:
+            values = body[field]
+            if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+                return {}, f"{field} must be a list of strings"
+            changes[field] = list(dict.fromkeys(value.strip() for value in values if value.strip()))
+
+    if not changes:
+        return {}, "No updatable fields provided"
+    return changes, None
+
+
+def write_changes(user_id: str, current: Dict[str, Any], changes: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply changes conditioned on the version that was read, bumping it"""
+    changes = dict(changes)
+    if any(field in changes for field in TARGET_FIELDS) or not stored_targets(current):
+        changes['nutrition_targets'] = nutrition_targets({**current, **changes})
+    changes['updated_at'] = get_timestamp()
+    changes['version'] = int(current.get('version', 0)) + 1
+
+    update_expr = "SET " + ", ".join(f"#{field} = :{field}" for field in changes)
+    updated = db_client.update_item(
+        settings.USER_PROFILES_TABLE,
+        {'user_id': user_id},
+        update_expr,
+        to_dynamodb({f':{field}': value for field, value in changes.items()}),
+        expression_names={f'#{field}': field for field in changes},
+        condition_expression=Attr('user_id').exists() & version_condition(current)
+    )
+
+    # Pre-generated recommendations were built from the old profile
+    try:
+        invalidate_daily_plan(user_id)
+    except Exception as e:
+        print(f"Failed to invalidate daily plan for {user_id}: {e}")
+    return updated
+
+
+def version_condition(profile: Dict[str, Any]) -> Any:
+    """Condition that the stored profile is still at the version that was read"""
+    if 'version' in profile:
+        return Attr('version').eq(profile['version'])
+    return Attr('version').not_exists()
+
+
+def conflict(current: Optional[Dict[str, Any]], headers: Dict[str, str]) -> Dict[str, Any]:
+    """409 for a conditional update that lost to another write"""
+    body = {'message': 'Profile was modified by another request'}
+    if current is not None:
+        body['version'] = current.get('version', 0)
+    return {
+        'statusCode': 409,
+        'headers': headers,
+        'body': dumps(body)
+    }
@@ -2,23 +2,38 @@
 Recipes Lambda function handler
 Handles CRUD operations for recipes
 """
-import json
-from typing import Dict, Any
-from database import db_client, generate_id, get_timestamp
+import sys
+from typing import Dict, Any, List, Optional
+from database import db_client, generate_id, get_timestamp, encode_cursor, decode_cursor
 from auth import decode_token
 from config import settings
+from api_responses import cors_headers, dumps, parse_body
 from boto3.dynamodb.conditions import Key
+import heapq
+import search_index
+from cache import recipe_cache
+from catalog_snapshot import published_recipe
+from dietary_flags import normalize_recipe, normalize_ingredients, normalize_tags, recipe_flags
+
+CORS_HEADERS = cors_headers('GET,POST,PUT,DELETE,OPTIONS')
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+MAX_BATCH_IDS = 100
+MAX_CATEGORIES = 10
+DEFAULT_SEARCH_RESULTS = 20
+MAX_SEARCH_RESULTS = 100
+DEFAULT_SUGGESTIONS = 8
+MAX_SUGGESTIONS = 20
+MAX_PREFIX_LENGTH = 100
+DEFAULT_SIMILAR = 10
+MAX_SIMILAR = 50
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """Main Lambda handler router for recipes"""
     
-    headers = {
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Headers': 'Content-Type,Authorization',
-        'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS',
-        'Content-Type': 'application/json'
-    }
+    headers = CORS_HEADERS
     
     if event.get('httpMethod') == 'OPTIONS':
         return {'statusCode': 200, 'headers': headers, 'body': ''}
@@ -28,60 +43,278 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         http_method = event.get('httpMethod', '')
         
         # Route to appropriate handler
-        if path.endswith('/recipes') and http_method == 'GET':
+        if path.endswith('/recipes/cache/stats') and http_method == 'GET':
+            return get_cache_stats(event, headers)
+        elif path.endswith('/recipes') and http_method == 'GET':
             return get_recipes(event, headers)
         elif path.endswith('/recipes') and http_method == 'POST':
             return create_recipe(event, headers)
+        elif path.endswith('/search') and http_method == 'GET':
+            return search_recipes(event, headers)
+        elif path.endswith('/recipes/suggest') and http_method == 'GET':
+            return suggest_recipes(event, headers)
+        elif path.endswith('/similar') and http_method == 'GET':
+            return get_similar_recipes(event, headers)
         elif '/recipes/' in path and http_method == 'GET':
             return get_recipe(event, headers)
         elif '/recipes/' in path and http_method == 'PUT':
             return update_recipe(event, headers)
         elif '/recipes/' in path and http_method == 'DELETE':
             return delete_recipe(event, headers)
-        elif path.endswith('/search') and http_method == 'GET':
-            return search_recipes(event, headers)
         else:
             return {
                 'statusCode': 404,
                 'headers': headers,
-                'body': json.dumps({'message': 'Not Found'})
+                'body': dumps({'message': 'Not Found'})
             }
             
     except Exception as e:
         return {
             'statusCode': 500,
             'headers': headers,
-            'body': json.dumps({'message': 'Internal Server Error', 'error': str(e)})
+            'body': dumps({'message': 'Internal Server Error', 'error': str(e)})
         }
 
 
+def load_recipe(recipe_id: str) -> Optional[Dict[str, Any]]:
+    """Read a recipe through the warm-container catalog cache and snapshot"""
+    def fetch():
+        recipe = published_recipe(recipe_id)
+        if recipe is None:
+            recipe = db_client.get_item(settings.RECIPES_TABLE, {'recipe_id': recipe_id})
+        return recipe
+    
+    return recipe_cache.get_or_load(('recipe', recipe_id), fetch)
+
+
+def load_recipes(recipe_ids: List[str]) -> List[Dict[str, Any]]:
+    """Read many recipes through the cache and snapshot, fetching the rest in one BatchGetItem"""
+    def fetch(keys):
+        found = {}
+        missing = []
+        for key in keys:
+            recipe = published_recipe(key[1])
+            if recipe is None:
+                missing.append(key[1])
+            else:
+                found[key] = recipe
+        if missing:
+            items = db_client.batch_get(
+                settings.RECIPES_TABLE,
+                [{'recipe_id': recipe_id} for recipe_id in missing]
+            )
+            found.update({('recipe', item['recipe_id']): item for item in items})
+        return found
+    
+    keys = [('recipe', recipe_id) for recipe_id in recipe_ids]
+    recipes = recipe_cache.get_many_or_load(keys, fetch)
+    return [recipes[key] for key in keys if recipes[key]]
+
+
 def get_recipes(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
-    """Get all recipes with optional category filter"""
+    """Get a page of recipes with optional category filter"""
     try:
         params = event.get('queryStringParameters') or {}
-        category = params.get('category')
+        categories = parse_categories(event)
+        category = categories[0] if len(categories) == 1 else None
+        
+        if params.get('ids'):
+            return get_recipes_by_ids(params['ids'], headers)
+        
+        try:
+            limit = min(max(int(params.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+            start_key = decode_cursor(params.get('cursor'))
+        except ValueError:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': dumps({'message': 'Invalid limit or cursor'})
+            }
+        
+        diets = parse_list_param(event, 'diet')
+        allergens = parse_list_param(event, 'allergens')
+        if diets or allergens:
+            return get_safe_recipes(diets, allergens, category, limit, start_key, headers)
+        
+        if len(categories) > 1:
+            return get_recipes_by_categories(categories, limit, params.get('cursor'), headers)
         
         if category:
-            recipes = db_client.query(
-                settings.RECIPES_TABLE,
-                Key('category').eq(category),
-                index_name='CategoryIndex'
+            recipes, last_key = recipe_cache.get_or_load(
+                ('category', category, limit, params.get('cursor')),
+                lambda: db_client.query_page(
+                    settings.RECIPES_TABLE,
+                    Key('category').eq(category),
+                    index_name='CategoryIndex',
+                    limit=limit,
+                    start_key=start_key
+                )
             )
         else:
-            recipes = db_client.scan(settings.RECIPES_TABLE)
+            recipes, last_key = recipe_cache.get_or_load(
+                ('page', limit, params.get('cursor')),
+                lambda: db_client.scan_page(
+                    settings.RECIPES_TABLE,
+                    limit=limit,
+                    start_key=start_key
+                )
+            )
         
         return {
             'statusCode': 200,
             'headers': headers,
-            'body': json.dumps({'recipes': recipes})
+            'body': dumps({'recipes': recipes, 'next_cursor': encode_cursor(last_key)})
         }
         
     except Exception as e:
         return {
             'statusCode': 500,
             'headers': headers,
-            'body': json.dumps({'message': 'Failed to get recipes', 'error': str(e)})
+            'body': dumps({'message': 'Failed to get recipes', 'error': str(e)})
+        }
+
+
+def parse_categories(event: Dict[str, Any]) -> List[str]:
+    """Categories from ?category=a,b or repeated ?category=a&category=b"""
+    return parse_list_param(event, 'category')
+
+
+def parse_list_param(event: Dict[str, Any], name: str) -> List[str]:
+    """Values from ?name=a,b or repeated ?name=a&name=b"""
+    multi_params = event.get('multiValueQueryStringParameters') or {}
+    params = event.get('queryStringParameters') or {}
+    values = multi_params.get(name) or ([params[name]] if params.get(name) else [])
+    
+    parsed = []
+    for value in values:
+        parsed.extend(part.strip() for part in value.split(',') if part.strip())
+    return list(dict.fromkeys(parsed))
+
+
+def get_safe_recipes(diets: List[str], allergens: List[str], category: Optional[str],
+                     limit: int, start_key: Optional[Dict[str, Any]],
+                     headers: Dict[str, str]) -> Dict[str, Any]:
+    """Page through recipes matching every diet and free of every allergen"""
+    # NumPy is only needed on this path, so the catalog is imported lazily
+    from recipe_catalog import recipe_catalog
+    
+    recipe_ids = recipe_catalog.safe_ids(diets, allergens, category)
+    offset = int((start_key or {}).get('offset', 0))
+    page_ids = recipe_ids[offset:offset + limit]
+    next_offset = offset + len(page_ids)
+    
+    return {
+        'statusCode': 200,
+        'headers': headers,
+        'body': dumps({
+            'recipes': load_recipes(page_ids),
+            'next_cursor': encode_cursor({'offset': next_offset}) if next_offset < len(recipe_ids) else None
+        })
+    }
+
+
+def get_recipes_by_categories(categories: List[str], limit: int, cursor: Optional[str],
+                              headers: Dict[str, str]) -> Dict[str, Any]:
+    """Recipes across several categories in created_at order, queried concurrently
+    
+    Same order as the single-category route. The cursor holds, per category
+    with items left, the index key of the last recipe returned from it.
+    """
+    if len(categories) > MAX_CATEGORIES:
+        return {
+            'statusCode': 400,
+            'headers': headers,
+            'body': dumps({'message': f'At most {MAX_CATEGORIES} categories per request'})
         }
+    
+    if cursor:
+        try:
+            positions = (decode_cursor(cursor) or {})['categories']
+            if not isinstance(positions, dict) or not set(positions) <= set(categories):
+                raise ValueError(cursor)
+        except (KeyError, TypeError, ValueError):
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': dumps({'message': 'Cursor does not match these categories'})
+            }
+        # Categories missing from the cursor were exhausted on an earlier page
+        categories = [category for category in categories if category in positions]
+    else:
+        positions = {category: None for category in categories}
+    
+    def fetch():
+        # One extra item per category tells whether it has more after this page
+        per_category = db_client.query_many(
+            settings.RECIPES_TABLE,
+            [Key('category').eq(category) for category in categories],
+            index_name='CategoryIndex',
+            limit=limit + 1,
+            start_keys=[positions[category] for category in categories]
+        )
+        merged = heapq.merge(
+            *([(recipe['created_at'], index, position, recipe) for position, recipe in enumerate(recipes)]
+              for index, recipes in enumerate(per_category))
+        )
+        page = [entry for _, entry in zip(range(limit), merged)]
+        
+        taken = [0] * len(categories)
+        last = {}
+        for _, index, _, recipe in page:
+            taken[index] += 1
+            last[index] = recipe
+        next_positions = {}
+        for index, category in enumerate(categories):
+            if taken[index] < len(per_category[index]):
+                if index in last:
+                    recipe = last[index]
+                    next_positions[category] = {
+                        'recipe_id': recipe['recipe_id'],
+                        'category': recipe['category'],
+                        'created_at': recipe['created_at']
+                    }
+                else:
+                    next_positions[category] = positions[category]
+        return [entry[-1] for entry in page], next_positions
+    
+    recipes, next_positions = recipe_cache.get_or_load(
+        ('categories', tuple(sorted(categories)), limit, cursor), fetch
+    )
+    
+    return {
+        'statusCode': 200,
+        'headers': headers,
+        'body': dumps({
+            'recipes': recipes,
+            'next_cursor': encode_cursor({'categories': next_positions}) if next_positions else None
+        })
+    }
+
+
+def get_recipes_by_ids(ids_param: str, headers: Dict[str, str]) -> Dict[str, Any]:
+    """Get many recipes by ID in one call (GET /recipes?ids=a,b,c)"""
+    recipe_ids = list(dict.fromkeys(
+        recipe_id.strip() for recipe_id in ids_param.split(',') if recipe_id.strip()
+    ))
+    
+    if len(recipe_ids) > MAX_BATCH_IDS:
+        return {
+            'statusCode': 400,
+            'headers': headers,
+            'body': dumps({'message': f'At most {MAX_BATCH_IDS} ids per request'})
+        }
+    
+    recipes = load_recipes(recipe_ids)
+    found = {recipe['recipe_id'] for recipe in recipes}
+    
+    return {
+        'statusCode': 200,
+        'headers': headers,
+        'body': dumps({
+            'recipes': recipes,
+            'missing': [recipe_id for recipe_id in recipe_ids if recipe_id not in found]
+        })
+    }
 
 
 def get_recipe(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
@@ -94,29 +327,95 @@ def get_recipe(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]
             return {
                 'statusCode': 400,
                 'headers': headers,
-                'body': json.dumps({'message': 'Recipe ID required'})
+                'body': dumps({'message': 'Recipe ID required'})
             }
         
-        recipe = db_client.get_item(settings.RECIPES_TABLE, {'recipe_id': recipe_id})
+        recipe = load_recipe(recipe_id)
         
         if not recipe:
             return {
                 'statusCode': 404,
                 'headers': headers,
-                'body': json.dumps({'message': 'Recipe not found'})
+                'body': dumps({'message': 'Recipe not found'})
+            }
+        
+        return {
+            'statusCode': 200,
+            'headers': headers,
+            'body': dumps(recipe)
+        }
+        
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': dumps({'message': 'Failed to get recipe', 'error': str(e)})
+        }
+
+
+def get_similar_recipes(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
+    """Recipes most like one recipe, answered from the similarity index"""
+    try:
+        recipe_id = (event.get('pathParameters') or {}).get('id')
+        params = event.get('queryStringParameters') or {}
+        
+        if not recipe_id:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': dumps({'message': 'Recipe ID required'})
+            }
+        
+        try:
+            k = min(max(int(params.get('k', DEFAULT_SIMILAR)), 1), MAX_SIMILAR)
+        except ValueError:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': dumps({'message': 'Invalid k'})
+            }
+        
+        # NumPy is only needed on this path, so the index is imported lazily
+        from recipe_similarity import similarity_index
+        
+        # Over-fetched so results can still fill k after dropping deletions
+        similar = similarity_index.similar(recipe_id, 2 * k)
+        if similar is None:
+            return {
+                'statusCode': 404,
+                'headers': headers,
+                'body': dumps({'message': 'Recipe not found in similarity index'})
             }
         
+        # The index is rebuilt offline, so it still lists recipes deleted
+        # since; keep only those the catalog can still load
+        existing = {
+            recipe['recipe_id']
+            for recipe in load_recipes([recipe_id] + [item['recipe_id'] for item in similar])
+        }
+        if recipe_id not in existing:
+            return {
+                'statusCode': 404,
+                'headers': headers,
+                'body': dumps({'message': 'Recipe not found'})
+            }
+        similar = [item for item in similar if item['recipe_id'] in existing][:k]
+        
         return {
             'statusCode': 200,
             'headers': headers,
-            'body': json.dumps(recipe)
+            'body': dumps({
+                'recipe_id': recipe_id,
+                'similar': similar,
+                'count': len(similar)
+            })
         }
         
     except Exception as e:
         return {
             'statusCode': 500,
             'headers': headers,
-            'body': json.dumps({'message': 'Failed to get recipe', 'error': str(e)})
+            'body': dumps({'message': 'Failed to get similar recipes', 'error': str(e)})
         }
 
 
@@ -125,7 +424,7 @@ def create_recipe(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, A
     try:
         # TODO: Add admin authorization check
         
-        body = json.loads(event.get('body', '{}'))
+        body = parse_body(event)
         
         recipe = {
             'recipe_id': generate_id(),
@@ -145,19 +444,22 @@ def create_recipe(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, A
             'updated_at': get_timestamp()
         }
         
+        normalize_recipe(recipe)
         db_client.put_item(settings.RECIPES_TABLE, recipe)
+        search_index.index_recipe(recipe)
+        update_suggestions(recipe['recipe_id'], recipe, recipe_cache.bump_version())
         
         return {
             'statusCode': 201,
             'headers': headers,
-            'body': json.dumps(recipe)
+            'body': dumps(recipe)
         }
         
     except Exception as e:
         return {
             'statusCode': 500,
             'headers': headers,
-            'body': json.dumps({'message': 'Failed to create recipe', 'error': str(e)})
+            'body': dumps({'message': 'Failed to create recipe', 'error': str(e)})
         }
 
 
@@ -173,40 +475,56 @@ def update_recipe(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, A
             return {
                 'statusCode': 400,
                 'headers': headers,
-                'body': json.dumps({'message': 'Recipe ID required'})
+                'body': dumps({'message': 'Recipe ID required'})
             }
         
-        body = json.loads(event.get('body', '{}'))
+        body = parse_body(event)
+        previous = db_client.get_item(settings.RECIPES_TABLE, {'recipe_id': recipe_id})
+        
+        if 'tags' in body:
+            body['tags'] = normalize_tags(body['tags'])
+        if 'ingredients' in body:
+            body['ingredients'] = normalize_ingredients(body['ingredients'])
         
-        # Build update expression dynamically
+        # Build update expression dynamically; names go through placeholders
+        # because some (name) are DynamoDB reserved words
         update_expr = "SET updated_at = :updated_at"
         expr_values = {':updated_at': get_timestamp()}
+        expr_names = {}
         
         for key in ['name', 'description', 'category', 'ingredients', 'instructions', 
                    'prep_time', 'cook_time', 'servings', 'nutrition', 'image_url', 
                    'difficulty', 'tags']:
             if key in body:
-                update_expr += f", {key} = :{key}"
+                update_expr += f", #{key} = :{key}"
                 expr_values[f':{key}'] = body[key]
+                expr_names[f'#{key}'] = key
+        
+        if 'tags' in body or 'ingredients' in body:
+            update_expr += ", dietary_flags = :dietary_flags"
+            expr_values[':dietary_flags'] = recipe_flags({**(previous or {}), **body})
         
         updated_recipe = db_client.update_item(
             settings.RECIPES_TABLE,
             {'recipe_id': recipe_id},
             update_expr,
-            expr_values
+            expr_values,
+            expression_names=expr_names
         )
+        search_index.index_recipe(updated_recipe, previous)
+        update_suggestions(recipe_id, updated_recipe, recipe_cache.bump_version())
         
         return {
             'statusCode': 200,
             'headers': headers,
-            'body': json.dumps(updated_recipe)
+            'body': dumps(updated_recipe)
         }
         
     except Exception as e:
         return {
             'statusCode': 500,
             'headers': headers,
-            'body': json.dumps({'message': 'Failed to update recipe', 'error': str(e)})
+            'body': dumps({'message': 'Failed to update recipe', 'error': str(e)})
         }
 
 
@@ -222,10 +540,14 @@ def delete_recipe(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, A
             return {
                 'statusCode': 400,
                 'headers': headers,
-                'body': json.dumps({'message': 'Recipe ID required'})
+                'body': dumps({'message': 'Recipe ID required'})
             }
         
+        previous = db_client.get_item(settings.RECIPES_TABLE, {'recipe_id': recipe_id})
         db_client.delete_item(settings.RECIPES_TABLE, {'recipe_id': recipe_id})
+        if previous:
+            search_index.remove_recipe(previous)
+            update_suggestions(recipe_id, None, recipe_cache.bump_version())
         
         return {
             'statusCode': 204,
@@ -237,7 +559,7 @@ def delete_recipe(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, A
         return {
             'statusCode': 500,
             'headers': headers,
-            'body': json.dumps({'message': 'Failed to delete recipe', 'error': str(e)})
+            'body': dumps({'message': 'Failed to delete recipe', 'error': str(e)})
         }
 
 
@@ -245,34 +567,111 @@ def search_recipes(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str,
     """Search recipes by query string"""
     try:
         params = event.get('queryStringParameters') or {}
-        query = params.get('q', '').lower()
+        query = params.get('q', '').strip()
         
         if not query:
             return {
                 'statusCode': 400,
                 'headers': headers,
-                'body': json.dumps({'message': 'Search query required'})
+                'body': dumps({'message': 'Search query required'})
+            }
+        
+        try:
+            limit = min(max(int(params.get('limit', DEFAULT_SEARCH_RESULTS)), 1), MAX_SEARCH_RESULTS)
+        except ValueError:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': dumps({'message': 'Invalid limit'})
             }
         
-        # Simple search - in production, use Elasticsearch or DynamoDB Search
-        all_recipes = db_client.scan(settings.RECIPES_TABLE)
+        diets = parse_list_param(event, 'diet')
+        allergens = parse_list_param(event, 'allergens')
+        # Filtering drops hits after ranking, so rank a deeper list first
+        depth = MAX_SEARCH_RESULTS if diets or allergens else limit
+        
+        # Rank against the inverted index, then load only the top hits
+        ranked = recipe_cache.get_or_load(
+            ('search', query.lower(), depth),
+            lambda: search_index.search(query, depth)
+        )
+        recipe_ids = [recipe_id for recipe_id, score in ranked]
+        
+        if diets or allergens:
+            from recipe_catalog import recipe_catalog
+            safe = set(recipe_catalog.safe_ids(diets, allergens))
+            recipe_ids = [recipe_id for recipe_id in recipe_ids if recipe_id in safe][:limit]
         
-        results = [
-            recipe for recipe in all_recipes
-            if query in recipe.get('name', '').lower() or
-               query in recipe.get('description', '').lower() or
-               query in str(recipe.get('tags', [])).lower()
-        ]
+        results = load_recipes(recipe_ids)
         
         return {
             'statusCode': 200,
             'headers': headers,
-            'body': json.dumps({'recipes': results, 'count': len(results)})
+            'body': dumps({'recipes': results, 'count': len(results)})
         }
         
     except Exception as e:
         return {
             'statusCode': 500,
             'headers': headers,
-            'body': json.dumps({'message': 'Search failed', 'error': str(e)})
+            'body': dumps({'message': 'Search failed', 'error': str(e)})
         }
+
+
+def suggest_recipes(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
+    """Type-ahead suggestions for a prefix of a recipe name, tag or ingredient"""
+    try:
+        params = event.get('queryStringParameters') or {}
+        prefix = params.get('prefix', '')[:MAX_PREFIX_LENGTH]
+        
+        try:
+            limit = min(max(int(params.get('limit', DEFAULT_SUGGESTIONS)), 1), MAX_SUGGESTIONS)
+        except ValueError:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': dumps({'message': 'Invalid limit'})
+            }
+        
+        # NumPy is only needed on this path, so the index is imported lazily
+        from recipe_suggest import suggest_index
+        
+        suggest_index.ensure_fresh()
+        suggestions = suggest_index.suggest(prefix, limit)
+        
+        return {
+            'statusCode': 200,
+            'headers': headers,
+            'body': dumps({'prefix': prefix, 'suggestions': suggestions})
+        }
+        
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': dumps({'message': 'Suggest failed', 'error': str(e)})
+        }
+
+
+def update_suggestions(recipe_id: str, recipe: Optional[Dict[str, Any]], version: int) -> None:
+    """Apply a recipe write to this container's suggest index, if it has one"""
+    # A container that never served a suggestion has no index to update;
+    # importing it here would load NumPy on every write
+    if 'recipe_suggest' not in sys.modules:
+        return
+    from recipe_suggest import suggest_index
+    
+    try:
+        suggest_index.apply_write(recipe_id, recipe, version)
+    except Exception as e:
+        # The version bump still triggers a rebuild
+        print(f"Suggest index update failed: {e}")
+
+
+def get_cache_stats(event: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
+    """Report catalog cache hit/miss counters for this container"""
+    return {
+        'statusCode': 200,
+        'headers': headers,
+        'body': dumps(recipe_cache.stats())
+    }
@@ -0,0 +1,132 @@
+"""
+Offline job: recompute stored nutrition targets for every profile
+
+Run after changing the activity multipliers, goal adjustments or macro
+ratios in nutrition.py. Profiles are streamed with a parallel segment scan,
+targets are computed a page at a time with NumPy, and only profiles whose
+targets changed are written back, at a capped write rate. Each rewritten
+profile's pre-generated daily plan is dropped, since it was built for the
+old targets.
+
+Each write is an UpdateItem conditioned on the profile version that was
+scanned: BatchWriteItem cannot carry conditions and would overwrite edits
+made while the job runs. A profile updated mid-run already has fresh
+targets from the profiles handler, so its conflict is simply skipped.
+
+Run from backend/:  python -m functions.recompute_targets [--dry-run] [--segments N] [--writes-per-second N]
+"""
+import argparse
+import threading
+import time
+from typing import Any, Dict, List
+from boto3.dynamodb.conditions import Attr
+from database import db_client, is_condition_failure
+from config import settings
+from meal_plans import invalidate_daily_plan
+from nutrition import TARGET_FIELDS, nutrition_targets_batch, stored_targets
+from throttling import TokenBucket
+
+SCAN_PAGE_SIZE = 500
+
+
+class RecomputeStats:
+    """Counters shared by the segment workers"""
+
+    def __init__(self):
+        self.scanned = 0
+        self.changed = 0
+        self.written = 0
+        self.conflicts = 0
+        self._lock = threading.Lock()
+
+    def add(self, **counts: int) -> None:
+        with self._lock:
+            for name, count in counts.items():
+                setattr(self, name, getattr(self, name) + count)
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        return {
+            'scanned': self.scanned,
+            'changed': self.changed,
+            'written': self.written,
+            'conflicts': self.conflicts,
+            'elapsed_seconds': round(elapsed, 3),
+            'profiles_per_second': round(self.scanned / elapsed, 1) if elapsed else 0.0
+        }
+
+
+def recompute_targets(dry_run: bool = False, segments: int = None,
+                      writes_per_second: float = None) -> Dict[str, Any]:
+    """Recompute every profile's targets; dry_run computes without writing"""
+    segments = segments or settings.JOB_SCAN_SEGMENTS
+    writes_per_second = writes_per_second or settings.JOB_WRITES_PER_SECOND
+    write_budget = TokenBucket(writes_per_second, max(1.0, writes_per_second))
+    stats = RecomputeStats()
+    names = {f'#f{i}': field for i, field in enumerate(('user_id', 'version', 'nutrition_targets') + TARGET_FIELDS)}
+
+    def handle_page(profiles: List[Dict[str, Any]]) -> None:
+        targets = nutrition_targets_batch(profiles)
+        changed = [
+            (profile, new_targets) for profile, new_targets in zip(profiles, targets)
+            if stored_targets(profile) != new_targets
+        ]
+        stats.add(scanned=len(profiles), changed=len(changed))
+        if dry_run:
+            return
+
+        for profile, new_targets in changed:
+            write_budget.acquire()
+            condition = (Attr('version').eq(profile['version']) if 'version' in profile
+                         else Attr('version').not_exists())
+            try:
+                db_client.update_item(
+                    settings.USER_PROFILES_TABLE,
+                    {'user_id': profile['user_id']},
+                    "SET nutrition_targets = :targets",
+                    {':targets': new_targets},
+                    condition_expression=Attr('user_id').exists() & condition
+                )
+                stats.add(written=1)
+            except Exception as e:
+                if not is_condition_failure(e):
+                    raise
+                stats.add(conflicts=1)
+                continue
+
+            try:
+                invalidate_daily_plan(profile['user_id'])
+            except Exception as e:
+                print(f"Failed to invalidate daily plan for {profile['user_id']}: {e}")
+
+    started = time.monotonic()
+    db_client.scan_segments(
+        settings.USER_PROFILES_TABLE,
+        segments,
+        handle_page,
+        limit=SCAN_PAGE_SIZE,
+        ProjectionExpression=', '.join(names),
+        ExpressionAttributeNames=names,
+        ConsistentRead=True
+    )
+    return stats.report(time.monotonic() - started)
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Scheduled or manual invocation: {"dry_run": bool, "segments": int, "writes_per_second": float}"""
+    event = event or {}
+    result = recompute_targets(
+        dry_run=bool(event.get('dry_run', False)),
+        segments=event.get('segments'),
+        writes_per_second=event.get('writes_per_second')
+    )
+    print(result)
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Recompute stored nutrition targets')
+    parser.add_argument('--dry-run', action='store_true', help='compute and report without writing')
+    parser.add_argument('--segments', type=int, default=None, help='parallel scan segments')
+    parser.add_argument('--writes-per-second', type=float, default=None, help='write rate cap')
+    args = parser.parse_args()
+    print(recompute_targets(args.dry_run, args.segments, args.writes_per_second))
@@ -0,0 +1,375 @@
+"""
+Shared meal recommendation generation
+
+AI recommendations (cached per profile fingerprint, generated once across
+containers) and the rule-based catalog fallback. Used by the
+recommendations handler and the nightly pre-generation job.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
+from config import settings, LazyObject
+from api_responses import dumps, loads
+from recommendation_cache import bucket_macros, recommendation_cache, recommendation_fingerprint
+from throttling import ModelCallLimiter, ModelBudgetExceeded, SingleFlight
+from nutrition import profile_targets
+from dietary_flags import is_safe, normalize_term, profile_masks, recipe_flags
+
+# Below this much remaining time a model call is not worth starting
+MIN_MODEL_SECONDS = 1.0
+
+# Identical in-flight prompts in this process share one model call, and all
+# calls draw from one budget; over budget we degrade to rule-based results
+model_calls = SingleFlight()
+model_limiter = LazyObject(lambda: ModelCallLimiter(
+    requests_per_second=settings.OPENAI_MAX_REQUESTS_PER_SECOND,
+    tokens_per_minute=settings.OPENAI_MAX_TOKENS_PER_MINUTE
+))
+hedge_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='model-hedge')
+
+
+@lru_cache(maxsize=None)
+def get_openai_client() -> Optional[Any]:
+    """Build the OpenAI client on first use; None when unconfigured or not installed"""
+    if not settings.OPENAI_API_KEY:
+        return None
+    try:
+        from openai import OpenAI
+    except ImportError:
+        return None
+    # No SDK retries: a retry would blow the request deadline, and failures
+    # already fall back to rule-based recommendations
+    return OpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        timeout=settings.OPENAI_TIMEOUT_SECONDS,
+        max_retries=0
+    )
+
+
+def seconds_left(deadline: Optional[float], cap: float) -> float:
+    """Time budget left before the deadline, capped at `cap`"""
+    if deadline is None:
+        return cap
+    return max(0.0, min(cap, deadline - time.monotonic()))
+
+
+def generate_ai_recommendations(profile: Dict[str, Any], meal_type: str,
+                                use_cache: bool = True,
+                                deadline: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
+    """Cached or freshly generated AI recommendations, or None when the model is unavailable"""
+    fitness_goal = profile.get('fitness_goal', 'maintenance')
+    dietary_preferences = profile.get('dietary_preferences', [])
+    allergies = profile.get('allergies', [])
+    activity_level = profile.get('activity_level', 'moderate')
+    
+    # AI results are shared by every profile in the same macro bucket, so
+    # they are generated for the bucket rather than the exact targets
+    macros = profile_targets(profile)
+    macros = {**macros, **bucket_macros(macros)}
+    fingerprint = recommendation_fingerprint(
+        fitness_goal, dietary_preferences, allergies, activity_level, meal_type, macros
+    )
+    
+    if use_cache:
+        try:
+            recommendations = recommendation_cache.get(fingerprint)
+        except Exception as e:
+            # A throttled or unavailable cache table costs a cache hit, not the request
+            print(f"Recommendation cache read failed: {e}")
+            recommendations = None
+        if recommendations is not None:
+            log_cache_stats(fingerprint, hit=True)
+            return recommendations
+    
+    # Set while this call holds the fingerprint's generation lease
+    lease = threading.Event()
+    
+    def generate():
+        return model_calls.do(fingerprint, lambda: generate_shared_ai_recommendations(
+            fingerprint, fitness_goal, dietary_preferences, allergies,
+            activity_level, meal_type, macros, deadline, lease
+        ))
+    
+    try:
+        # Use OpenAI for intelligent recommendations
+        if settings.RECOMMENDATION_HEDGE_ENABLED:
+            # Answer from rules if the model is slow
+            future = hedge_executor.submit(generate)
+            recommendations = future.result(
+                timeout=seconds_left(deadline, settings.RECOMMENDATION_HEDGE_SECONDS)
+            )
+        else:
+            recommendations = generate()
+    except FutureTimeout:
+        print(f"Model call hedged after {settings.RECOMMENDATION_HEDGE_SECONDS}s, serving rule-based")
+        # Lambda freezes the container once we respond, so the abandoned call
+        # stalls rather than finishing; free the lease so other containers
+        # generate instead of waiting on it
+        if lease.is_set():
+            lease.clear()
+            try:
+                recommendation_cache.release_lease(fingerprint)
+            except Exception as e:
+                print(f"Lease release failed: {e}")
+        return None
+    except Exception as e:
+        print(f"OpenAI API error: {e}")
+        return None
+    
+    if recommendations is not None:
+        log_cache_stats(fingerprint, hit=False)
+    return recommendations
+
+
+def generate_shared_ai_recommendations(fingerprint: str, fitness_goal: str,
+                                       dietary_preferences: List[str], allergies: List[str],
+                                       activity_level: str, meal_type: str,
+                                       macros: Dict[str, int],
+                                       deadline: Optional[float] = None,
+                                       lease: Optional[threading.Event] = None) -> Optional[List[Dict[str, Any]]]:
+    """Generate and cache AI recommendations once across all containers
+    
+    A lease in the recommendation cache table elects one generator per
+    fingerprint. Other callers wait briefly for its result and get None
+    (meaning: fall back to rule-based) if it does not arrive in time.
+    `lease` is set while this call holds it; a caller that gives up on the
+    call clears it and releases the lease itself.
+    """
+    if not recommendation_cache.acquire_lease(fingerprint, settings.RECOMMENDATION_LEASE_SECONDS):
+        return recommendation_cache.wait_for(
+            fingerprint, seconds_left(deadline, settings.RECOMMENDATION_LEASE_WAIT_SECONDS)
+        )
+    if lease is not None:
+        lease.set()
+    
+    try:
+        recommendations = get_ai_recommendations(
+            fitness_goal, dietary_preferences, allergies,
+            activity_level, meal_type, macros,
+            timeout=seconds_left(deadline, settings.OPENAI_TIMEOUT_SECONDS)
+        )
+        try:
+            recommendation_cache.put(fingerprint, recommendations)
+        except Exception as e:
+            print(f"Recommendation cache write failed: {e}")
+        return recommendations
+    finally:
+        # Already released (and possibly re-taken elsewhere) if the caller hedged
+        if lease is None or lease.is_set():
+            try:
+                recommendation_cache.release_lease(fingerprint)
+            except Exception as e:
+                print(f"Lease release failed: {e}")
+
+
+def log_cache_stats(fingerprint: str, hit: bool) -> None:
+    """Emit recommendation cache counters as a structured log line"""
+    print(dumps({
+        'metric': 'recommendation_cache',
+        'fingerprint': fingerprint[:12],
+        'hit': hit,
+        **recommendation_cache.stats()
+    }))
+
+
+def get_ai_recommendations(fitness_goal: str, dietary_preferences: List[str], 
+                          allergies: List[str], activity_level: str, 
+                          meal_type: str, macros: Dict[str, int],
+                          timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Get AI-powered meal recommendations using OpenAI, raising on any failure"""
+    
+    timeout = settings.OPENAI_TIMEOUT_SECONDS if timeout is None else timeout
+    if timeout < MIN_MODEL_SECONDS:
+        raise TimeoutError(f"Only {timeout:.1f}s left, not calling the model")
+    
+    openai_client = get_openai_client()
+    if openai_client is None:
+        raise RuntimeError("OpenAI client is not available")
+    
+    # Compact prompt: a one-line profile and an inline schema keep input
+    # tokens low, and JSON mode stops the model padding its answer with prose
+    prompt = (
+        f"3 {meal_type} meals for: goal={fitness_goal}; "
+        f"diet={', '.join(dietary_preferences) if dietary_preferences else 'none'}; "
+        f"allergies={', '.join(allergies) if allergies else 'none'}; "
+        f"activity={activity_level}. "
+        f"Per meal target: {macros['calories'] // 3} kcal, {macros['protein'] // 3}g protein, "
+        f"{macros['carbs'] // 3}g carbs, {macros['fat'] // 3}g fat.\n"
+        'Reply as {"meals":[{"name":str,"description":str,"ingredients":[str],'
+        '"nutrition":{"calories":int,"protein":int,"carbs":int,"fat":int},'
+        '"prep_time":str,"difficulty":"easy|medium|hard"}]}'
+    )
+    
+    # Rough prompt size (~4 characters per token) plus the completion cap
+    estimated_tokens = len(prompt) // 4 + settings.OPENAI_MAX_OUTPUT_TOKENS
+    if not model_limiter.try_acquire(estimated_tokens):
+        raise ModelBudgetExceeded(f"Model call budget exhausted: {model_limiter.stats()}")
+    
+    started = time.monotonic()
+    try:
+        response = openai_client.chat.completions.create(
+            model=settings.OPENAI_MODEL,
+            messages=[
+                {"role": "system", "content": "You are a professional nutritionist. Answer in JSON only."},
+                {"role": "user", "content": prompt}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.7,
+            max_tokens=settings.OPENAI_MAX_OUTPUT_TOKENS,
+            timeout=timeout
+        )
+    except Exception as e:
+        model_limiter.record_usage(estimated_tokens, 0)
+        log_model_call(started, None, type(e).__name__)
+        raise
+    
+    usage = getattr(response, 'usage', None)
+    model_limiter.record_usage(estimated_tokens, usage.total_tokens if usage else estimated_tokens)
+    log_model_call(started, usage, 'ok')
+    
+    content = response.choices[0].message.content
+    # Parse JSON from response
+    data = loads(content)
+    recommendations = data.get('meals') if isinstance(data, dict) else data
+    if not isinstance(recommendations, list):
+        raise ValueError("Model response did not contain a meals list")
+    return recommendations
+
+
+def log_model_call(started: float, usage: Any, outcome: str) -> None:
+    """Emit latency and token usage for one model call as a structured log line"""
+    print(dumps({
+        'metric': 'model_call',
+        'model': settings.OPENAI_MODEL,
+        'outcome': outcome,
+        'latency_ms': int((time.monotonic() - started) * 1000),
+        'prompt_tokens': getattr(usage, 'prompt_tokens', None),
+        'completion_tokens': getattr(usage, 'completion_tokens', None),
+        'total_tokens': getattr(usage, 'total_tokens', None)
+    }))
+
+
+# Generic meals used when the recipe catalog has nothing suitable; tags
+# carry the diets each one satisfies, as on catalog recipes
+DEFAULT_MEALS = {
+    'breakfast': [
+        {
+            "name": "High-Protein Oatmeal Bowl",
+            "description": "Creamy oatmeal topped with nuts, seeds, and berries",
+            "ingredients": ["Oats", "Protein powder", "Almonds", "Blueberries", "Chia seeds"],
+            "prep_time": "10 minutes",
+            "difficulty": "easy"
+        },
+        {
+            "name": "Veggie Egg White Scramble",
+            "description": "Light and nutritious egg whites with colorful vegetables",
+            "ingredients": ["Egg whites", "Spinach", "Tomatoes", "Bell peppers", "Whole grain toast"],
+            "prep_time": "15 minutes",
+            "difficulty": "easy",
+            "tags": ["vegetarian"]
+        },
+        {
+            "name": "Greek Yogurt Parfait",
+            "description": "Layered Greek yogurt with granola and fresh fruit",
+            "ingredients": ["Greek yogurt", "Granola", "Mixed berries", "Honey", "Walnuts"],
+            "prep_time": "5 minutes",
+            "difficulty": "easy",
+            "tags": ["vegetarian"]
+        }
+    ],
+    'lunch': [
+        {
+            "name": "Grilled Chicken Salad",
+            "description": "Fresh mixed greens with grilled chicken breast",
+            "ingredients": ["Chicken breast", "Mixed greens", "Cherry tomatoes", "Cucumber", "Olive oil"],
+            "prep_time": "20 minutes",
+            "difficulty": "medium"
+        },
+        {
+            "name": "Quinoa Buddha Bowl",
+            "description": "Colorful bowl with quinoa, roasted vegetables, and tahini",
+            "ingredients": ["Quinoa", "Chickpeas", "Sweet potato", "Kale", "Tahini"],
+            "prep_time": "30 minutes",
+            "difficulty": "medium",
+            "tags": ["vegan"]
+        },
+        {
+            "name": "Turkey and Avocado Wrap",
+            "description": "Lean turkey breast with fresh avocado in whole wheat wrap",
+            "ingredients": ["Turkey breast", "Avocado", "Whole wheat wrap", "Lettuce", "Tomato"],
+            "prep_time": "10 minutes",
+            "difficulty": "easy"
+        }
+    ],
+    'dinner': [
+        {
+            "name": "Baked Salmon with Vegetables",
+            "description": "Omega-3 rich salmon with roasted seasonal vegetables",
+            "ingredients": ["Salmon fillet", "Broccoli", "Carrots", "Lemon", "Herbs"],
+            "prep_time": "25 minutes",
+            "difficulty": "medium"
+        },
+        {
+            "name": "Lean Beef Stir-Fry",
+            "description": "Tender beef strips with colorful vegetables",
+            "ingredients": ["Lean beef", "Bell peppers", "Snap peas", "Brown rice", "Soy sauce"],
+            "prep_time": "20 minutes",
+            "difficulty": "medium"
+        },
+        {
+            "name": "Vegetarian Lentil Curry",
+            "description": "Hearty lentil curry with aromatic spices",
+            "ingredients": ["Red lentils", "Coconut milk", "Spinach", "Tomatoes", "Curry spices"],
+            "prep_time": "35 minutes",
+            "difficulty": "medium",
+            "tags": ["vegan"]
+        }
+    ]
+}
+
+
+def get_rule_based_recommendations(fitness_goal: str, dietary_preferences: List[str],
+                                   allergies: List[str], meal_type: str, 
+                                   macros: Dict[str, int],
+                                   boosts: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+    """Fallback rule-based recommendations: catalog recipes closest to the per-meal targets,
+    blended with the user's favorites-based scores (`boosts`) when given"""
+    
+    # NumPy is only needed on this path, so the catalog is imported lazily
+    from recipe_catalog import recipe_catalog, recipe_to_meal
+    
+    target = {field: macros[field] / 3 for field in ('calories', 'protein', 'carbs', 'fat')}
+    
+    try:
+        recipes = recipe_catalog.recommend(
+            target, fitness_goal, meal_type, dietary_preferences, allergies, k=3, boosts=boosts
+        )
+    except Exception as e:
+        print(f"Recipe catalog unavailable: {e}")
+        recipes = []
+    
+    if recipes:
+        return [recipe_to_meal(recipe) for recipe in recipes]
+    
+    # An empty catalog result may mean the filters excluded everything, so
+    # the generic meals go through the same filters
+    nutrition = {field: int(value) for field, value in target.items()}
+    return [
+        {**meal, 'nutrition': nutrition}
+        for meal in DEFAULT_MEALS.get(meal_type, DEFAULT_MEALS['dinner'])
+        if is_default_meal_safe(meal, dietary_preferences, allergies)
+    ]
+
+
+def is_default_meal_safe(meal: Dict[str, Any], dietary_preferences: List[str], allergies: List[str]) -> bool:
+    """Whether a generic meal passes the same diet and allergen checks as catalog recipes"""
+    required, forbidden, other_preferences, other_allergies = profile_masks(dietary_preferences, allergies)
+    if not is_safe(recipe_flags(meal), required, forbidden):
+        return False
+    tags = {normalize_term(tag) for tag in meal.get('tags', [])}
+    text = ' '.join(normalize_term(value) for value in meal['ingredients'] + meal.get('tags', []))
+    return (all(term in tags for term in other_preferences)
+            and not any(term in text for term in other_allergies))
+
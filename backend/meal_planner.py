@@ -0,0 +1,150 @@
+"""
+Weekly meal-plan optimizer over the in-memory recipe catalog
+
+A plan is one breakfast, lunch and dinner per day for up to a week, chosen
+so each day's totals land as close as possible to the daily macro targets.
+The objective is the same weighted relative distance the catalog scores
+single recipes with, applied to a day's summed nutrition.
+
+Exact integer programming is overkill for 21 slots, so the solver is a
+small heuristic:
+
+1. Shortlist the recipes closest to a third of the daily targets for each
+   meal type, after the allergy, preference and prep-time filters.
+2. Build the week day by day, scoring every breakfast x lunch x dinner
+   combination of the shortlists in one broadcast NumPy expression and
+   taking the best one whose recipes are still under the repeat limit.
+3. Improve the week by local search: swap the same meal between two days,
+   or replace a meal with a shortlisted recipe still under the limit,
+   whenever that lowers the week's summed deviation.
+"""
+from typing import Any, Dict, List, Optional
+import numpy as np
+from recipe_catalog import GOAL_WEIGHTS, MACRO_FIELDS, RecipeCatalog
+
+MEAL_SLOTS = ('breakfast', 'lunch', 'dinner')
+MAX_DAYS = 7
+
+# Candidates kept per meal type; combinations per day are this cubed
+SHORTLIST_SIZE = 40
+IMPROVEMENT_PASSES = 3
+
+
+class PlanningError(ValueError):
+    """The constraints leave no recipe for some meal"""
+
+
+def plan_week(catalog: RecipeCatalog, targets: Dict[str, Any], fitness_goal: str = 'maintenance',
+              dietary_preferences: Optional[List[str]] = None, allergies: Optional[List[str]] = None,
+              days: int = MAX_DAYS, max_prep_minutes: Optional[int] = None,
+              max_repeats: int = 1) -> List[Dict[str, Any]]:
+    """Pick a recipe per meal per day; returns one entry per day
+
+    Each day holds the chosen catalog recipes by meal type, the summed
+    nutrition and its deviation from the daily targets. `max_repeats` caps
+    how often a recipe appears in the plan; it is relaxed only when the
+    filters leave too few recipes to honour it.
+    """
+    daily = np.array([max(float(targets.get(field) or 0), 1.0) for field in MACRO_FIELDS], dtype=np.float32)
+    weights = np.array(GOAL_WEIGHTS.get(fitness_goal, GOAL_WEIGHTS['maintenance']), dtype=np.float32)
+    per_meal = {field: float(value) / len(MEAL_SLOTS) for field, value in zip(MACRO_FIELDS, daily)}
+    meal_scores = catalog.score(per_meal, fitness_goal)
+
+    shortlists = []
+    for meal_type in MEAL_SLOTS:
+        mask = catalog.eligible(meal_type, dietary_preferences, allergies)
+        if max_prep_minutes:
+            mask &= catalog.minutes <= max_prep_minutes
+        candidates = np.flatnonzero(mask)
+        if candidates.size == 0:
+            raise PlanningError(f"No {meal_type} recipes match the profile's restrictions")
+        if candidates.size > SHORTLIST_SIZE:
+            candidates = candidates[np.argpartition(meal_scores[candidates], SHORTLIST_SIZE)[:SHORTLIST_SIZE]]
+        shortlists.append(candidates)
+
+    def deviation(totals: np.ndarray) -> np.ndarray:
+        relative = (totals - daily) / daily
+        return np.sqrt((relative * relative) @ weights)
+
+    uses: Dict[int, int] = {}
+    week = np.zeros((days, len(MEAL_SLOTS)), dtype=np.int64)
+    for day in range(days):
+        options = []
+        for candidates in shortlists:
+            counts = np.array([uses.get(int(i), 0) for i in candidates])
+            options.append(candidates[counts < max(max_repeats, counts.min() + 1)])
+
+        breakfast, lunch, dinner = (catalog.nutrition[option] for option in options)
+        totals = breakfast[:, None, None, :] + lunch[None, :, None, :] + dinner[None, None, :, :]
+        scores = deviation(totals)
+        # Uncategorized catalogs share one shortlist; never serve a recipe twice in a day
+        b, l, d = np.ix_(options[0], options[1], options[2])
+        scores[(b == l) | (b == d) | (l == d)] = np.inf
+
+        choice = np.unravel_index(int(np.argmin(scores)), scores.shape)
+        for slot, option in enumerate(options):
+            recipe = int(option[choice[slot]])
+            week[day, slot] = recipe
+            uses[recipe] = uses.get(recipe, 0) + 1
+
+    week = _improve(week, shortlists, catalog.nutrition, deviation, uses, max_repeats)
+    totals = catalog.nutrition[week].sum(axis=1)
+    day_scores = deviation(totals)
+
+    plan = []
+    for day in range(days):
+        meals = {
+            meal_type: {**catalog.recipes[week[day, slot]],
+                        'match_score': round(float(meal_scores[week[day, slot]]), 4)}
+            for slot, meal_type in enumerate(MEAL_SLOTS)
+        }
+        plan.append({
+            'meals': meals,
+            'total_nutrition': {field: int(round(float(value))) for field, value in zip(MACRO_FIELDS, totals[day])},
+            'deviation': round(float(day_scores[day]), 4)
+        })
+    return plan
+
+
+def _improve(week: np.ndarray, shortlists: List[np.ndarray], nutrition: np.ndarray,
+             deviation: Any, uses: Dict[int, int], max_repeats: int) -> np.ndarray:
+    """Local search: swap a meal between two days, or replace it with an unused
+    shortlisted recipe, whenever that lowers the week's summed deviation"""
+    days = week.shape[0]
+    totals = nutrition[week].sum(axis=1)
+    for _ in range(IMPROVEMENT_PASSES):
+        improved = False
+        for slot, candidates in enumerate(shortlists):
+            for first in range(days):
+                # Replacement: every spare candidate for this slot at once
+                current = week[first, slot]
+                spare = np.array([
+                    i for i in candidates
+                    if uses.get(int(i), 0) < max_repeats and i not in week[first]
+                ], dtype=np.int64)
+                if spare.size:
+                    scores = deviation(totals[first] - nutrition[current] + nutrition[spare])
+                    best = int(np.argmin(scores))
+                    if scores[best] < deviation(totals[first]) - 1e-6:
+                        replacement = int(spare[best])
+                        totals[first] += nutrition[replacement] - nutrition[current]
+                        week[first, slot] = replacement
+                        uses[int(current)] -= 1
+                        uses[replacement] = uses.get(replacement, 0) + 1
+                        improved = True
+
+                for second in range(first + 1, days):
+                    a, b = week[first, slot], week[second, slot]
+                    if a == b or b in week[first] or a in week[second]:
+                        continue
+                    delta = nutrition[b] - nutrition[a]
+                    before = deviation(totals[[first, second]]).sum()
+                    after = deviation(np.stack([totals[first] + delta, totals[second] - delta])).sum()
+                    if after < before - 1e-6:
+                        week[first, slot], week[second, slot] = b, a
+                        totals[first] += delta
+                        totals[second] -= delta
+                        improved = True
+        if not improved:
+            break
+    return week
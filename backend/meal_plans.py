@@ -0,0 +1,64 @@
+"""
+Pre-generated daily meal recommendations
+
+The nightly job stores one plan per user in MEAL_PLANS_TABLE under a fixed
+plan_id, so the recommendations endpoint answers with a single key lookup.
+Plans expire after DAILY_PLAN_TTL_SECONDS (also the table TTL attribute)
+and are dropped whenever the profile they were generated from changes.
+Each plan also records the profile version it was built from: the job can
+write a plan from a profile it scanned hours earlier, after an edit already
+dropped the previous plan, so readers skip plans whose version is stale.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from database import db_client, get_timestamp, to_dynamodb
+from config import settings
+
+MEAL_TYPES = ('breakfast', 'lunch', 'dinner')
+
+
+def daily_plan_id(user_id: str) -> str:
+    """plan_id of a user's pre-generated daily plan"""
+    return f"daily#{user_id}"
+
+
+def get_daily_plan_and_profile(user_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """(plan, profile) in one BatchGetItem; the plan is None unless it is
+    unexpired and was built from the profile's current version"""
+    items = db_client.get_items({
+        settings.MEAL_PLANS_TABLE: ({'plan_id': daily_plan_id(user_id)}, None),
+        settings.USER_PROFILES_TABLE: ({'user_id': user_id}, None)
+    })
+    plan = items[settings.MEAL_PLANS_TABLE]
+    profile = items[settings.USER_PROFILES_TABLE]
+    # TTL deletion lags expiry, so expired items can still be read
+    if not plan or not profile or int(plan.get('expires_at', 0)) <= get_timestamp():
+        return None, profile
+    if plan.get('profile_version') != profile.get('version'):
+        return None, profile
+    return plan, profile
+
+
+def daily_plan_item(user_id: str, recommendations: Dict[str, List[Dict[str, Any]]],
+                    source: str, profile_version: Optional[int] = None) -> Dict[str, Any]:
+    """Item for a daily plan; `recommendations` maps meal type to meals and
+    `profile_version` is the version of the profile they were built from"""
+    now = get_timestamp()
+    item = {
+        'plan_id': daily_plan_id(user_id),
+        'user_id': user_id,
+        'plan_type': 'daily',
+        'date': datetime.now(timezone.utc).date().isoformat(),
+        'recommendations': recommendations,
+        'source': source,
+        'created_at': now,
+        'expires_at': now + settings.DAILY_PLAN_TTL_SECONDS
+    }
+    if profile_version is not None:
+        item['profile_version'] = profile_version
+    return to_dynamodb(item)
+
+
+def invalidate_daily_plan(user_id: str) -> None:
+    """Drop a user's plan so the next request regenerates it"""
+    db_client.delete_item(settings.MEAL_PLANS_TABLE, {'plan_id': daily_plan_id(user_id)})
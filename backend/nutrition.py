@@ -0,0 +1,129 @@
+"""
+Daily calorie and macronutrient targets
+
+Targets depend only on a handful of profile fields, so they are computed
+when a profile is written and stored on the item as `nutrition_targets`.
+Read paths use the stored copy and only fall back to computing it for
+profiles written before targets were stored.
+"""
+from typing import Any, Dict, List, Optional
+from conversions import to_float
+
+# Profile fields the targets are derived from; changing any of them
+# invalidates the stored targets
+TARGET_FIELDS = ('weight', 'height', 'age', 'gender', 'activity_level', 'fitness_goal')
+
+ACTIVITY_MULTIPLIERS = {
+    'sedentary': 1.2,
+    'light': 1.375,
+    'moderate': 1.55,
+    'active': 1.725,
+    'very_active': 1.9
+}
+
+FITNESS_GOALS = ('weight_loss', 'weight_gain', 'muscle_gain', 'maintenance')
+GENDERS = ('male', 'female', 'other')
+
+# Mifflin-St Jeor constant per gender; 'other' uses the midpoint
+GENDER_OFFSETS = {'male': 5, 'female': -161}
+DEFAULT_GENDER_OFFSET = -78
+
+# Daily calorie surplus or deficit per goal
+GOAL_ADJUSTMENTS = {'weight_loss': -500, 'weight_gain': 500}
+
+# (protein, carbs, fat) share of calories per goal
+MACRO_RATIOS = {
+    'weight_loss': (0.40, 0.30, 0.30),  # Higher protein, moderate fat, lower carbs
+    'weight_gain': (0.30, 0.45, 0.25)  # Higher carbs and protein, moderate fat
+}
+DEFAULT_MACRO_RATIOS = (0.30, 0.40, 0.30)  # maintenance or muscle_gain: balanced
+
+
+def calculate_calorie_needs(profile: Dict[str, Any]) -> int:
+    """Calculate daily calorie needs using Mifflin-St Jeor Equation"""
+
+    weight = to_float(profile.get('weight'), 70)  # kg
+    height = to_float(profile.get('height'), 170)  # cm
+    age = to_float(profile.get('age'), 30)
+    gender = profile.get('gender') or 'other'
+    activity_level = profile.get('activity_level') or 'moderate'
+    fitness_goal = profile.get('fitness_goal') or 'maintenance'
+
+    # Base Metabolic Rate (BMR)
+    bmr = 10 * weight + 6.25 * height - 5 * age + GENDER_OFFSETS.get(gender, DEFAULT_GENDER_OFFSET)
+
+    tdee = bmr * ACTIVITY_MULTIPLIERS.get(activity_level, 1.55)
+
+    # Adjust for fitness goal
+    calories = tdee + GOAL_ADJUSTMENTS.get(fitness_goal, 0)
+
+    return int(calories)
+
+
+def calculate_macros(calories: int, fitness_goal: str) -> Dict[str, int]:
+    """Calculate macronutrient distribution"""
+
+    protein_ratio, carb_ratio, fat_ratio = MACRO_RATIOS.get(fitness_goal, DEFAULT_MACRO_RATIOS)
+
+    return {
+        'protein': int((calories * protein_ratio) / 4),  # 4 cal per gram
+        'carbs': int((calories * carb_ratio) / 4),
+        'fat': int((calories * fat_ratio) / 9),  # 9 cal per gram
+        'calories': calories
+    }
+
+
+def nutrition_targets(profile: Dict[str, Any]) -> Dict[str, int]:
+    """Daily calorie and macro targets for a profile"""
+    calories = calculate_calorie_needs(profile)
+    return calculate_macros(calories, profile.get('fitness_goal') or 'maintenance')
+
+
+def stored_targets(profile: Dict[str, Any]) -> Optional[Dict[str, int]]:
+    """Targets saved on a profile item, as ints, or None if it has none"""
+    targets = profile.get('nutrition_targets')
+    if not targets:
+        return None
+    return {field: int(value) for field, value in targets.items()}
+
+
+def profile_targets(profile: Dict[str, Any]) -> Dict[str, int]:
+    """Stored targets, computed on the fly only for profiles that predate them"""
+    return stored_targets(profile) or nutrition_targets(profile)
+
+
+def nutrition_targets_batch(profiles: List[Dict[str, Any]]) -> List[Dict[str, int]]:
+    """nutrition_targets for many profiles at once, as NumPy array math
+
+    Produces exactly the scalar results: same operation order, float64,
+    truncation toward zero.
+    """
+    # NumPy stays out of the request handlers that import this module
+    import numpy as np
+
+    count = len(profiles)
+    weight = np.fromiter((to_float(p.get('weight'), 70) for p in profiles), dtype=np.float64, count=count)
+    height = np.fromiter((to_float(p.get('height'), 170) for p in profiles), dtype=np.float64, count=count)
+    age = np.fromiter((to_float(p.get('age'), 30) for p in profiles), dtype=np.float64, count=count)
+    offset = np.fromiter(
+        (GENDER_OFFSETS.get(p.get('gender') or 'other', DEFAULT_GENDER_OFFSET) for p in profiles),
+        dtype=np.float64, count=count
+    )
+    multiplier = np.fromiter(
+        (ACTIVITY_MULTIPLIERS.get(p.get('activity_level') or 'moderate', 1.55) for p in profiles),
+        dtype=np.float64, count=count
+    )
+    goals = [p.get('fitness_goal') or 'maintenance' for p in profiles]
+    adjustment = np.fromiter((GOAL_ADJUSTMENTS.get(goal, 0) for goal in goals), dtype=np.float64, count=count)
+    ratios = np.array([MACRO_RATIOS.get(goal, DEFAULT_MACRO_RATIOS) for goal in goals], dtype=np.float64).reshape(count, 3)
+
+    bmr = 10 * weight + 6.25 * height - 5 * age + offset
+    calories = np.trunc(bmr * multiplier + adjustment)
+    protein = np.trunc(calories * ratios[:, 0] / 4)
+    carbs = np.trunc(calories * ratios[:, 1] / 4)
+    fat = np.trunc(calories * ratios[:, 2] / 9)
+
+    return [
+        {'protein': int(p), 'carbs': int(c), 'fat': int(f), 'calories': int(k)}
+        for p, c, f, k in zip(protein.tolist(), carbs.tolist(), fat.tolist(), calories.tolist())
+    ]
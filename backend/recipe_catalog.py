@@ -0,0 +1,242 @@
+"""
+In-memory recipe catalog with vectorized macro-fit scoring
+
+The catalog sits on a columnar snapshot (catalog_snapshot.py): nutrition
+is a float32 array and allergen and diet bitmasks a packed uint32 array,
+so every recipe is scored against a per-meal macro target in one array
+expression and safety filters are one bitwise AND. Recommendations come
+from real recipes without a model call.
+
+When the published snapshot matches the catalog version it is mapped
+from disk with no per-record parsing; otherwise the recipes table is
+scanned and encoded into an in-memory snapshot. Either way the catalog
+reloads when the version stamp changes.
+"""
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from database import db_client
+from config import settings, LazyObject
+from cache import recipe_cache
+from dietary_flags import normalize_term, profile_masks
+from catalog_snapshot import NUTRITION_FIELDS, CatalogSnapshot, build_snapshot, published_snapshot
+
+MACRO_FIELDS = NUTRITION_FIELDS
+
+# Relative importance of hitting each macro target, per fitness goal
+GOAL_WEIGHTS = {
+    'weight_loss': (1.5, 1.2, 0.6, 0.8),
+    'weight_gain': (1.5, 1.0, 1.0, 0.6),
+    'muscle_gain': (1.0, 1.5, 0.8, 0.6),
+    'maintenance': (1.0, 1.0, 1.0, 1.0)
+}
+
+# Attributes a recommendation is built from; instructions stay in DynamoDB
+_PROJECTION = ('recipe_id', 'name', 'description', 'category', 'ingredients',
+               'nutrition', 'prep_time', 'cook_time', 'difficulty', 'tags', 'image_url',
+               'dietary_flags')
+
+
+class RecipeCatalog:
+    """Column arrays over the recipes table, rebuilt when the catalog changes"""
+
+    def __init__(self, max_age: float):
+        self.max_age = max_age
+        self.version: Optional[int] = None
+        self.loaded_at = 0.0
+        self.snapshot = CatalogSnapshot(build_snapshot([]))
+        self.published = False
+        self.recipes: Sequence[Dict[str, Any]] = self.snapshot.records
+        self.nutrition = np.zeros((0, len(MACRO_FIELDS)), dtype=np.float32)
+        self.flags = np.zeros(0, dtype=np.uint32)
+        self.minutes = np.zeros(0, dtype=np.float32)
+        self._tags: Optional[List[set]] = None
+        self._text: Optional[List[str]] = None
+        self._term_masks: Dict[tuple, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.recipes)
+
+    def ensure_fresh(self) -> None:
+        """Reload if the catalog version moved or the snapshot is too old"""
+        version = recipe_cache.refresh_version()
+        if (self.version is not None and version == self.version
+                and time.monotonic() - self.loaded_at < self.max_age):
+            return
+        with self._lock:
+            if self.version != version or time.monotonic() - self.loaded_at >= self.max_age:
+                self.load(version)
+
+    def load(self, version: Optional[int] = None) -> None:
+        """Map the published snapshot for this version, or scan the recipes table"""
+        snapshot = published_snapshot.current(version)
+        if snapshot is not None:
+            self._attach(snapshot, published=True)
+        else:
+            names = {f'#p{i}': field for i, field in enumerate(_PROJECTION)}
+            items = list(db_client.iter_scan(
+                settings.RECIPES_TABLE,
+                ProjectionExpression=', '.join(names),
+                ExpressionAttributeNames=names
+            ))
+            self._build(items, version)
+        self.version = version
+        self.loaded_at = time.monotonic()
+
+    def _build(self, items: List[Dict[str, Any]], version: Optional[int] = None) -> None:
+        self._attach(CatalogSnapshot(build_snapshot(items, version)), published=False)
+
+    def _attach(self, snapshot: CatalogSnapshot, published: bool) -> None:
+        self.snapshot = snapshot
+        self.published = published
+        self.recipes = snapshot.records
+        self.nutrition = snapshot.nutrition
+        self.flags = snapshot.flags
+        self.minutes = snapshot.minutes
+        # String columns are only decoded if a filter needs them
+        self._tags = None
+        self._text = None
+        self._term_masks = {}
+
+    def _term_mask(self, kind: str, term: str) -> np.ndarray:
+        """Per-recipe boolean for a term no flag covers, computed once per load"""
+        key = (kind, term)
+        mask = self._term_masks.get(key)
+        if mask is None:
+            if kind == 'category':
+                values = self.snapshot.strings('category')
+                mask = np.fromiter((normalize_term(value) == term for value in values), dtype=bool, count=len(values))
+            elif kind == 'tag':
+                tags = self._tag_sets()
+                mask = np.fromiter((term in row for row in tags), dtype=bool, count=len(tags))
+            else:
+                text = self._search_text()
+                mask = np.fromiter((term in row for row in text), dtype=bool, count=len(text))
+            self._term_masks[key] = mask
+        return mask
+
+    def _tag_sets(self) -> List[set]:
+        if self._tags is None:
+            self._tags = [{normalize_term(tag) for tag in tags} for tags in self.snapshot.lists('tags')]
+        return self._tags
+
+    def _search_text(self) -> List[str]:
+        if self._text is None:
+            self._text = [
+                ' '.join(normalize_term(value) for value in ingredients + tags)
+                for ingredients, tags in zip(self.snapshot.lists('ingredients'), self.snapshot.lists('tags'))
+            ]
+        return self._text
+
+    def eligible(self, meal_type: Optional[str] = None,
+                 dietary_preferences: Optional[List[str]] = None,
+                 allergies: Optional[List[str]] = None) -> np.ndarray:
+        """Boolean mask of recipes a user can be offered"""
+        mask = self.safe_mask(dietary_preferences, allergies) & (self.nutrition[:, 0] > 0)
+        if meal_type:
+            in_category = mask & self._term_mask('category', normalize_term(meal_type))
+            # Untagged catalogs still get recommendations, just not per meal
+            if in_category.any():
+                mask = in_category
+        return mask
+
+    def safe_mask(self, dietary_preferences: Optional[List[str]] = None,
+                  allergies: Optional[List[str]] = None) -> np.ndarray:
+        """Recipes matching every preference and free of every allergen"""
+        required, forbidden, other_preferences, other_allergies = profile_masks(dietary_preferences, allergies)
+        mask = (self.flags & np.uint32(required)) == required
+        if forbidden:
+            mask &= (self.flags & np.uint32(forbidden)) == 0
+        for term in other_preferences:
+            mask &= self._term_mask('tag', term)
+        for term in other_allergies:
+            mask &= ~self._term_mask('text', term)
+        return mask
+
+    def safe_ids(self, dietary_preferences: Optional[List[str]] = None,
+                 allergies: Optional[List[str]] = None,
+                 category: Optional[str] = None) -> List[str]:
+        """IDs of recipes that are safe for a profile, optionally in one category"""
+        self.ensure_fresh()
+        mask = self.safe_mask(dietary_preferences, allergies)
+        if category:
+            mask &= self._term_mask('category', normalize_term(category))
+        return [self.snapshot.recipe_id(i) for i in np.flatnonzero(mask).tolist()]
+
+    def score(self, target: Dict[str, float], fitness_goal: str = 'maintenance') -> np.ndarray:
+        """Weighted relative distance of every recipe from a macro target (lower is better)"""
+        goal = np.array([max(float(target.get(field) or 0), 1.0) for field in MACRO_FIELDS], dtype=np.float32)
+        weights = np.array(GOAL_WEIGHTS.get(fitness_goal, GOAL_WEIGHTS['maintenance']), dtype=np.float32)
+        relative = (self.nutrition - goal) / goal
+        return np.sqrt((relative * relative) @ weights)
+
+    def preference(self, boosts: Dict[str, float]) -> np.ndarray:
+        """Per-recipe 0..1 preference array from a recipe_id -> score mapping"""
+        preference = np.zeros(len(self.recipes), dtype=np.float32)
+        for recipe_id, score in boosts.items():
+            row = self.snapshot.row(recipe_id)
+            if row is not None:
+                preference[row] = min(max(float(score), 0.0), 1.0)
+        return preference
+
+    def recommend(self, target: Dict[str, float], fitness_goal: str = 'maintenance',
+                  meal_type: Optional[str] = None, dietary_preferences: Optional[List[str]] = None,
+                  allergies: Optional[List[str]] = None, k: int = 3,
+                  boosts: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+        """Top-k recipes closest to the target that pass the user's filters
+
+        `boosts` maps recipe_id to a 0..1 preference score (favorites-based
+        recommendations). Ranking subtracts FAVORITES_BLEND_WEIGHT x preference
+        from the macro-fit distance, so a preferred recipe wins among
+        comparable fits; match_score stays the pure macro fit.
+        """
+        self.ensure_fresh()
+        if not self.recipes:
+            return []
+
+        mask = self.eligible(meal_type, dietary_preferences, allergies)
+        candidates = np.flatnonzero(mask)
+        if candidates.size == 0:
+            return []
+
+        scores = self.score(target, fitness_goal)[candidates]
+        ranking = scores
+        if boosts:
+            ranking = scores - settings.FAVORITES_BLEND_WEIGHT * self.preference(boosts)[candidates]
+        if candidates.size > k:
+            top = np.argpartition(ranking, k)[:k]
+        else:
+            top = np.arange(candidates.size)
+        top = top[np.argsort(ranking[top])]
+        return [
+            {**self.recipes[candidates[i]], 'match_score': round(float(scores[i]), 4)}
+            for i in top
+        ]
+
+
+def recipe_minutes(recipe: Dict[str, Any]) -> int:
+    """Total prep and cook time in minutes"""
+    try:
+        return int(recipe.get('prep_time') or 0) + int(recipe.get('cook_time') or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def recipe_to_meal(recipe: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a catalog recipe like an AI meal recommendation"""
+    return {
+        'recipe_id': recipe['recipe_id'],
+        'name': recipe.get('name'),
+        'description': recipe.get('description'),
+        'ingredients': recipe.get('ingredients', []),
+        'nutrition': recipe.get('nutrition', {}),
+        'prep_time': f"{recipe_minutes(recipe)} minutes",
+        'difficulty': recipe.get('difficulty', 'medium'),
+        'image_url': recipe.get('image_url'),
+        'match_score': recipe['match_score']
+    }
+
+
+recipe_catalog = LazyObject(lambda: RecipeCatalog(max_age=settings.CATALOG_CACHE_TTL_SECONDS))
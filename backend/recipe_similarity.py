@@ -0,0 +1,180 @@
+"""
+"More like this" for recipes: a nearest-neighbour index over feature vectors
+
+Each recipe becomes one float32 row built from its nutrition per serving,
+prep plus cook time, normalized tags and category, and hashed ingredient
+terms. Rows are unit length, so cosine similarity is a single
+matrix-vector product. The matrix is built offline
+(functions/build_similarity_index.py) and stored in S3 as an .npz
+artifact together with the ids and the few fields a result needs, so
+lookups never touch DynamoDB.
+"""
+import io
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+import numpy as np
+from database import s3_client
+from config import settings, LazyObject
+from dietary_flags import normalize_term
+from conversions import to_float
+
+MACRO_FIELDS = ('calories', 'protein', 'carbs', 'fat')
+TAG_BUCKETS = 32
+INGREDIENT_BUCKETS = 128
+
+# Share of each feature block in the similarity
+BLOCK_WEIGHTS = {'nutrition': 1.0, 'time': 0.3, 'tags': 0.8, 'ingredients': 1.0}
+
+# Recipe attributes the builder reads
+PROJECTION = ('recipe_id', 'name', 'category', 'image_url', 'nutrition',
+              'prep_time', 'cook_time', 'tags', 'ingredients')
+
+
+def _bucket(term: str, buckets: int) -> int:
+    """Stable hash bucket; Python's hash() is salted per process"""
+    return zlib.crc32(term.encode()) % buckets
+
+
+def _standardize(values: np.ndarray) -> np.ndarray:
+    """Z-score each column across the catalog"""
+    std = values.std(axis=0)
+    return (values - values.mean(axis=0)) / np.where(std > 0, std, 1.0)
+
+
+def _unit_rows(block: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(block, axis=1, keepdims=True)
+    return block / np.where(norms > 0, norms, 1.0)
+
+
+def recipe_vectors(recipes: List[Dict[str, Any]]) -> np.ndarray:
+    """Unit-length float32 feature rows, one per recipe"""
+    count = len(recipes)
+    nutrition = np.array(
+        [[to_float((recipe.get('nutrition') or {}).get(field)) for field in MACRO_FIELDS] for recipe in recipes],
+        dtype=np.float64
+    ).reshape(count, len(MACRO_FIELDS))
+    minutes = np.array(
+        [[to_float(recipe.get('prep_time')) + to_float(recipe.get('cook_time'))] for recipe in recipes],
+        dtype=np.float64
+    ).reshape(count, 1)
+
+    tags = np.zeros((count, TAG_BUCKETS), dtype=np.float64)
+    ingredients = np.zeros((count, INGREDIENT_BUCKETS), dtype=np.float64)
+    for row, recipe in enumerate(recipes):
+        terms = [normalize_term(tag) for tag in recipe.get('tags') or []]
+        if recipe.get('category'):
+            terms.append('category:' + normalize_term(recipe['category']))
+        for term in terms:
+            tags[row, _bucket(term, TAG_BUCKETS)] = 1.0
+        for ingredient in recipe.get('ingredients') or []:
+            term = normalize_term(ingredient)
+            # The whole ingredient and its words, so "chicken breast" is near "chicken thigh"
+            for token in {term, *term.split()}:
+                if token:
+                    ingredients[row, _bucket(token, INGREDIENT_BUCKETS)] += 1.0
+
+    # Nutrition and time are z-scored; time is one column, so it is clipped
+    # and scaled instead of normalized to unit length
+    blocks = {
+        'nutrition': _unit_rows(_standardize(np.log1p(np.maximum(nutrition, 0)))),
+        'time': np.clip(_standardize(np.log1p(np.maximum(minutes, 0))), -3, 3) / 3,
+        'tags': _unit_rows(tags),
+        'ingredients': _unit_rows(ingredients)
+    }
+    vectors = np.hstack([block * BLOCK_WEIGHTS[name] for name, block in blocks.items()])
+    return _unit_rows(vectors).astype(np.float32)
+
+
+def build_artifact(recipes: List[Dict[str, Any]]) -> bytes:
+    """Serialize the index for a set of recipes as compressed .npz bytes"""
+    buffer = io.BytesIO()
+    np.savez_compressed(
+        buffer,
+        vectors=recipe_vectors(recipes),
+        ids=np.array([recipe['recipe_id'] for recipe in recipes], dtype=str),
+        names=np.array([recipe.get('name') or '' for recipe in recipes], dtype=str),
+        categories=np.array([recipe.get('category') or '' for recipe in recipes], dtype=str),
+        image_urls=np.array([recipe.get('image_url') or '' for recipe in recipes], dtype=str),
+        built_at=np.array(int(time.time()), dtype=np.int64)
+    )
+    return buffer.getvalue()
+
+
+class SimilarityIndex:
+    """The S3 artifact, loaded once per warm container and refreshed after max_age"""
+
+    def __init__(self, bucket: str, key: str, max_age: float):
+        self.bucket = bucket
+        self.key = key
+        self.max_age = max_age
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self.ids = np.zeros(0, dtype=str)
+        self.names = self.ids
+        self.categories = self.ids
+        self.image_urls = self.ids
+        self.built_at = 0
+        self.loaded_at: Optional[float] = None
+        self._positions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def ensure_loaded(self) -> None:
+        """Load on first use; reload when the copy is older than max_age"""
+        if self.loaded_at is not None and time.monotonic() - self.loaded_at < self.max_age:
+            return
+        with self._lock:
+            if self.loaded_at is not None and time.monotonic() - self.loaded_at < self.max_age:
+                return
+            try:
+                self.load(s3_client.get_file(self.bucket, self.key))
+            except Exception as e:
+                if self.loaded_at is None:
+                    raise
+                # Keep serving the copy we have; try again after max_age
+                print(f"Similarity index reload failed: {e}")
+                self.loaded_at = time.monotonic()
+
+    def load(self, artifact: bytes) -> None:
+        with np.load(io.BytesIO(artifact), allow_pickle=False) as data:
+            self.vectors = data['vectors']
+            self.ids = data['ids']
+            self.names = data['names']
+            self.categories = data['categories']
+            self.image_urls = data['image_urls']
+            self.built_at = int(data['built_at'])
+        self._positions = {recipe_id: row for row, recipe_id in enumerate(self.ids.tolist())}
+        self.loaded_at = time.monotonic()
+
+    def similar(self, recipe_id: str, k: int = 10) -> Optional[List[Dict[str, Any]]]:
+        """The k recipes most similar to one, best first; None if it is not indexed"""
+        self.ensure_loaded()
+        row = self._positions.get(recipe_id)
+        if row is None:
+            return None
+
+        scores = self.vectors @ self.vectors[row]
+        scores[row] = -np.inf
+        k = min(k, len(scores) - 1)
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            {
+                'recipe_id': str(self.ids[i]),
+                'name': str(self.names[i]),
+                'category': str(self.categories[i]),
+                'image_url': str(self.image_urls[i]) or None,
+                'similarity': round(float(scores[i]), 4)
+            }
+            for i in top
+        ]
+
+
+similarity_index = LazyObject(lambda: SimilarityIndex(
+    settings.CONTENT_BUCKET, settings.SIMILARITY_INDEX_KEY, settings.SIMILARITY_INDEX_MAX_AGE_SECONDS
+))
@@ -0,0 +1,247 @@
+"""
+Type-ahead suggestions over recipe names, tags and ingredients
+
+Every name, tag and ingredient contributes one key per word it contains
+("grilled chicken salad", "chicken salad", "salad"), so a prefix matches
+the start of any word. Keys live in one sorted list: a prefix query is two
+bisects, and the best suggestions in that range come from an argpartition
+over a parallel weight array. Nothing touches DynamoDB per keystroke.
+
+The index is built from a projection scan once per warm container. Writes
+made through this container are applied in place; writes made elsewhere
+bump the catalog version, and the index is rebuilt in the background while
+the current copy keeps answering.
+"""
+import math
+import threading
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from database import db_client
+from config import settings
+from cache import recipe_cache
+from dietary_flags import normalize_term
+
+# Name matches at the first word rank above matches further in
+NAME_WEIGHT = 2.0
+LATER_WORD_FACTOR = 0.5
+
+# Recipe attributes the index is built from
+_PROJECTION = ('recipe_id', 'name', 'tags', 'ingredients')
+
+Entry = Tuple[str, str, Optional[str]]  # (type, text, recipe_id)
+
+
+def word_keys(text: Any) -> List[str]:
+    """Normalized text from each word onwards"""
+    words = normalize_term(text or '').split()
+    return [' '.join(words[i:]) for i in range(len(words))]
+
+
+def _term_weight(count: int) -> float:
+    """Tags and ingredients rank by how many recipes use them, on a log scale"""
+    return 1.0 + math.log2(count)
+
+
+class SuggestIndex:
+    """Sorted prefix keys over the catalog, kept per warm container"""
+
+    def __init__(self):
+        self.version: Optional[int] = None
+        self._keys: List[str] = []
+        self._entries: List[Entry] = []
+        self._weight_list: List[float] = []
+        self._weights: Optional[np.ndarray] = None
+        self._term_counts: Counter = Counter()
+        self._recipe_terms: Dict[str, Tuple[str, Tuple[str, ...], Tuple[str, ...]]] = {}
+        self._lock = threading.RLock()
+        self._rebuilding = False
+
+    def __len__(self) -> int:
+        return len(self._recipe_terms)
+
+    def ensure_fresh(self) -> None:
+        """Build on first use; rebuild in the background when the catalog version moves"""
+        version = recipe_cache.refresh_version()
+        if self.version is None:
+            with self._lock:
+                if self.version is None:
+                    self.build(self._scan(), version)
+            return
+        if version == self.version or self._rebuilding:
+            return
+        self._rebuilding = True
+        threading.Thread(target=self._rebuild, args=(version,), daemon=True).start()
+
+    def _rebuild(self, version: Optional[int]) -> None:
+        try:
+            self.build(self._scan(), version)
+        except Exception as e:
+            print(f"Suggest index rebuild failed: {e}")
+        finally:
+            self._rebuilding = False
+
+    @staticmethod
+    def _scan() -> List[Dict[str, Any]]:
+        names = {f'#p{i}': field for i, field in enumerate(_PROJECTION)}
+        return list(db_client.iter_scan(
+            settings.RECIPES_TABLE,
+            ProjectionExpression=', '.join(names),
+            ExpressionAttributeNames=names
+        ))
+
+    def build(self, recipes: List[Dict[str, Any]], version: Optional[int] = None) -> None:
+        """Replace the index with one over `recipes`"""
+        recipe_terms = {recipe['recipe_id']: self._terms(recipe) for recipe in recipes}
+        term_counts: Counter = Counter()
+        for _, tags, ingredients in recipe_terms.values():
+            term_counts.update(('tag', tag) for tag in tags)
+            term_counts.update(('ingredient', ingredient) for ingredient in ingredients)
+
+        rows = []
+        for recipe_id, (name, _, _) in recipe_terms.items():
+            rows.extend(self._name_rows(recipe_id, name))
+        for (kind, text), count in term_counts.items():
+            rows.extend(self._term_rows(kind, text, count))
+        rows.sort(key=lambda row: row[0])
+
+        with self._lock:
+            self._keys = [row[0] for row in rows]
+            self._entries = [row[1] for row in rows]
+            self._weight_list = [row[2] for row in rows]
+            self._weights = None
+            self._term_counts = term_counts
+            self._recipe_terms = recipe_terms
+            self.version = version
+
+    @staticmethod
+    def _terms(recipe: Dict[str, Any]) -> Tuple[str, Tuple[str, ...], Tuple[str, ...]]:
+        tags = tuple(dict.fromkeys(str(tag) for tag in recipe.get('tags') or [] if str(tag).strip()))
+        ingredients = tuple(dict.fromkeys(
+            str(ingredient) for ingredient in recipe.get('ingredients') or [] if str(ingredient).strip()
+        ))
+        return (recipe.get('name') or '', tags, ingredients)
+
+    @staticmethod
+    def _name_rows(recipe_id: str, name: str) -> List[Tuple[str, Entry, float]]:
+        return [
+            (key, ('recipe', name, recipe_id), NAME_WEIGHT * (1.0 if i == 0 else LATER_WORD_FACTOR))
+            for i, key in enumerate(word_keys(name))
+        ]
+
+    @staticmethod
+    def _term_rows(kind: str, text: str, count: int) -> List[Tuple[str, Entry, float]]:
+        weight = _term_weight(count)
+        return [
+            (key, (kind, text, None), weight * (1.0 if i == 0 else LATER_WORD_FACTOR))
+            for i, key in enumerate(word_keys(text))
+        ]
+
+    def _insert(self, rows: List[Tuple[str, Entry, float]]) -> None:
+        for key, entry, weight in rows:
+            position = bisect_right(self._keys, key)
+            self._keys.insert(position, key)
+            self._entries.insert(position, entry)
+            self._weight_list.insert(position, weight)
+        self._weights = None
+
+    def _delete(self, rows: List[Tuple[str, Entry, float]]) -> None:
+        for key, entry, _ in rows:
+            position = bisect_left(self._keys, key)
+            while position < len(self._keys) and self._keys[position] == key:
+                if self._entries[position] == entry:
+                    del self._keys[position], self._entries[position], self._weight_list[position]
+                    break
+                position += 1
+        self._weights = None
+
+    def _count_term(self, kind: str, text: str, change: int) -> None:
+        """Move a tag or ingredient's recipe count, re-keying it at its new weight"""
+        count = self._term_counts[(kind, text)]
+        if count:
+            self._delete(self._term_rows(kind, text, count))
+        count += change
+        if count > 0:
+            self._term_counts[(kind, text)] = count
+            self._insert(self._term_rows(kind, text, count))
+        else:
+            del self._term_counts[(kind, text)]
+
+    def remove_recipe(self, recipe_id: str) -> None:
+        """Drop a recipe and its contribution to tag and ingredient counts"""
+        with self._lock:
+            terms = self._recipe_terms.pop(recipe_id, None)
+            if terms is None:
+                return
+            name, tags, ingredients = terms
+            self._delete(self._name_rows(recipe_id, name))
+            for tag in tags:
+                self._count_term('tag', tag, -1)
+            for ingredient in ingredients:
+                self._count_term('ingredient', ingredient, -1)
+
+    def add_recipe(self, recipe: Dict[str, Any]) -> None:
+        """Index a new or changed recipe in place"""
+        with self._lock:
+            self.remove_recipe(recipe['recipe_id'])
+            name, tags, ingredients = self._recipe_terms[recipe['recipe_id']] = self._terms(recipe)
+            self._insert(self._name_rows(recipe['recipe_id'], name))
+            for tag in tags:
+                self._count_term('tag', tag, 1)
+            for ingredient in ingredients:
+                self._count_term('ingredient', ingredient, 1)
+
+    def apply_write(self, recipe_id: str, recipe: Optional[Dict[str, Any]], version: int) -> None:
+        """Apply a write made by this container; `recipe` is None for a delete
+
+        `version` is the catalog version the write produced. If this index
+        was exactly one version behind it, the write was the only change
+        and no rebuild is needed.
+        """
+        with self._lock:
+            if self.version is None:
+                return
+            if recipe is None:
+                self.remove_recipe(recipe_id)
+            else:
+                self.add_recipe(recipe)
+            if self.version == version - 1:
+                self.version = version
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Best suggestions whose words start with `prefix`"""
+        prefix = normalize_term(prefix)
+        if not prefix:
+            return []
+
+        with self._lock:
+            low = bisect_left(self._keys, prefix)
+            high = bisect_left(self._keys, prefix + '\uffff', low)
+            if low == high:
+                return []
+            if self._weights is None:
+                self._weights = np.array(self._weight_list, dtype=np.float32)
+            weights = self._weights[low:high]
+            # Several keys can point at one entry, so take a few extra
+            take = min(high - low, limit * 4)
+            top = np.argpartition(-weights, take - 1)[:take] if take < high - low else np.arange(high - low)
+            ranked = sorted(top.tolist(), key=lambda i: (-weights[i], len(self._keys[low + i])))
+            entries = [self._entries[low + i] for i in ranked]
+
+        suggestions = []
+        seen = set()
+        for kind, text, recipe_id in entries:
+            if (kind, text, recipe_id) in seen:
+                continue
+            seen.add((kind, text, recipe_id))
+            suggestion = {'text': text, 'type': kind}
+            if recipe_id:
+                suggestion['recipe_id'] = recipe_id
+            suggestions.append(suggestion)
+            if len(suggestions) == limit:
+                break
+        return suggestions
+
+
+suggest_index = SuggestIndex()
@@ -0,0 +1,156 @@
+"""
+Two-tier cache for AI meal recommendations
+
+Many users share the same goal, preferences, allergies, activity level and
+(roughly) the same macro targets. Recommendations are keyed on a canonical
+fingerprint of those inputs, with calories and macros rounded into buckets,
+and kept in an in-process LRU backed by a DynamoDB table with a TTL
+attribute.
+"""
+import hashlib
+import json
+import time
+from typing import Any, Dict, List, Optional
+from boto3.dynamodb.conditions import Attr
+from lru import LRUCache
+from database import db_client, get_timestamp, is_condition_failure
+from config import settings, LazyObject
+from api_responses import dumps, loads
+
+CALORIE_BUCKET = 100  # kcal
+MACRO_BUCKET = 10  # grams
+
+
+def _round_to(value: float, step: int) -> int:
+    return int(round(float(value) / step) * step)
+
+
+def bucket_macros(macros: Dict[str, Any]) -> Dict[str, int]:
+    """Round daily targets into the buckets recommendations are shared across"""
+    return {
+        'calories': _round_to(macros['calories'], CALORIE_BUCKET),
+        'protein': _round_to(macros['protein'], MACRO_BUCKET),
+        'carbs': _round_to(macros['carbs'], MACRO_BUCKET),
+        'fat': _round_to(macros['fat'], MACRO_BUCKET)
+    }
+
+
+def _normalize_list(values: Optional[List[str]]) -> List[str]:
+    return sorted({str(value).strip().lower() for value in values or [] if str(value).strip()})
+
+
+def recommendation_fingerprint(fitness_goal: str, dietary_preferences: List[str],
+                               allergies: List[str], activity_level: str,
+                               meal_type: str, macros: Dict[str, Any]) -> str:
+    """Stable hash of every input that shapes a recommendation"""
+    canonical = {
+        'fitness_goal': (fitness_goal or '').lower(),
+        'dietary_preferences': _normalize_list(dietary_preferences),
+        'allergies': _normalize_list(allergies),
+        'activity_level': (activity_level or '').lower(),
+        'meal_type': (meal_type or '').lower(),
+        'macros': bucket_macros(macros)
+    }
+    raw = json.dumps(canonical, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class RecommendationCache:
+    """In-process LRU in front of the DynamoDB recommendation cache table"""
+
+    def __init__(self, maxsize: int, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self.memory = LRUCache(maxsize, ttl_seconds)
+        self.memory_hits = 0
+        self.table_hits = 0
+        self.misses = 0
+
+    def get(self, fingerprint: str) -> Optional[List[Dict[str, Any]]]:
+        """Look up recommendations in memory, then in DynamoDB"""
+        recommendations = self.memory.get(fingerprint)
+        if recommendations is not None:
+            self.memory_hits += 1
+            return recommendations
+
+        recommendations = self._read_table(fingerprint)
+        if recommendations is None:
+            self.misses += 1
+            return None
+        self.table_hits += 1
+        return recommendations
+
+    def _read_table(self, fingerprint: str) -> Optional[List[Dict[str, Any]]]:
+        """Read a live entry from DynamoDB and promote it to memory"""
+        item = db_client.get_item(settings.RECOMMENDATION_CACHE_TABLE, {'fingerprint': fingerprint})
+        # DynamoDB TTL deletion is lazy, so expiry is enforced on read as well
+        remaining = int(item['expires_at']) - get_timestamp() if item else 0
+        if remaining <= 0:
+            return None
+
+        recommendations = loads(item['recommendations'])
+        self.memory.set(fingerprint, recommendations, ttl=min(remaining, self.ttl_seconds))
+        return recommendations
+
+    def acquire_lease(self, fingerprint: str, lease_seconds: int) -> bool:
+        """Claim the right to generate a fingerprint across all containers
+
+        Returns False while another caller holds an unexpired lease.
+        """
+        now = get_timestamp()
+        try:
+            db_client.put_item(
+                settings.RECOMMENDATION_CACHE_TABLE,
+                {'fingerprint': f'lease#{fingerprint}', 'expires_at': now + lease_seconds},
+                condition_expression=Attr('fingerprint').not_exists() | Attr('expires_at').lt(now)
+            )
+            return True
+        except Exception as e:
+            if is_condition_failure(e):
+                return False
+            raise
+
+    def release_lease(self, fingerprint: str) -> None:
+        """Give up a lease taken with acquire_lease"""
+        db_client.delete_item(settings.RECOMMENDATION_CACHE_TABLE, {'fingerprint': f'lease#{fingerprint}'})
+
+    def wait_for(self, fingerprint: str, timeout: float,
+                 interval: float = 0.25) -> Optional[List[Dict[str, Any]]]:
+        """Poll for recommendations another container is generating"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            time.sleep(interval)
+            recommendations = self._read_table(fingerprint)
+            if recommendations is not None:
+                self.table_hits += 1
+                return recommendations
+        return None
+
+    def put(self, fingerprint: str, recommendations: List[Dict[str, Any]]) -> None:
+        """Store recommendations in both tiers"""
+        self.memory.set(fingerprint, recommendations)
+        now = get_timestamp()
+        db_client.put_item(settings.RECOMMENDATION_CACHE_TABLE, {
+            'fingerprint': fingerprint,
+            # Stored as a JSON string: model output contains floats, which
+            # DynamoDB number attributes do not accept
+            'recommendations': dumps(recommendations),
+            'created_at': now,
+            'expires_at': now + self.ttl_seconds
+        })
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit-rate counters for this container"""
+        lookups = self.memory_hits + self.table_hits + self.misses
+        hits = self.memory_hits + self.table_hits
+        return {
+            'memory_hits': self.memory_hits,
+            'table_hits': self.table_hits,
+            'misses': self.misses,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0.0
+        }
+
+
+recommendation_cache = LazyObject(lambda: RecommendationCache(
+    maxsize=settings.RECOMMENDATION_CACHE_SIZE,
+    ttl_seconds=settings.RECOMMENDATION_CACHE_TTL_SECONDS
+))
@@ -141,3 +141,59 @@ MEAL_PLANS_TABLE_SCHEMA = {
     ],
     "BillingMode": "PAY_PER_REQUEST"
 }
+
+# Recipe Search Index Table
+# One item per (term, recipe) posting; the "#meta" item holds corpus stats
+RECIPE_SEARCH_INDEX_TABLE_SCHEMA = {
+    "TableName": "dailybread-recipe-search-index",
+    "KeySchema": [
+        {"AttributeName": "term", "KeyType": "HASH"},
+        {"AttributeName": "recipe_id", "KeyType": "RANGE"}
+    ],
+    "AttributeDefinitions": [
+        {"AttributeName": "term", "AttributeType": "S"},
+        {"AttributeName": "recipe_id", "AttributeType": "S"}
+    ],
+    "BillingMode": "PAY_PER_REQUEST"
+}
+
+# Recommendation Cache Table
+# Enable DynamoDB TTL on the "expires_at" attribute
+RECOMMENDATION_CACHE_TABLE_SCHEMA = {
+    "TableName": "dailybread-recommendation-cache",
+    "KeySchema": [
+        {"AttributeName": "fingerprint", "KeyType": "HASH"}
+    ],
+    "AttributeDefinitions": [
+        {"AttributeName": "fingerprint", "AttributeType": "S"}
+    ],
+    "BillingMode": "PAY_PER_REQUEST"
+}
+
+# User Emails Table
+# One lock item per normalized email; registration creates it in the same
+# transaction as the user, so an email can only ever belong to one user
+USER_EMAILS_TABLE_SCHEMA = {
+    "TableName": "dailybread-user-emails",
+    "KeySchema": [
+        {"AttributeName": "email", "KeyType": "HASH"}
+    ],
+    "AttributeDefinitions": [
+        {"AttributeName": "email", "AttributeType": "S"}
+    ],
+    "BillingMode": "PAY_PER_REQUEST"
+}
+
+# User Recommendations Table
+# Top-N recipes per user from favorites co-occurrence, rebuilt by the
+# collaborative filtering job; enable DynamoDB TTL on "expires_at"
+USER_RECOMMENDATIONS_TABLE_SCHEMA = {
+    "TableName": "dailybread-user-recommendations",
+    "KeySchema": [
+        {"AttributeName": "user_id", "KeyType": "HASH"}
+    ],
+    "AttributeDefinitions": [
+        {"AttributeName": "user_id", "AttributeType": "S"}
+    ],
+    "BillingMode": "PAY_PER_REQUEST"
+}
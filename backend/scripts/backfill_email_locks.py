@@ -0,0 +1,51 @@
+"""
+Create email lock items for users registered before the user emails table
+
+Registration and login resolve emails through USER_EMAILS_TABLE. Run this
+once after deploying it so older accounts are covered too; it is safe to
+re-run. Emails already claimed by a different user are reported, not
+overwritten. Once it has run, set EMAIL_LOCKS_BACKFILLED=true so
+registration and login stop falling back to EmailIndex.
+
+Run from backend/:  python -m scripts.backfill_email_locks
+"""
+from boto3.dynamodb.conditions import Attr
+
+from auth import normalize_email
+from config import settings
+from database import db_client, get_timestamp, is_condition_failure
+
+
+def backfill() -> dict:
+    """Write a lock item for every user that lacks one"""
+    counts = {'created': 0, 'existing': 0, 'conflicts': 0}
+    users = db_client.iter_scan(
+        settings.USERS_TABLE,
+        ProjectionExpression='user_id, email, created_at'
+    )
+    for user in users:
+        if not user.get('email'):
+            continue
+        lock = {
+            'email': normalize_email(user['email']),
+            'user_id': user['user_id'],
+            'created_at': user.get('created_at', get_timestamp())
+        }
+        try:
+            db_client.put_item(settings.USER_EMAILS_TABLE, lock, condition_expression=Attr('email').not_exists())
+            counts['created'] += 1
+        except Exception as e:
+            if not is_condition_failure(e):
+                raise
+            existing = db_client.get_item(settings.USER_EMAILS_TABLE, {'email': lock['email']}, consistent_read=True)
+            if existing and existing['user_id'] == user['user_id']:
+                counts['existing'] += 1
+            else:
+                counts['conflicts'] += 1
+                print(f"Email {lock['email']} is claimed by {existing and existing['user_id']}, "
+                      f"not by {user['user_id']}")
+    return counts
+
+
+if __name__ == '__main__':
+    print(backfill())
@@ -0,0 +1,72 @@
+"""
+Benchmark the favorites collaborative-filtering job on synthetic data
+
+Generates favorites with Zipf-like recipe popularity (a few recipes are
+favorited by many users), then times each stage of the offline job
+without DynamoDB: streaming pairs into the sparse matrix, the item-item
+similarity, and the per-user top-N.
+
+Run from backend/:  python -m scripts.bench_collaborative [--favorites 1000000] [--users 100000] [--recipes 20000]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from collaborative import FavoritesMatrix, item_similarity, top_n_per_user
+
+PAGE_SIZE = 1000
+
+
+def synthetic_pairs(favorites: int, users: int, recipes: int, seed: int = 11):
+    """User and recipe index arrays for `favorites` random favorites"""
+    rng = np.random.default_rng(seed)
+    user_rows = rng.integers(0, users, size=favorites)
+    # Popularity falls off like 1/rank
+    weights = 1.0 / np.arange(1, recipes + 1)
+    recipe_cols = rng.choice(recipes, size=favorites, p=weights / weights.sum())
+    return user_rows, recipe_cols
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--favorites', type=int, default=1_000_000, help='favorites to generate')
+    parser.add_argument('--users', type=int, default=100_000, help='distinct users')
+    parser.add_argument('--recipes', type=int, default=20_000, help='distinct recipes')
+    parser.add_argument('--top-n', type=int, default=50, help='recipes kept per user')
+    parser.add_argument('--neighbors', type=int, default=50, help='neighbours kept per recipe')
+    args = parser.parse_args()
+
+    user_rows, recipe_cols = synthetic_pairs(args.favorites, args.users, args.recipes)
+    user_ids = [f'user-{i}' for i in user_rows.tolist()]
+    recipe_ids = [f'recipe-{i}' for i in recipe_cols.tolist()]
+
+    started = time.perf_counter()
+    matrix = FavoritesMatrix()
+    # Page-sized adds, as the job receives them from the scan
+    for start in range(0, len(user_ids), PAGE_SIZE):
+        matrix.add(zip(user_ids[start:start + PAGE_SIZE], recipe_ids[start:start + PAGE_SIZE]))
+    favorites = matrix.build()
+    built = time.perf_counter()
+
+    similarity = item_similarity(favorites, args.neighbors)
+    similar = time.perf_counter()
+
+    users = recommended = 0
+    for _, columns, _ in top_n_per_user(favorites, similarity, args.top_n):
+        users += 1
+        recommended += len(columns)
+    finished = time.perf_counter()
+
+    print(f"favorites          {args.favorites:>12,}  ({favorites.nnz:,} distinct)")
+    print(f"matrix             {favorites.shape[0]:>12,} users x {favorites.shape[1]:,} recipes")
+    print(f"similarity nnz     {similarity.nnz:>12,}")
+    print(f"build matrix       {built - started:>12.2f} s")
+    print(f"item similarity    {similar - built:>12.2f} s")
+    print(f"top-{args.top_n} per user    {finished - similar:>12.2f} s  "
+          f"({users:,} users, {recommended / max(users, 1):.1f} recipes each)")
+    print(f"total              {finished - started:>12.2f} s")
+
+
+if __name__ == '__main__':
+    main()
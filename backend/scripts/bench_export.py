@@ -0,0 +1,32 @@
+"""
+Benchmark table exports across parallel scan segment counts
+
+Runs the real export (scan, NDJSON encode, gzip) against the configured
+DynamoDB table once per segment count and reports throughput. Uploads are
+off by default so the numbers measure the scan side; pass --upload to
+include the multipart upload.
+
+Run from backend/:  python -m scripts.bench_export [--table recipes] [--segments 1,2,4,8,16] [--upload]
+"""
+import argparse
+
+from table_export import EXPORT_TABLES, export_table
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--table', choices=sorted(EXPORT_TABLES), default='recipes', help='table to export')
+    parser.add_argument('--segments', default='1,2,4,8,16', help='comma-separated segment counts')
+    parser.add_argument('--upload', action='store_true', help='also upload to S3')
+    args = parser.parse_args()
+
+    print(f"{'segments':>8}  {'items':>10}  {'seconds':>8}  {'items/s':>10}  {'raw MB/s':>8}  {'gzip ratio':>10}")
+    for segments in [int(value) for value in args.segments.split(',')]:
+        result = export_table(args.table, segments, upload=args.upload)
+        ratio = result['raw_bytes'] / max(result['compressed_bytes'], 1)
+        print(f"{segments:>8}  {result['items']:>10,}  {result['elapsed_seconds']:>8.2f}  "
+              f"{result['items_per_second']:>10,.0f}  {result['raw_mb_per_second']:>8.2f}  {ratio:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark the weekly meal-plan optimizer against catalog size
+
+Builds synthetic catalogs in memory (no DynamoDB), then times plan_week for
+a 7-day, 21-slot plan per size, with and without dietary filters, and
+reports the average daily deviation from the targets.
+
+Run from backend/:  python -m scripts.bench_meal_planner [--sizes 1000,10000,50000] [--runs 20]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from dietary_flags import ALLERGENS, DIETS
+from meal_planner import plan_week
+from recipe_catalog import RecipeCatalog
+
+TARGETS = {'calories': 2200, 'protein': 165, 'carbs': 220, 'fat': 73}
+CATEGORIES = ('breakfast', 'lunch', 'dinner', 'snack')
+
+
+def synthetic_catalog(size: int, seed: int = 7) -> RecipeCatalog:
+    """Catalog of `size` random recipes with plausible per-serving nutrition"""
+    rng = random.Random(seed)
+    diet_bits = [bit for bit, _ in DIETS.values()]
+    allergen_bits = [bit for bit, _ in ALLERGENS.values()]
+    items = []
+    for i in range(size):
+        flags = 0
+        for bit in rng.sample(diet_bits, rng.randint(0, 3)):
+            flags |= 1 << bit
+        for bit in rng.sample(allergen_bits, rng.randint(0, 2)):
+            flags |= 1 << bit
+        items.append({
+            'recipe_id': f'recipe-{i}',
+            'name': f'Recipe {i}',
+            'category': rng.choice(CATEGORIES),
+            'nutrition': {
+                'calories': rng.randint(150, 1100),
+                'protein': rng.randint(3, 70),
+                'carbs': rng.randint(5, 130),
+                'fat': rng.randint(2, 55)
+            },
+            'prep_time': rng.randint(5, 30),
+            'cook_time': rng.randint(0, 60),
+            'dietary_flags': flags
+        })
+    catalog = RecipeCatalog(max_age=float('inf'))
+    catalog._build(items)
+    return catalog
+
+
+def time_plans(catalog: RecipeCatalog, runs: int, **kwargs) -> tuple:
+    """Median and worst ms per plan, and the mean daily deviation"""
+    timings, deviations = [], []
+    for _ in range(runs):
+        started = time.perf_counter()
+        plan = plan_week(catalog, TARGETS, 'muscle_gain', **kwargs)
+        timings.append((time.perf_counter() - started) * 1000)
+        deviations.append(statistics.mean(day['deviation'] for day in plan))
+    return statistics.median(timings), max(timings), statistics.mean(deviations)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='1000,10000,50000,100000', help='comma-separated catalog sizes')
+    parser.add_argument('--runs', type=int, default=20, help='plans per size and scenario')
+    args = parser.parse_args()
+
+    scenarios = {
+        'unfiltered': {},
+        'vegetarian, no nuts, <=30 min': {
+            'dietary_preferences': ['vegetarian'], 'allergies': ['nuts'], 'max_prep_minutes': 30
+        }
+    }
+    print(f"{'recipes':>8}  {'scenario':<30} {'median ms':>10} {'max ms':>8} {'deviation':>10}")
+    for size in (int(value) for value in args.sizes.split(',')):
+        catalog = synthetic_catalog(size)
+        for name, kwargs in scenarios.items():
+            median, worst, deviation = time_plans(catalog, args.runs, **kwargs)
+            print(f"{size:>8}  {name:<30} {median:>10.1f} {worst:>8.1f} {deviation:>10.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark bcrypt hashing throughput per cost setting
+
+Reports ms per hash and hashes/sec for each round count, single-threaded
+and across a thread pool, plus the rounds auth.calibrate_bcrypt_rounds
+would pick for a target latency on this machine.
+
+Run from backend/:  python -m scripts.bench_password_hash [--min 8] [--max 13] [--threads 4]
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from passlib.hash import bcrypt
+
+import auth
+
+
+def time_hashes(rounds: int, count: int, threads: int) -> float:
+    """Seconds to compute `count` hashes at `rounds` using `threads` workers"""
+    hasher = bcrypt.using(rounds=rounds)
+    started = time.perf_counter()
+    if threads == 1:
+        for i in range(count):
+            hasher.hash(f"password-{i}")
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(hasher.hash, (f"password-{i}" for i in range(count))))
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--min', type=int, default=8, help='lowest bcrypt cost')
+    parser.add_argument('--max', type=int, default=13, help='highest bcrypt cost')
+    parser.add_argument('--threads', type=int, default=4, help='workers for the pooled run')
+    parser.add_argument('--target-ms', type=float, default=250, help='latency target for calibration')
+    args = parser.parse_args()
+
+    print(f"{'rounds':>6} {'ms/hash':>10} {'hashes/s':>10} {f'hashes/s x{args.threads}':>16}")
+    for rounds in range(args.min, args.max + 1):
+        # Keep each cost to roughly a second of work
+        count = max(2, 2 ** max(0, 12 - rounds))
+        single = time_hashes(rounds, count, 1)
+        pooled = time_hashes(rounds, count * args.threads, args.threads)
+        print(f"{rounds:>6} {single / count * 1000:>10.1f} {count / single:>10.1f} "
+              f"{count * args.threads / pooled:>16.1f}")
+
+    rounds = auth.calibrate_bcrypt_rounds(args.target_ms, min_rounds=4, max_rounds=31)
+    print(f"\nCalibrated for {args.target_ms:.0f} ms: {rounds} rounds")
+
+
+if __name__ == '__main__':
+    main()
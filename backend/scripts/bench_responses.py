@@ -0,0 +1,81 @@
+"""
+Benchmark response serialization against the old json.dumps path
+
+Run from backend/:  python -m scripts.bench_responses [--recipes N]
+"""
+import argparse
+import json
+import timeit
+from decimal import Decimal
+from typing import Any, Dict, List
+
+import api_responses
+
+
+def make_recipes(count: int) -> List[Dict[str, Any]]:
+    """Recipe items shaped like boto3 resource output (numbers as Decimal)"""
+    return [
+        {
+            'recipe_id': f'recipe-{i:06d}',
+            'name': f'Grilled Chicken Bowl {i}',
+            'description': 'Fresh mixed greens with grilled chicken breast and quinoa',
+            'category': ('breakfast', 'lunch', 'dinner')[i % 3],
+            'ingredients': ['Chicken breast', 'Quinoa', 'Spinach', 'Cherry tomatoes', 'Olive oil'],
+            'instructions': ['Grill the chicken', 'Cook the quinoa', 'Assemble the bowl'],
+            'prep_time': Decimal(10 + i % 20),
+            'cook_time': Decimal(15 + i % 30),
+            'servings': Decimal(2),
+            'nutrition': {
+                'calories': Decimal(450 + i % 200),
+                'protein': Decimal('35.5'),
+                'carbs': Decimal(40),
+                'fat': Decimal('12.25')
+            },
+            'image_url': None,
+            'difficulty': 'medium',
+            'tags': ['high-protein', 'gluten-free'],
+            'created_at': Decimal(1700000000 + i),
+            'updated_at': Decimal(1700000000 + i)
+        }
+        for i in range(count)
+    ]
+
+
+def _legacy_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(type(value).__name__)
+
+
+def bench(label: str, func, repeat: int) -> float:
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    print(f"  {label:<40} {best * 1000:9.2f} ms")
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--recipes', type=int, nargs='*', default=[100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"orjson available: {api_responses.ORJSON_AVAILABLE}")
+    for count in args.recipes:
+        payload = {'recipes': make_recipes(count)}
+        print(f"\n{count} recipes")
+        baseline = bench(
+            "json.dumps(default=Decimal hook)",
+            lambda: json.dumps(payload, default=_legacy_default),
+            args.repeat
+        )
+        fast = bench("api_responses.dumps", lambda: api_responses.dumps(payload), args.repeat)
+        bench(
+            "api_responses.iter_encode_list (bytes)",
+            lambda: sum(len(chunk) for chunk in api_responses.iter_encode_list(payload['recipes'])),
+            args.repeat
+        )
+        print(f"  speedup: {baseline / fast:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Report cold-start import cost per Lambda handler
+
+Imports each handler in a fresh interpreter with `-X importtime` and
+summarizes the output, so import-time regressions show up in review.
+
+Run from backend/:  python -m scripts.profile_imports [--top N] [--budget-ms MS]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, NamedTuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FUNCTIONS_DIR = os.path.join(BACKEND_DIR, 'functions')
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+class ImportRecord(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def discover_handlers() -> List[str]:
+    """Every module in functions/ that defines a lambda_handler"""
+    handlers = []
+    for filename in sorted(os.listdir(FUNCTIONS_DIR)):
+        if not filename.endswith('.py'):
+            continue
+        with open(os.path.join(FUNCTIONS_DIR, filename)) as source:
+            if 'def lambda_handler' in source.read():
+                handlers.append(filename[:-3])
+    return handlers
+
+
+def profile_module(module: str) -> List[ImportRecord]:
+    """Import a module in a clean interpreter and parse -X importtime output"""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([BACKEND_DIR, FUNCTIONS_DIR])
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, env=env, cwd=BACKEND_DIR
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    records = []
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            records.append(ImportRecord(
+                module=match.group(4),
+                self_us=int(match.group(1)),
+                cumulative_us=int(match.group(2)),
+                depth=len(match.group(3)) // 2
+            ))
+    return records
+
+
+def summarize(records: List[ImportRecord]) -> Dict[str, int]:
+    """Self time aggregated by top-level package"""
+    totals: Dict[str, int] = defaultdict(int)
+    for record in records:
+        totals[record.module.split('.')[0]] += record.self_us
+    return dict(totals)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('handlers', nargs='*', help='handler modules (default: all)')
+    parser.add_argument('--top', type=int, default=8, help='packages to list per handler')
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help='exit non-zero if any handler exceeds this import time')
+    args = parser.parse_args()
+
+    over_budget = []
+    for handler in args.handlers or discover_handlers():
+        records = profile_module(handler)
+        total_ms = sum(record.self_us for record in records) / 1000
+        print(f"\n{handler}: {total_ms:.1f} ms total import time ({len(records)} modules)")
+        packages = sorted(summarize(records).items(), key=lambda item: item[1], reverse=True)
+        for package, self_us in packages[:args.top]:
+            print(f"  {package:<28} {self_us / 1000:8.1f} ms")
+        if args.budget_ms is not None and total_ms > args.budget_ms:
+            over_budget.append(handler)
+
+    if over_budget:
+        print(f"\nOver {args.budget_ms} ms budget: {', '.join(over_budget)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
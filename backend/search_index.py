@@ -0,0 +1,185 @@
+"""
+Inverted index for recipe search
+
+Postings are stored in the recipe search table as one item per
+(term, recipe_id), so a search only reads the posting lists of its query
+terms instead of scanning the recipes table. Ranking is BM25 over a
+boost-weighted combination of the name, tags and description fields.
+"""
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Any, Tuple
+from boto3.dynamodb.conditions import Key
+from database import db_client
+from config import settings
+
+# Field boosts are integers so weighted term frequencies stay integral
+# (DynamoDB numbers cannot be floats)
+FIELD_BOOSTS = {
+    'name': 3,
+    'tags': 2,
+    'description': 1
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Corpus statistics and catalog version item; '#' never appears in a
+# normalized term
+META_KEY = {'term': '#meta', 'recipe_id': '#meta'}
+
+STOPWORDS = frozenset([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in',
+    'into', 'is', 'it', 'of', 'on', 'or', 'the', 'to', 'with', 'your'
+])
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_term(token: str) -> str:
+    """Fold simple plurals so 'eggs' and 'egg' share a posting list"""
+    if len(token) > 4 and token.endswith('ies'):
+        return token[:-3] + 'y'
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into normalized index terms"""
+    if not text:
+        return []
+    return [
+        normalize_term(token)
+        for token in _TOKEN_RE.findall(text.lower())
+        if token not in STOPWORDS
+    ]
+
+
+def field_terms(recipe: Dict[str, Any]) -> Dict[str, Counter]:
+    """Term frequencies for each indexed field of a recipe"""
+    tags = recipe.get('tags') or []
+    return {
+        'name': Counter(tokenize(recipe.get('name'))),
+        'tags': Counter(tokenize(' '.join(str(tag) for tag in tags))),
+        'description': Counter(tokenize(recipe.get('description')))
+    }
+
+
+def build_postings(recipe: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], int]:
+    """Build posting items and the weighted document length for a recipe"""
+    fields = field_terms(recipe)
+
+    weighted_tf: Counter = Counter()
+    doc_length = 0
+    for field, terms in fields.items():
+        boost = FIELD_BOOSTS[field]
+        doc_length += boost * sum(terms.values())
+        for term, count in terms.items():
+            weighted_tf[term] += boost * count
+
+    postings = [
+        {
+            'term': term,
+            'recipe_id': recipe['recipe_id'],
+            'tf': tf,
+            'dl': doc_length
+        }
+        for term, tf in weighted_tf.items()
+    ]
+    return postings, doc_length
+
+
+def _update_stats(doc_delta: int, length_delta: int) -> None:
+    """Adjust the corpus document count and total length"""
+    if not doc_delta and not length_delta:
+        return
+    db_client.update_item(
+        settings.RECIPE_SEARCH_TABLE,
+        META_KEY,
+        "ADD doc_count :docs, total_length :length",
+        {':docs': doc_delta, ':length': length_delta}
+    )
+
+
+def index_recipe(recipe: Dict[str, Any], previous: Optional[Dict[str, Any]] = None) -> int:
+    """Add or refresh a recipe's postings, removing terms it no longer has"""
+    postings, doc_length = build_postings(recipe)
+
+    stale_keys = []
+    previous_length = 0
+    if previous:
+        old_postings, previous_length = build_postings(previous)
+        current_terms = {posting['term'] for posting in postings}
+        stale_keys = [
+            {'term': posting['term'], 'recipe_id': posting['recipe_id']}
+            for posting in old_postings
+            if posting['term'] not in current_terms
+        ]
+
+    db_client.batch_write(settings.RECIPE_SEARCH_TABLE, postings, stale_keys)
+    _update_stats(0 if previous else 1, doc_length - previous_length)
+    return len(postings)
+
+
+def remove_recipe(recipe: Dict[str, Any]) -> int:
+    """Delete all postings for a recipe"""
+    postings, doc_length = build_postings(recipe)
+    keys = [{'term': posting['term'], 'recipe_id': posting['recipe_id']} for posting in postings]
+
+    db_client.batch_write(settings.RECIPE_SEARCH_TABLE, delete_keys=keys)
+    _update_stats(-1, -doc_length)
+    return len(keys)
+
+
+def search(query: str, limit: int = 20) -> List[Tuple[str, float]]:
+    """Return the top (recipe_id, score) pairs for a query, best first"""
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms:
+        return []
+
+    meta = db_client.get_item(settings.RECIPE_SEARCH_TABLE, META_KEY) or {}
+    doc_count = max(int(meta.get('doc_count', 0)), 1)
+    avg_length = max(float(meta.get('total_length', 0)) / doc_count, 1.0)
+
+    scores: Dict[str, float] = {}
+    for term in terms:
+        postings = db_client.query(settings.RECIPE_SEARCH_TABLE, Key('term').eq(term))
+        if not postings:
+            continue
+
+        df = len(postings)
+        idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+        for posting in postings:
+            tf = float(posting['tf'])
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * float(posting['dl']) / avg_length)
+            recipe_id = posting['recipe_id']
+            scores[recipe_id] = scores.get(recipe_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+    return heapq.nlargest(limit, scores.items(), key=lambda pair: (pair[1], pair[0]))
+
+
+def rebuild_index() -> int:
+    """Index every recipe in the catalog and reset the corpus stats"""
+    doc_count = 0
+    total_length = 0
+    for recipe in db_client.iter_scan(settings.RECIPES_TABLE):
+        postings, doc_length = build_postings(recipe)
+        db_client.batch_write(settings.RECIPE_SEARCH_TABLE, postings)
+        doc_count += 1
+        total_length += doc_length
+
+    # SET rather than put_item so the catalog version stamp survives a rebuild
+    db_client.update_item(
+        settings.RECIPE_SEARCH_TABLE,
+        META_KEY,
+        "SET doc_count = :docs, total_length = :length",
+        {':docs': doc_count, ':length': total_length}
+    )
+    return doc_count
+
+
+if __name__ == '__main__':
+    print(f"Indexed {rebuild_index()} recipes")
@@ -0,0 +1,147 @@
+"""
+Table exports streamed to S3 as gzip-compressed NDJSON
+
+Every scan segment runs on its own worker thread (db_client.scan_segments).
+The worker that scanned a page also encodes it as NDJSON and compresses it
+into a standalone gzip member. Concatenated gzip members are still one
+valid gzip file, so pages never need putting back in order. Members
+collect in a shared buffer, and whichever worker fills it to
+EXPORT_PART_SIZE_MB uploads it as the next part of a multipart upload.
+Memory stays around one part per segment, however large the table.
+"""
+import gzip
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from database import db_client, s3_client, generate_id, MultipartUpload
+from config import settings
+from api_responses import dumps_bytes
+
+# Export name -> the setting holding its table name
+EXPORT_TABLES = {
+    'recipes': 'RECIPES_TABLE',
+    'users': 'USERS_TABLE',
+    'orders': 'ORDERS_TABLE'
+}
+
+# Attributes that never leave the table
+REDACTED_ATTRIBUTES = {
+    'users': ('password_hash',)
+}
+
+SCAN_PAGE_SIZE = 1000
+MIN_PART_SIZE = 5 * 1024 * 1024  # S3 minimum for every part but the last
+COMPRESS_LEVEL = 6
+
+
+class _PartWriter:
+    """Gathers gzip members from scan workers and cuts them into upload parts"""
+
+    def __init__(self, upload: Optional[MultipartUpload], part_size: int, redacted: tuple):
+        self.upload = upload
+        self.part_size = part_size
+        self.redacted = redacted
+        self.items = 0
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+        self.parts = 0
+        self._pending: List[bytes] = []
+        self._pending_bytes = 0
+        self._lock = threading.Lock()
+
+    def write_page(self, items: List[Dict[str, Any]]) -> None:
+        """Runs on scan worker threads"""
+        if not items:
+            return
+        for item in items:
+            for attribute in self.redacted:
+                item.pop(attribute, None)
+        raw = b'\n'.join(dumps_bytes(item) for item in items) + b'\n'
+        member = gzip.compress(raw, COMPRESS_LEVEL, mtime=0)
+
+        with self._lock:
+            self.items += len(items)
+            self.raw_bytes += len(raw)
+            self.compressed_bytes += len(member)
+            self._pending.append(member)
+            self._pending_bytes += len(member)
+            if self._pending_bytes < self.part_size:
+                return
+            part_number, body = self._take()
+        self._send(part_number, body)
+
+    def flush(self) -> None:
+        """Upload whatever is left as the final part"""
+        with self._lock:
+            if not self._pending and self.parts:
+                return
+            if not self._pending:
+                # An empty table still exports as a valid, empty gzip file
+                self._pending.append(gzip.compress(b'', COMPRESS_LEVEL, mtime=0))
+            part_number, body = self._take()
+        self._send(part_number, body)
+
+    def _take(self) -> Tuple[int, bytes]:
+        body = b''.join(self._pending)
+        self._pending = []
+        self._pending_bytes = 0
+        self.parts += 1
+        return self.parts, body
+
+    def _send(self, part_number: int, body: bytes) -> None:
+        if self.upload:
+            self.upload.upload_part(part_number, body)
+
+
+def export_key(name: str) -> str:
+    """Object key for a new export of `name`"""
+    stamp = time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())
+    return f"{settings.EXPORT_PREFIX}{name}/{stamp}-{generate_id()[:8]}.ndjson.gz"
+
+
+def export_table(name: str, segments: Optional[int] = None, upload: bool = True) -> Dict[str, Any]:
+    """Export one table to CONTENT_BUCKET; with upload=False, scan and compress only"""
+    if name not in EXPORT_TABLES:
+        raise ValueError(f"Unknown export '{name}'; expected one of {', '.join(EXPORT_TABLES)}")
+    table_name = getattr(settings, EXPORT_TABLES[name])
+    segments = segments or settings.JOB_SCAN_SEGMENTS
+    key = export_key(name)
+
+    multipart = s3_client.multipart_upload(settings.CONTENT_BUCKET, key, 'application/gzip') if upload else None
+    writer = _PartWriter(
+        multipart,
+        max(settings.EXPORT_PART_SIZE_MB * 1024 * 1024, MIN_PART_SIZE),
+        REDACTED_ATTRIBUTES.get(name, ())
+    )
+
+    started = time.monotonic()
+    try:
+        db_client.scan_segments(table_name, segments, writer.write_page, limit=SCAN_PAGE_SIZE)
+        writer.flush()
+        location = multipart.complete() if multipart else None
+    except Exception:
+        if multipart:
+            multipart.abort()
+        raise
+    elapsed = time.monotonic() - started
+
+    result = {
+        'export': name,
+        'table': table_name,
+        'segments': segments,
+        'items': writer.items,
+        'parts': writer.parts,
+        'raw_bytes': writer.raw_bytes,
+        'compressed_bytes': writer.compressed_bytes,
+        'elapsed_seconds': round(elapsed, 3),
+        'items_per_second': round(writer.items / elapsed, 1) if elapsed else 0.0,
+        'raw_mb_per_second': round(writer.raw_bytes / elapsed / 1e6, 2) if elapsed else 0.0,
+        'location': location
+    }
+    if location:
+        result['key'] = key
+        result['download_url'] = s3_client.generate_presigned_url(
+            settings.CONTENT_BUCKET, key, settings.EXPORT_URL_EXPIRE_SECONDS
+        )
+        result['expires_in'] = settings.EXPORT_URL_EXPIRE_SECONDS
+    return result
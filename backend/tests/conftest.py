@@ -0,0 +1,57 @@
+"""
+Shared test fixtures
+
+Tests import backend modules the way the Lambda runtime does (flat, from
+backend/), and AWS calls go to moto's in-memory services.
+"""
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ['AWS_ACCESS_KEY_ID'] = 'testing'
+os.environ['AWS_SECRET_ACCESS_KEY'] = 'testing'
+os.environ.pop('OPENAI_API_KEY', None)
+# Cheapest bcrypt cost, so registration tests do not spend seconds hashing
+os.environ['BCRYPT_ROUNDS'] = '4'
+os.environ['BCRYPT_MIN_ROUNDS'] = '4'
+
+import schema
+from config import get_settings, settings, LazyObject
+from database import db_client
+
+
+def _reset_singletons() -> None:
+    """Drop per-container state so each test starts cold"""
+    import auth, cache, catalog_snapshot, meal_generation, recipe_catalog, recipe_similarity, recommendation_cache
+    for module in (auth, cache, catalog_snapshot, meal_generation, recipe_catalog, recipe_similarity,
+                   recommendation_cache):
+        for value in vars(module).values():
+            if isinstance(value, LazyObject):
+                value._target = None
+    db_client._dynamodb = None
+
+
+@pytest.fixture
+def aws(tmp_path, monkeypatch):
+    """moto-backed DynamoDB tables and content bucket from schema.py"""
+    from moto import mock_aws
+    import boto3
+
+    # Downloaded catalog snapshots are keyed by version, which restarts per test
+    monkeypatch.setenv('CATALOG_SNAPSHOT_DIR', str(tmp_path))
+    get_settings.cache_clear()
+    with mock_aws():
+        client = boto3.client('dynamodb', region_name=settings.AWS_REGION)
+        for name in dir(schema):
+            if name.endswith('_SCHEMA'):
+                client.create_table(**getattr(schema, name))
+        boto3.client('s3', region_name=settings.AWS_REGION).create_bucket(Bucket=settings.CONTENT_BUCKET)
+        _reset_singletons()
+        yield
+    _reset_singletons()
+    get_settings.cache_clear()
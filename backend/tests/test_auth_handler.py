@@ -0,0 +1,56 @@
+"""
+Registration and login against the email lock table
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from config import get_settings, settings
+from database import db_client
+from functions import auth_handler
+
+
+def call(path, body):
+    response = auth_handler.lambda_handler(
+        {'httpMethod': 'POST', 'path': f'/auth/{path}', 'body': json.dumps(body)}, None
+    )
+    return response['statusCode'], json.loads(response['body'])
+
+
+def register(email, password='correct horse'):
+    return call('register', {'email': email, 'password': password, 'name': 'Test'})
+
+
+def test_register_then_login(aws):
+    status, body = register('Cook@Example.com')
+    assert status == 201
+
+    status, login = call('login', {'email': ' cook@example.com', 'password': 'correct horse'})
+    assert status == 200
+    assert login['user_id'] == body['user_id']
+
+
+def test_duplicate_email_differing_in_case_is_rejected(aws):
+    assert register('cook@example.com')[0] == 201
+    assert register('COOK@example.com ')[0] == 409
+
+
+def test_concurrent_registrations_create_one_account(aws):
+    with ThreadPoolExecutor(8) as pool:
+        statuses = list(pool.map(lambda _: register('race@example.com')[0], range(8)))
+
+    assert statuses.count(201) == 1
+    assert statuses.count(409) == 7
+    assert len(db_client.scan(settings.USERS_TABLE)) == 1
+    assert len(db_client.scan(settings.USER_PROFILES_TABLE)) == 1
+
+
+def test_account_without_lock_is_found_until_backfilled(aws, monkeypatch):
+    db_client.put_item(settings.USERS_TABLE, {'user_id': 'legacy', 'email': 'old@example.com', 'is_active': True})
+    assert register('old@example.com')[0] == 409
+
+    monkeypatch.setenv('EMAIL_LOCKS_BACKFILLED', 'true')
+    get_settings.cache_clear()
+    monkeypatch.setattr(db_client, 'query', pytest.fail)
+    assert register('new@example.com')[0] == 201
@@ -0,0 +1,23 @@
+"""
+Handler imports stay cheap: no NumPy and no Settings until a request needs them
+"""
+import subprocess
+import sys
+
+import pytest
+
+from conftest import BACKEND_DIR
+
+HANDLERS = ['auth_handler', 'favorites_handler', 'meal_recommendations', 'pregenerate_recommendations',
+            'profiles_handler', 'recipes_handler']
+
+
+@pytest.mark.parametrize('handler', HANDLERS)
+def test_handler_import_is_lazy(handler):
+    script = (
+        f"import sys; import functions.{handler}; from config import get_settings; "
+        "print('numpy' in sys.modules, get_settings.cache_info().currsize)"
+    )
+    output = subprocess.run([sys.executable, '-c', script], cwd=BACKEND_DIR, check=True,
+                            capture_output=True, text=True).stdout.split()
+    assert output == ['False', '0']
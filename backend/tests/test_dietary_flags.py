@@ -0,0 +1,149 @@
+"""
+Allergen and diet bitmasks, and the ?allergens= / ?diet= recipe filter
+"""
+import json
+
+import pytest
+
+from dietary_flags import ALLERGENS, is_safe, normalize_recipe, profile_masks, recipe_flags
+
+
+def allergens_in(*ingredients):
+    flags = recipe_flags({'ingredients': list(ingredients)})
+    return {name for name, (bit, _) in ALLERGENS.items() if flags & 1 << bit}
+
+
+@pytest.mark.parametrize('ingredient, allergen', [
+    ('Parmesan', 'dairy'),
+    ('crumbled feta', 'dairy'),
+    ('fresh mozzarella', 'dairy'),
+    ('Greek yogurt', 'dairy'),
+    ('spaghetti', 'gluten'),
+    ('penne', 'gluten'),
+    ('egg noodles', 'gluten'),
+    ('whole-wheat wrap', 'gluten'),
+    ('soy sauce', 'gluten'),
+    ('mayonnaise', 'eggs'),
+    ('garlic aioli', 'eggs'),
+    ('2 eggs', 'eggs'),
+    ('mixed nuts', 'nuts'),
+    ('pine nuts', 'nuts'),
+    ('basil pesto', 'nuts'),
+    ('peanut butter', 'peanuts'),
+    ('anchovies', 'fish'),
+    ('tiger prawns', 'shellfish'),
+    ('hummus', 'sesame'),
+    ('tamari', 'soy'),
+])
+def test_allergen_is_detected(ingredient, allergen):
+    assert allergen in allergens_in(ingredient)
+
+
+@pytest.mark.parametrize('ingredient, allergen', [
+    ('butternut squash', 'dairy'),
+    ('butternut squash', 'nuts'),
+    ('veggie stock', 'eggs'),
+    ('eggplant', 'eggs'),
+    ('coconut', 'nuts'),
+    ('nutmeg', 'nuts'),
+    ('peanut butter', 'dairy'),
+    ('coconut milk', 'dairy'),
+    ('almond milk', 'dairy'),
+    ('cream of tartar', 'dairy'),
+    ('butter beans', 'dairy'),
+    ('buckwheat', 'gluten'),
+    ('rice noodles', 'gluten'),
+    ('chickpea pasta', 'gluten'),
+    ('corn tortillas', 'gluten'),
+    ('tamari', 'gluten'),
+    ('avocado', 'fish'),
+])
+def test_lookalike_is_not_an_allergen(ingredient, allergen):
+    assert allergen not in allergens_in(ingredient)
+
+
+@pytest.mark.parametrize('ingredient, allergen', [
+    ('gluten-free bread', 'gluten'),
+    ('Gluten free penne', 'gluten'),
+    ('dairy-free cheese', 'dairy'),
+    ('egg-free mayo', 'eggs'),
+])
+def test_free_from_label_clears_the_ingredient(ingredient, allergen):
+    assert allergen not in allergens_in(ingredient)
+
+
+def test_vegan_satisfies_vegetarian_and_dairy_free():
+    flags = recipe_flags({'tags': ['Vegan']})
+    for preference in ('vegan', 'vegetarian', 'pescatarian', 'dairy-free'):
+        required, forbidden, _, _ = profile_masks([preference], [])
+        assert is_safe(flags, required, forbidden), preference
+
+
+def test_vegetarian_does_not_satisfy_vegan():
+    required, forbidden, _, _ = profile_masks(['vegan'], [])
+    assert not is_safe(recipe_flags({'tags': ['vegetarian']}), required, forbidden)
+
+
+def test_seafood_allergy_covers_fish_and_shellfish():
+    _, forbidden, _, unknown = profile_masks([], ['Seafood'])
+    assert not unknown
+    for ingredient in ('salmon fillet', 'shrimp'):
+        assert not is_safe(recipe_flags({'ingredients': [ingredient]}), 0, forbidden)
+
+
+def test_unknown_allergy_is_returned_for_text_matching():
+    _, forbidden, _, unknown = profile_masks([], ['kiwi', 'milk'])
+    assert unknown == ['kiwi']
+    assert forbidden == 1 << ALLERGENS['dairy'][0]
+
+
+RECIPES = [
+    ('carbonara', ['spaghetti', 'eggs', 'Parmesan', 'pancetta'], ['dinner']),
+    ('greek-salad', ['cucumber', 'tomato', 'feta', 'olives'], ['vegetarian']),
+    ('pesto-pasta', ['penne', 'basil', 'pine nuts', 'mozzarella'], ['vegetarian']),
+    ('chicken-salad', ['chicken breast', 'lettuce', 'mayonnaise'], []),
+    ('squash-soup', ['butternut squash', 'veggie stock', 'gluten-free bread'], ['vegan']),
+]
+
+
+@pytest.fixture
+def seeded_recipes(aws):
+    from config import settings
+    from database import db_client
+    from cache import recipe_cache
+
+    for recipe_id, ingredients, tags in RECIPES:
+        db_client.put_item(settings.RECIPES_TABLE, normalize_recipe({
+            'recipe_id': recipe_id,
+            'name': recipe_id,
+            'category': 'mains',
+            'created_at': 0,
+            'ingredients': ingredients,
+            'tags': tags,
+            'nutrition': {'calories': 500, 'protein': 30, 'carbs': 50, 'fat': 20}
+        }))
+    recipe_cache.bump_version()
+
+
+def safe_recipe_ids(**params):
+    from functions import recipes_handler
+
+    response = recipes_handler.lambda_handler(
+        {'httpMethod': 'GET', 'path': '/recipes', 'queryStringParameters': params}, None
+    )
+    assert response['statusCode'] == 200, response['body']
+    return sorted(recipe['recipe_id'] for recipe in json.loads(response['body'])['recipes'])
+
+
+@pytest.mark.parametrize('allergens, expected', [
+    ('dairy', ['chicken-salad', 'squash-soup']),
+    ('gluten', ['chicken-salad', 'greek-salad', 'squash-soup']),
+    ('eggs', ['greek-salad', 'pesto-pasta', 'squash-soup']),
+    ('nuts', ['carbonara', 'chicken-salad', 'greek-salad', 'squash-soup']),
+])
+def test_allergen_filter_excludes_unsafe_recipes(seeded_recipes, allergens, expected):
+    assert safe_recipe_ids(allergens=allergens) == expected
+
+
+def test_diet_filter_accepts_implied_diets(seeded_recipes):
+    assert safe_recipe_ids(diet='vegetarian') == ['greek-salad', 'pesto-pasta', 'squash-soup']
@@ -0,0 +1,42 @@
+"""
+Rule-based recommendations when the catalog has nothing suitable
+"""
+from dietary_flags import is_safe, profile_masks, recipe_flags
+from meal_generation import get_rule_based_recommendations
+
+MACROS = {'calories': 2100, 'protein': 150, 'carbs': 210, 'fat': 70}
+
+
+def recommend(meal_type, dietary_preferences=(), allergies=()):
+    return get_rule_based_recommendations(
+        'maintenance', list(dietary_preferences), list(allergies), meal_type, MACROS
+    )
+
+
+def test_empty_catalog_serves_generic_meals(aws):
+    meals = recommend('breakfast')
+    assert len(meals) == 3
+    assert all(meal['nutrition']['calories'] == 700 for meal in meals)
+
+
+def test_generic_meals_respect_allergies(aws):
+    names = [meal['name'] for meal in recommend('breakfast', allergies=['nuts'])]
+    assert names == ['Veggie Egg White Scramble']
+
+
+def test_generic_meals_respect_diets(aws):
+    assert recommend('breakfast', dietary_preferences=['vegan']) == []
+    assert [meal['name'] for meal in recommend('dinner', dietary_preferences=['vegan'])] == ['Vegetarian Lentil Curry']
+
+
+def test_generic_meals_respect_unflagged_allergies(aws):
+    names = [meal['name'] for meal in recommend('lunch', allergies=['avocado'])]
+    assert 'Turkey and Avocado Wrap' not in names
+
+
+def test_every_generic_meal_passes_its_own_filters(aws):
+    for meal_type in ('breakfast', 'lunch', 'dinner'):
+        for allergy in ('gluten', 'dairy', 'eggs', 'soy', 'fish', 'sesame'):
+            _, forbidden, _, _ = profile_masks([], [allergy])
+            for meal in recommend(meal_type, allergies=[allergy]):
+                assert is_safe(recipe_flags(meal), 0, forbidden), (meal['name'], allergy)
@@ -0,0 +1,55 @@
+"""
+Pre-generated daily plans are only served for the profile version they were built from
+"""
+import json
+
+import pytest
+
+from auth import create_access_token
+from config import settings
+from database import db_client
+from meal_plans import daily_plan_item, get_daily_plan_and_profile
+from functions import meal_recommendations
+
+PLAN = {'lunch': [{'name': 'Pre-generated lunch'}]}
+
+
+@pytest.fixture
+def profile(aws):
+    profile = {'user_id': 'u1', 'fitness_goal': 'maintenance', 'weight': 80, 'height': 180, 'age': 30,
+               'gender': 'male', 'activity_level': 'moderate', 'allergies': [], 'version': 3}
+    db_client.put_item(settings.USER_PROFILES_TABLE, profile)
+    return profile
+
+
+def lunch_names(user_id):
+    response = meal_recommendations.lambda_handler({
+        'httpMethod': 'POST',
+        'headers': {'Authorization': f"Bearer {create_access_token({'sub': user_id})}"},
+        'body': json.dumps({'meal_type': 'lunch'})
+    }, None)
+    assert response['statusCode'] == 200, response['body']
+    return [meal['name'] for meal in json.loads(response['body'])['recommendations']]
+
+
+def test_current_plan_is_served(profile):
+    db_client.put_item(settings.MEAL_PLANS_TABLE, daily_plan_item('u1', PLAN, 'rules', profile_version=3))
+    assert lunch_names('u1') == ['Pre-generated lunch']
+
+
+def test_plan_from_an_older_profile_version_is_skipped(profile):
+    # Written by a job that scanned the profile before its last edit
+    db_client.put_item(settings.MEAL_PLANS_TABLE, daily_plan_item('u1', PLAN, 'rules', profile_version=2))
+
+    plan, loaded = get_daily_plan_and_profile('u1')
+    assert plan is None and loaded['version'] == 3
+    assert 'Pre-generated lunch' not in lunch_names('u1')
+
+
+def test_missing_profile_is_not_found(aws):
+    response = meal_recommendations.lambda_handler({
+        'httpMethod': 'POST',
+        'headers': {'Authorization': f"Bearer {create_access_token({'sub': 'nobody'})}"},
+        'body': json.dumps({'meal_type': 'lunch'})
+    }, None)
+    assert response['statusCode'] == 404
@@ -0,0 +1,27 @@
+"""
+Fallback from AI to rule-based recommendations
+"""
+from config import get_settings
+from nutrition import profile_targets
+from functions import meal_recommendations
+
+
+def test_rule_based_fallback_uses_the_profile_targets(monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'test')
+    get_settings.cache_clear()
+    monkeypatch.setattr(meal_recommendations, 'generate_ai_recommendations', lambda *args, **kwargs: None)
+    monkeypatch.setattr(meal_recommendations, 'get_user_recommendations', lambda user_id: {})
+    seen = {}
+    monkeypatch.setattr(meal_recommendations, 'get_rule_based_recommendations',
+                        lambda *args: seen.setdefault('macros', args[4]))
+    profile = {'user_id': 'u1', 'fitness_goal': 'maintenance',
+               'nutrition_targets': {'calories': 2237, 'protein': 163, 'carbs': 221, 'fat': 74}}
+
+    try:
+        meal_recommendations.generate_meal_recommendations(profile, 'lunch')
+    finally:
+        monkeypatch.undo()
+        get_settings.cache_clear()
+
+    assert seen['macros'] == profile_targets(profile)
+    assert seen['macros']['calories'] == 2237
@@ -0,0 +1,74 @@
+"""
+Conditional profile updates
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from auth import create_access_token
+from config import settings
+from database import db_client
+from meal_plans import daily_plan_id, daily_plan_item
+from functions import profiles_handler
+
+
+@pytest.fixture
+def profile(aws):
+    db_client.put_item(settings.USER_PROFILES_TABLE, {
+        'user_id': 'u1', 'fitness_goal': 'maintenance', 'weight': 80, 'height': 180, 'age': 30,
+        'gender': 'male', 'activity_level': 'moderate', 'version': 1
+    })
+
+
+def put(body, **headers):
+    response = profiles_handler.lambda_handler({
+        'httpMethod': 'PUT',
+        'path': '/profiles/u1',
+        'pathParameters': {'id': 'u1'},
+        'headers': {'Authorization': f"Bearer {create_access_token({'sub': 'u1'})}", **headers},
+        'body': json.dumps(body)
+    }, None)
+    return response['statusCode'], json.loads(response['body'])
+
+
+def stored():
+    return db_client.get_item(settings.USER_PROFILES_TABLE, {'user_id': 'u1'}, consistent_read=True)
+
+
+def test_versioned_update_bumps_version_and_targets(profile):
+    status, body = put({'weight': 70, 'version': 1})
+    assert status == 200
+    assert body['version'] == 2
+    assert stored()['nutrition_targets'] == body['nutrition_targets']
+
+
+def test_stale_version_is_rejected_with_the_current_one(profile):
+    assert put({'weight': 70, 'version': 1})[0] == 200
+    status, body = put({'weight': 90}, **{'If-Match': '"1"'})
+    assert status == 409
+    assert body['version'] == 2
+    assert int(stored()['weight']) == 70
+
+
+def test_concurrent_unversioned_updates_all_apply(profile):
+    changes = [{'weight': 75}, {'height': 175}, {'age': 35}]
+    with ThreadPoolExecutor(len(changes)) as pool:
+        statuses = [status for status, _ in pool.map(put, changes)]
+
+    assert statuses == [200] * len(changes)
+    profile = stored()
+    assert (int(profile['weight']), int(profile['height']), int(profile['age'])) == (75, 175, 35)
+    assert profile['version'] == 1 + len(changes)
+
+
+def test_update_drops_the_daily_plan(profile):
+    db_client.put_item(settings.MEAL_PLANS_TABLE, daily_plan_item('u1', {}, 'rules', profile_version=1))
+    assert put({'allergies': ['peanuts']})[0] == 200
+    assert db_client.get_item(settings.MEAL_PLANS_TABLE, {'plan_id': daily_plan_id('u1')}) is None
+
+
+def test_invalid_values_are_rejected(profile):
+    assert put({'weight': 5})[0] == 400
+    assert put({'allergies': 'peanuts'})[0] == 400
+    assert put({'weight': 70, 'version': 'abc'})[0] == 400
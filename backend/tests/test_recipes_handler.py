@@ -0,0 +1,139 @@
+"""
+Recipe listing and search: parameters, cursors and ordering
+"""
+import json
+
+import pytest
+
+from config import settings
+from database import db_client
+from dietary_flags import normalize_recipe
+from cache import recipe_cache
+import search_index
+from functions import recipes_handler
+
+
+def get(path, **params):
+    response = recipes_handler.lambda_handler(
+        {'httpMethod': 'GET', 'path': path, 'queryStringParameters': params}, None
+    )
+    return response['statusCode'], json.loads(response['body'])
+
+
+@pytest.fixture
+def salads(aws):
+    for i in range(5):
+        recipe = normalize_recipe({'recipe_id': f'salad-{i}', 'name': f'Green salad {i}', 'category': 'lunch',
+                                   'created_at': i, 'ingredients': ['lettuce'], 'tags': []})
+        db_client.put_item(settings.RECIPES_TABLE, recipe)
+        search_index.index_recipe(recipe)
+    recipe_cache.bump_version()
+
+
+@pytest.mark.parametrize('limit', ['abc', '1.5', ''])
+def test_search_rejects_a_malformed_limit(salads, limit):
+    status, body = get('/recipes/search', q='salad', limit=limit)
+    assert status == 400
+    assert body['message'] == 'Invalid limit'
+
+
+@pytest.mark.parametrize('limit, expected', [('0', 1), ('-3', 1), ('2', 2), ('500', 5)])
+def test_search_clamps_the_limit(salads, limit, expected):
+    status, body = get('/recipes/search', q='salad', limit=limit)
+    assert status == 200
+    assert body['count'] == expected
+
+
+def call(method, path, recipe_id, **params):
+    response = recipes_handler.lambda_handler({
+        'httpMethod': method, 'path': path, 'pathParameters': {'id': recipe_id},
+        'queryStringParameters': params
+    }, None)
+    return response['statusCode'], json.loads(response['body'] or 'null')
+
+
+def test_similar_skips_recipes_deleted_since_the_index_was_built(salads):
+    from functions.build_similarity_index import build_similarity_index
+
+    build_similarity_index()
+    status, body = call('GET', '/recipes/salad-0/similar', 'salad-0', k='2')
+    assert status == 200 and body['count'] == 2
+    deleted = body['similar'][0]['recipe_id']
+
+    assert call('DELETE', f'/recipes/{deleted}', deleted)[0] == 204
+    status, body = call('GET', '/recipes/salad-0/similar', 'salad-0', k='2')
+    assert status == 200 and body['count'] == 2
+    assert deleted not in [item['recipe_id'] for item in body['similar']]
+
+    assert call('GET', f'/recipes/{deleted}/similar', deleted)[0] == 404
+
+
+@pytest.fixture
+def catalog(aws):
+    """23 recipes across three categories with distinct created_at"""
+    sizes = {'breakfast': 4, 'lunch': 12, 'dinner': 7}
+    count = 0
+    for category, size in sizes.items():
+        for i in range(size):
+            db_client.put_item(settings.RECIPES_TABLE, normalize_recipe({
+                'recipe_id': f'{category}-{i}', 'name': f'{category} {i}', 'category': category,
+                'created_at': (count * 7) % 50, 'ingredients': [], 'tags': []
+            }))
+            count += 1
+    recipe_cache.bump_version()
+    return sizes
+
+
+def all_pages(**params):
+    """Follow next_cursor to the end, returning every page"""
+    pages, cursor = [], None
+    while True:
+        query = dict(params, cursor=cursor) if cursor else params
+        status, body = get('/recipes', **query)
+        assert status == 200, body
+        pages.append(body['recipes'])
+        cursor = body['next_cursor']
+        if not cursor:
+            return pages
+        assert len(pages) < 50
+
+
+def test_listing_pages_through_every_recipe_once(catalog):
+    pages = all_pages(limit='5')
+    ids = [recipe['recipe_id'] for page in pages for recipe in page]
+    assert len(ids) == sum(catalog.values()) == len(set(ids))
+    assert all(len(page) <= 5 for page in pages)
+
+
+def test_category_pages_are_oldest_first(catalog):
+    pages = all_pages(category='lunch', limit='5')
+    created = [recipe['created_at'] for page in pages for recipe in page]
+    assert len(created) == catalog['lunch']
+    assert created == sorted(created)
+
+
+@pytest.mark.parametrize('params', [{'cursor': 'not a cursor'}, {'cursor': 'WzFd'}, {'limit': 'ten'}])
+def test_listing_rejects_a_malformed_cursor_or_limit(catalog, params):
+    assert get('/recipes', **params)[0] == 400
+
+
+def test_multi_category_pages_merge_in_created_order(catalog):
+    pages = all_pages(category='breakfast,lunch,dinner', limit='4')
+    recipes = [recipe for page in pages for recipe in page]
+    assert len(recipes) == sum(catalog.values()) == len({recipe['recipe_id'] for recipe in recipes})
+    created = [recipe['created_at'] for recipe in recipes]
+    assert created == sorted(created)
+    assert len(pages) == -(-len(recipes) // 4)
+
+
+def test_multi_category_matches_single_category_order(catalog):
+    single = [recipe['recipe_id'] for page in all_pages(category='dinner', limit='3') for recipe in page]
+    merged = [recipe['recipe_id'] for page in all_pages(category='dinner,breakfast', limit='3')
+              for recipe in page if recipe['category'] == 'dinner']
+    assert merged == single
+
+
+def test_multi_category_cursor_must_match_the_categories(catalog):
+    status, body = get('/recipes', category='lunch,dinner', limit='2')
+    status, _ = get('/recipes', category='breakfast,dinner', limit='2', cursor=body['next_cursor'])
+    assert status == 400
@@ -0,0 +1,135 @@
+"""
+Concurrency controls for expensive upstream calls (OpenAI)
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable
+
+
+class ModelBudgetExceeded(Exception):
+    """Raised instead of queuing when a call would exceed its budget"""
+
+
+class TokenBucket:
+    """Token bucket; try_acquire refuses when it runs dry, acquire waits"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate  # tokens added per second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def try_acquire(self, amount: float = 1.0) -> bool:
+        """Take `amount` tokens if available right now"""
+        with self._lock:
+            self._refill()
+            if self._tokens < amount:
+                return False
+            self._tokens -= amount
+            return True
+
+    def acquire(self, amount: float = 1.0) -> None:
+        """Take `amount` tokens, sleeping until the bucket has refilled enough"""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                wait = (amount - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def adjust(self, amount: float) -> None:
+        """Return (positive) or charge (negative) tokens after the fact
+
+        Charging may leave the bucket in debt, which delays later callers.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+class ModelCallLimiter:
+    """Requests-per-second and tokens-per-minute budget for model calls"""
+
+    def __init__(self, requests_per_second: float, tokens_per_minute: float):
+        self.requests = TokenBucket(requests_per_second, max(1.0, requests_per_second))
+        self.tokens = TokenBucket(tokens_per_minute / 60.0, tokens_per_minute)
+        self.rejected = 0
+
+    def try_acquire(self, estimated_tokens: int) -> bool:
+        """Reserve budget for one call, or refuse without waiting"""
+        if not self.requests.try_acquire():
+            self.rejected += 1
+            return False
+        if not self.tokens.try_acquire(estimated_tokens):
+            self.requests.adjust(1)
+            self.rejected += 1
+            return False
+        return True
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Settle a reservation against the tokens the call really used"""
+        self.tokens.adjust(estimated_tokens - actual_tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'rejected': self.rejected,
+            'requests_available': round(self.requests.available, 2),
+            'tokens_available': int(self.tokens.available)
+        }
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Any = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn, or wait for the identical call already in flight"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
@@ -0,0 +1,44 @@
+"""
+Per-user recipe lists from favorites-based collaborative filtering
+
+The offline job (functions/build_user_recommendations.py) stores each
+user's top-N recipes, scored 0..1, in USER_RECOMMENDATIONS_TABLE. Request
+paths read them here and pass them to the recipe catalog, which blends
+them with macro-fit scores.
+"""
+from typing import Dict, List, Optional
+from database import db_client, get_timestamp, to_dynamodb
+from config import settings
+
+
+def recommendations_item(user_id: str, recipe_ids: List[str], scores: List[float]) -> Dict:
+    """Item for a user's list; scores are scaled so the best is 1.0"""
+    best = max(scores) if scores else 0.0
+    now = get_timestamp()
+    return to_dynamodb({
+        'user_id': user_id,
+        'recipe_ids': recipe_ids,
+        'scores': [round(score / best, 4) if best else 0.0 for score in scores],
+        'built_at': now,
+        'expires_at': now + settings.USER_RECOMMENDATIONS_TTL_SECONDS
+    })
+
+
+def _as_boosts(item: Optional[Dict]) -> Dict[str, float]:
+    if not item or int(item.get('expires_at', 0)) <= get_timestamp():
+        return {}
+    return {recipe_id: float(score) for recipe_id, score in zip(item['recipe_ids'], item['scores'])}
+
+
+def get_user_recommendations(user_id: Optional[str]) -> Dict[str, float]:
+    """recipe_id -> score for one user; empty when the user has no list"""
+    if not user_id:
+        return {}
+    return _as_boosts(db_client.get_item(settings.USER_RECOMMENDATIONS_TABLE, {'user_id': user_id}))
+
+
+def get_many_user_recommendations(user_ids: List[str]) -> Dict[str, Dict[str, float]]:
+    """get_user_recommendations for many users in batched reads"""
+    keys = [{'user_id': user_id} for user_id in user_ids]
+    items = db_client.batch_get(settings.USER_RECOMMENDATIONS_TABLE, keys)
+    return {item['user_id']: _as_boosts(item) for item in items}
@@ -64,18 +64,23 @@ export const authAPI = {
   register: (data: any) => api.post('/auth/register', data),
   login: (email: string, password: string) => api.post('/auth/login', { email, password }),
   getCurrentUser: () => api.get('/auth/me'),
+  getCurrentUserWithProfile: () => api.get('/auth/me', { params: { include: 'profile' } }),
   refreshToken: (refreshToken: string) => api.post('/auth/refresh', { refresh_token: refreshToken }),
 };
 
 export const profileAPI = {
   getProfile: (userId: string) => api.get(`/profiles/${userId}`),
   updateProfile: (userId: string, data: any) => api.put(`/profiles/${userId}`, data),
+  getTargets: (userId: string) => api.get(`/profiles/${userId}/targets`),
 };
 
 export const recipesAPI = {
   getRecipes: (params?: any) => api.get('/recipes', { params }),
   getRecipe: (id: string) => api.get(`/recipes/${id}`),
+  getRecipesByIds: (ids: string[]) => api.get('/recipes', { params: { ids: ids.join(',') } }),
   searchRecipes: (query: string) => api.get(`/recipes/search?q=${query}`),
+  suggestRecipes: (prefix: string, limit = 8) => api.get('/recipes/suggest', { params: { prefix, limit } }),
+  getSimilarRecipes: (id: string, k = 10) => api.get(`/recipes/${id}/similar`, { params: { k } }),
 };
 
 export const tipsAPI = {
@@ -93,6 +98,7 @@ export const mealsAPI = {
   getRecommendations: (mealType: string) => api.post('/meals/recommendations', { meal_type: mealType }),
   createMealPlan: (data: any) => api.post('/meals/plans', data),
   getMealPlans: () => api.get('/meals/plans'),
+  getMealPlan: (id: string) => api.get(`/meals/plans/${id}`),
 };
 
 export const ordersAPI = {
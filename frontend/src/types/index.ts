@@ -82,6 +82,34 @@ export interface MealPlan {
   created_at: number;
 }
 
+export interface WeeklyMealPlanDay {
+  date: string;
+  meals: {
+    breakfast: MealRecommendation;
+    lunch: MealRecommendation;
+    dinner: MealRecommendation;
+  };
+  total_nutrition: NutritionInfo;
+  deviation: number;
+}
+
+export interface WeeklyMealPlan {
+  plan_id: string;
+  user_id: string;
+  plan_type: 'weekly';
+  date: string;
+  end_date: string;
+  targets: NutritionInfo;
+  options: {
+    days: number;
+    max_prep_minutes?: number | null;
+    max_repeats: number;
+  };
+  days: WeeklyMealPlanDay[];
+  deviation: number;
+  created_at: number;
+}
+
 export interface Order {
   order_id: string;
   user_id: string;